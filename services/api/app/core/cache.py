@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class TtlLruCache:
+    """
+    Thread-safe in-process cache with LRU eviction and a per-entry TTL.
+
+    Config:
+      maxsize: max number of entries kept (least recently used evicted first)
+      ttl_s: seconds an entry stays valid after it was written (<= 0 disables expiry)
+      sizeof: optional estimate of an entry's bytes; enables memory accounting
+      max_bytes: evict until the estimated total fits (needs sizeof; 0 = unbounded)
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_s: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[Any], int] | None = None,
+        max_bytes: int = 0,
+    ) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sizeof = sizeof
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value, _ = item
+            if expires_at and expires_at <= self._clock():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = self._clock() + self.ttl_s if self.ttl_s > 0 else 0.0
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (expires_at, value, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes and self.bytes > self.max_bytes and len(self._data) > 1
+            ):
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self.bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -38,6 +38,89 @@ class Settings(BaseSettings):
         alias="ALLOWED_MIME",
     )
 
+    # OCR (image-only PDF pages)
+    ocr_backend: str = Field(default="pytesseract", alias="OCR_BACKEND")  # pytesseract | tesserocr (pooled handles)
+    ocr_tesserocr_handles: int = Field(default=1, alias="OCR_TESSEROCR_HANDLES")  # per language set and process
+    ocr_workers: int = Field(default=2, alias="OCR_WORKERS")  # page-parallel processes per API worker; 1 = in-process
+    ocr_max_inflight_pages: int = Field(default=0, alias="OCR_MAX_INFLIGHT_PAGES")  # rasters held at once; 0 = 2 * workers
+    ocr_adaptive_dpi: bool = Field(default=True, alias="OCR_ADAPTIVE_DPI")  # per-page DPI from line height; off = OCR_PDF_DPI
+    ocr_pdf_dpi: int = Field(default=200, alias="OCR_PDF_DPI")
+    ocr_min_dpi: int = Field(default=150, alias="OCR_MIN_DPI")
+    ocr_max_dpi: int = Field(default=300, alias="OCR_MAX_DPI")
+    ocr_target_line_px: int = Field(default=20, alias="OCR_TARGET_LINE_PX")  # rendered height of a text line
+    ocr_max_page_pixels: int = Field(default=16_000_000, alias="OCR_MAX_PAGE_PIXELS")  # 16 MB grayscale per page
+    ocr_auto_lang: bool = Field(default=True, alias="OCR_AUTO_LANG")  # detect eng / nor / eng+nor per asset when ?lang is not given
+    ocr_page_rows: bool = Field(default=True, alias="OCR_PAGE_ROWS")  # PDFs: persist each page (resume + progress)
+    ocr_page_cache_dir: str = Field(default="/tmp/ocr-page-cache", alias="OCR_PAGE_CACHE_DIR")  # empty disables the cache
+    ocr_page_cache_max_bytes: int = Field(default=256 * 1024 * 1024, alias="OCR_PAGE_CACHE_MAX_BYTES")
+
+    # Vector search
+    embed_dim: int = Field(default=384, alias="EMBED_DIM")
+    ann_index: str = Field(default="ivfflat", alias="ANN_INDEX")  # ivfflat|hnsw
+    ann_metric: str = Field(default="cosine", alias="ANN_METRIC")  # cosine|l2|ip
+    ann_storage: str = Field(default="vector", alias="ANN_STORAGE")  # vector|halfvec (float16 expression index)
+    ivfflat_probes: int = Field(default=20, alias="IVFFLAT_PROBES")
+    hnsw_ef_search: int = Field(default=100, alias="HNSW_EF_SEARCH")
+    search_max_candidates: int = Field(default=1000, alias="SEARCH_MAX_CANDIDATES")  # cap for the adaptive window
+    search_batch_max: int = Field(default=100, alias="SEARCH_BATCH_MAX")  # queries per POST /search/batch
+    search_fusion: str = Field(default="linear", alias="SEARCH_FUSION")  # linear|rrf
+    rrf_k: int = Field(default=60, alias="RRF_K")
+    lex_match_cap: int = Field(default=2000, alias="LEX_MATCH_CAP")  # rrf: keyword matches scored per query
+    search_chunks: bool = Field(default=False, alias="SEARCH_CHUNKS")  # rank documents by best passage
+    chunk_fanout: int = Field(default=4, alias="CHUNK_FANOUT")  # chunk hits fetched per document candidate
+    ann_plan_check: bool = Field(default=True, alias="ANN_PLAN_CHECK")  # EXPLAIN the ANN query at startup
+    search_snippet: str = Field(default="prefix", alias="SEARCH_SNIPPET")  # prefix | headline (match-centred)
+    snippet_chars: int = Field(default=200, alias="SNIPPET_CHARS")
+
+    # Async GET /search: query encoding runs on its own bounded pool
+    search_encode_workers: int = Field(default=4, alias="SEARCH_ENCODE_WORKERS")
+    search_encode_max_queue: int = Field(default=64, alias="SEARCH_ENCODE_MAX_QUEUE")  # beyond this, 503 instead of waiting
+
+    # In-process exact vector index (replaces the seqscan fallback; serves small corpora)
+    exact_index: bool = Field(default=True, alias="EXACT_INDEX")
+    exact_index_max_bytes: int = Field(default=256 * 1024 * 1024, alias="EXACT_INDEX_MAX_BYTES")  # above this, SQL only
+    exact_index_max_rows: int = Field(default=20000, alias="EXACT_INDEX_MAX_ROWS")  # corpora up to this size skip ANN
+    exact_index_refresh_s: float = Field(default=5.0, alias="EXACT_INDEX_REFRESH_S")  # delta poll interval (rows embedded since the last refresh)
+    exact_index_rebuild_s: float = Field(default=600.0, alias="EXACT_INDEX_REBUILD_S")  # full reload (deleted rows)
+
+    # Query embedding cache
+    query_cache_size: int = Field(default=1024, alias="QUERY_CACHE_SIZE")  # 0 disables the cache
+    query_cache_ttl_s: float = Field(default=600.0, alias="QUERY_CACHE_TTL_S")
+    query_cache_redis: bool = Field(default=False, alias="QUERY_CACHE_REDIS")  # share across workers via REDIS_URL
+
+    # Search result cache (invalidated by the corpus generation counter)
+    result_cache_size: int = Field(default=256, alias="RESULT_CACHE_SIZE")  # 0 disables the cache
+    result_cache_ttl_s: float = Field(default=300.0, alias="RESULT_CACHE_TTL_S")
+    result_cache_max_bytes: int = Field(default=64 * 1024 * 1024, alias="RESULT_CACHE_MAX_BYTES")
+    corpus_generation_redis: bool = Field(default=False, alias="CORPUS_GENERATION_REDIS")  # required with >1 API worker and for reembed cut-over
+
+    # Embedding model (its id is stored per row in media_assets.embedding_model)
+    embed_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", alias="EMBED_MODEL")
+
+    # Embedding backend
+    embed_backend: str = Field(default="torch", alias="EMBED_BACKEND")  # torch | onnx | onnx-int8 (CPU)
+    embed_onnx_dir: str = Field(default="/tmp/onnx-models", alias="EMBED_ONNX_DIR")  # exported models are cached here
+    embed_onnx_threads: int = Field(default=0, alias="EMBED_ONNX_THREADS")  # 0 = onnxruntime default
+
+    # Content-addressed embedding cache (embedding_cache table)
+    embed_cache: bool = Field(default=True, alias="EMBED_CACHE")  # reuse vectors for identical normalized text
+
+    # Embedding micro-batching (coalesces concurrent single-text calls into one encode)
+    embed_microbatch: bool = Field(default=True, alias="EMBED_MICROBATCH")
+    embed_max_batch: int = Field(default=32, alias="EMBED_MAX_BATCH")
+    embed_max_wait_ms: float = Field(default=5.0, alias="EMBED_MAX_WAIT_MS")  # latency added to a lone request
+
+    # Shared embedding server (python -m app.infra.embedding_server); empty = in-process model
+    embed_server_url: str = Field(default="", alias="EMBED_SERVER_URL")  # unix:///path.sock or http://127.0.0.1:8081
+    embed_server_timeout_s: float = Field(default=10.0, alias="EMBED_SERVER_TIMEOUT_S")
+    embed_server_retry_s: float = Field(default=30.0, alias="EMBED_SERVER_RETRY_S")  # in-process fallback this long after a failure
+
+    # Passage (chunk) embeddings
+    embed_chunks: bool = Field(default=True, alias="EMBED_CHUNKS")
+    chunk_tokens: int = Field(default=200, alias="CHUNK_TOKENS")
+    chunk_overlap_tokens: int = Field(default=40, alias="CHUNK_OVERLAP_TOKENS")
+    chunk_batch_size: int = Field(default=64, alias="CHUNK_BATCH_SIZE")
+
      # Hugging Face - Freight Extractor 
     hf_base_url: str = Field(
         default="https://router.huggingface.co/v1",
@@ -2,18 +2,18 @@ from __future__ import annotations
 
 from functools import lru_cache
 
-from pgvector.psycopg import register_vector
+from pgvector.psycopg import register_vector, register_vector_async
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine import URL
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import get_settings
 
 
-@lru_cache(maxsize=1)
-def get_engine():
+def _url() -> URL:
     settings = get_settings()
-    url = URL.create(
+    return URL.create(
         drivername="postgresql+psycopg",
         username=settings.postgres_user,
         password=settings.postgres_password.get_secret_value(),  # SecretStr -> str
@@ -21,7 +21,11 @@ def get_engine():
         port=settings.postgres_port,
         database=settings.postgres_db,
     )
-    engine = create_engine(url, pool_pre_ping=True, future=True)
+
+
+@lru_cache(maxsize=1)
+def get_engine():
+    engine = create_engine(_url(), pool_pre_ping=True, future=True)
 
     # Ensure pgvector is registered on each new connection
     @event.listens_for(engine, "connect")
@@ -30,6 +34,32 @@ def get_engine():
 
     return engine
 
-Engine = get_engine()
-SessionLocal = sessionmaker(bind=Engine, autocommit=False, autoflush=False, future=True)
+
+@lru_cache(maxsize=1)
+def get_async_engine():
+    # Same driver (psycopg 3) in async mode, for async routes
+    engine = create_async_engine(_url(), pool_pre_ping=True)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_vector(dbapi_connection, connection_record):
+        dbapi_connection.run_async(register_vector_async)
+
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker():
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker():
+    return sessionmaker(bind=get_engine(), autocommit=False, autoflush=False, future=True)
+
+
+def SessionLocal() -> Session:
+    # The engine is created on the first session, not at import (no settings/DB needed to import the app)
+    return get_sessionmaker()()
+
+
 Base = declarative_base()
@@ -2,18 +2,38 @@ from functools import lru_cache
 from typing import Annotated
 
 from fastapi import Depends
-
-from ..domain.ports import BlobStore, EmbeddingModelPort, MediaAssetRepo, OcrPort
+from fastapi.concurrency import run_in_threadpool
+
+from ..domain.ports import (
+    BlobStore,
+    DocumentChunkRepo,
+    DocumentPageRepo,
+    EmbeddingCacheRepo,
+    EmbeddingModelPort,
+    MediaAssetRepo,
+    OcrPort,
+)
+from ..infra.batching_embedder import MicroBatchingEmbedder
+from ..infra.corpus_generation import CorpusGeneration
 from ..infra.embedding_model import EmbeddingModel
+from ..infra.exact_vector_index import ExactVectorIndex
 from ..infra.ocr_engine import OcrEngine
+from ..infra.ocr_page_cache import OcrPageCache
+from ..infra.query_embedding_cache import QueryEmbeddingCache
+from ..infra.remote_embedding_model import RemoteEmbeddingModel
 from ..infra.s3_blob_store import S3BlobStore
+from ..infra.sqlalchemy_document_chunk_repo import SqlAlchemyDocumentChunkRepo
+from ..infra.sqlalchemy_document_page_repo import SqlAlchemyDocumentPageRepo
+from ..infra.sqlalchemy_embedding_cache_repo import SqlAlchemyEmbeddingCacheRepo
 from ..infra.sqlalchemy_media_asset_repo import SqlAlchemyMediaAssetRepo
 from ..services.document_service import DocumentService
-from ..services.search_service import SearchService
+from ..services.search_service import SearchService, ranked_sizeof
 from ..services.upload_service import UploadService
+from .cache import TtlLruCache
 from .celery import get_celery
 from .config import Settings, get_settings
-from .db import SessionLocal
+from .db import SessionLocal, get_async_sessionmaker
+from .executor import BoundedExecutor
 
 
 def get_db():
@@ -23,6 +43,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 @lru_cache(maxsize=1)
 def _s3_singleton() -> BlobStore:
     return S3BlobStore(get_settings())  # zero-arg, safe to cache
@@ -36,20 +60,80 @@ def provide_default_bucket(settings: Settings = Depends(get_settings)) -> str:
 
 @lru_cache(maxsize=1)
 def get_ocr_service() -> OcrPort:
-    return OcrEngine()
+    settings = get_settings()
+    page_cache = None
+    if settings.ocr_page_cache_dir:
+        page_cache = OcrPageCache(settings.ocr_page_cache_dir, max_bytes=settings.ocr_page_cache_max_bytes)
+    return OcrEngine(
+        workers=settings.ocr_workers,
+        max_inflight_pages=settings.ocr_max_inflight_pages,
+        page_cache=page_cache,
+        pdf_dpi=settings.ocr_pdf_dpi,
+        adaptive_dpi=settings.ocr_adaptive_dpi,
+        min_dpi=settings.ocr_min_dpi,
+        max_dpi=settings.ocr_max_dpi,
+        target_line_px=settings.ocr_target_line_px,
+        max_page_pixels=settings.ocr_max_page_pixels,
+        backend=settings.ocr_backend,
+        tesserocr_handles=settings.ocr_tesserocr_handles,
+    )
 OCRDependency = Annotated[OcrPort, Depends(get_ocr_service)]
 
+@lru_cache(maxsize=1)
+def get_local_embedding_model() -> EmbeddingModelPort:
+    # Create one shared in-process instance (lazy-loaded model)
+    settings = get_settings()
+    model = EmbeddingModel(
+        model=settings.embed_model,
+        embed_dim=settings.embed_dim,
+        chunk_tokens=settings.chunk_tokens,
+        chunk_overlap=settings.chunk_overlap_tokens,
+        backend=settings.embed_backend,
+        onnx_dir=settings.embed_onnx_dir,
+        onnx_threads=settings.embed_onnx_threads,
+    )
+    if not settings.embed_microbatch:
+        return model
+    return MicroBatchingEmbedder(model, max_batch=settings.embed_max_batch, max_wait_ms=settings.embed_max_wait_ms)
+
 @lru_cache(maxsize=1)
 def get_embedding_model() -> EmbeddingModelPort:
-    # Create one shared instance (lazy-loaded model)
-    return EmbeddingModel()
+    settings = get_settings()
+    local = get_local_embedding_model()
+    if not settings.embed_server_url:
+        return local
+    # The local model only loads if the server is down, so workers normally hold no weights
+    return RemoteEmbeddingModel(
+        settings.embed_server_url,
+        model_id=local.model_id,
+        fallback=local,
+        timeout_s=settings.embed_server_timeout_s,
+        retry_s=settings.embed_server_retry_s,
+    )
 EmbeddingDependency = Annotated[EmbeddingModelPort, Depends(get_embedding_model)]
 
+@lru_cache(maxsize=1)
+def get_corpus_generation() -> CorpusGeneration:
+    settings = get_settings()
+    return CorpusGeneration(redis_url=settings.redis_url if settings.corpus_generation_redis else None)
+
+@lru_cache(maxsize=1)
+def get_embedding_cache_repo() -> EmbeddingCacheRepo:
+    return SqlAlchemyEmbeddingCacheRepo()
+
 @lru_cache(maxsize=1)
 def get_media_asset_repo() -> MediaAssetRepo:
     return SqlAlchemyMediaAssetRepo()
 MediaAssetRepoDependency = Annotated[MediaAssetRepo, Depends(get_media_asset_repo)]
 
+@lru_cache(maxsize=1)
+def get_document_chunk_repo() -> DocumentChunkRepo:
+    return SqlAlchemyDocumentChunkRepo()
+
+@lru_cache(maxsize=1)
+def get_document_page_repo() -> DocumentPageRepo:
+    return SqlAlchemyDocumentPageRepo()
+
 
 def provide_upload_service(
     s3: BlobStore = Depends(provide_s3), 
@@ -68,7 +152,20 @@ def _document_singleton() -> DocumentService:
     embedder = get_embedding_model()
     settings = get_settings()
     media_asset_repo = get_media_asset_repo()
-    return DocumentService(s3=s3, ocr=ocr, embedder=embedder, s3_public_base=settings.s3_public_base, media_asset_repo=media_asset_repo)
+    return DocumentService(
+        s3=s3,
+        ocr=ocr,
+        embedder=embedder,
+        s3_public_base=settings.s3_public_base,
+        media_asset_repo=media_asset_repo,
+        corpus_generation=get_corpus_generation(),
+        chunk_repo=get_document_chunk_repo() if settings.embed_chunks else None,
+        chunk_batch_size=settings.chunk_batch_size,
+        embedding_cache=get_embedding_cache_repo() if settings.embed_cache else None,
+        embed_dim=settings.embed_dim,
+        page_repo=get_document_page_repo() if settings.ocr_page_rows else None,
+        auto_lang=settings.ocr_auto_lang,
+    )
 
 def provide_document_service() -> DocumentService:
     # this one is exposed to FastAPI
@@ -77,16 +174,74 @@ def provide_document_service() -> DocumentService:
 DocumentServiceDependency = Annotated[DocumentService, Depends(provide_document_service)]
 
 
+@lru_cache(maxsize=1)
+def get_exact_vector_index() -> ExactVectorIndex | None:
+    settings = get_settings()
+    if not settings.exact_index:
+        return None
+    return ExactVectorIndex(
+        dim=settings.embed_dim,
+        max_bytes=settings.exact_index_max_bytes,
+        refresh_s=settings.exact_index_refresh_s,
+        rebuild_s=settings.exact_index_rebuild_s,
+    )
+
 @lru_cache(maxsize=1)
 def _search_singleton() -> SearchService:
     embedder = get_embedding_model()
     settings = get_settings()
-    embed_dim = getattr(settings, "embed_dim", 384)
-    probes = getattr(settings, "ivfflat_probes", 20)
-    return SearchService(embedder=embedder, embed_dim=embed_dim, ivfflat_probes=probes)
-
-def provide_search_service() -> SearchService:
-    return _search_singleton()
+    query_cache = None
+    if settings.query_cache_size > 0:
+        query_cache = QueryEmbeddingCache(
+            model_id=embedder.model_id,
+            maxsize=settings.query_cache_size,
+            ttl_s=settings.query_cache_ttl_s,
+            redis_url=settings.redis_url if settings.query_cache_redis else None,
+        )
+    result_cache = None
+    if settings.result_cache_size > 0:
+        result_cache = TtlLruCache(
+            maxsize=settings.result_cache_size,
+            ttl_s=settings.result_cache_ttl_s,
+            sizeof=ranked_sizeof,
+            max_bytes=settings.result_cache_max_bytes,
+        )
+    return SearchService(
+        embedder=embedder,
+        embed_dim=settings.embed_dim,
+        ivfflat_probes=settings.ivfflat_probes,
+        hnsw_ef_search=settings.hnsw_ef_search,
+        ann_index=settings.ann_index,
+        ann_metric=settings.ann_metric,
+        ann_storage=settings.ann_storage,
+        max_candidates=settings.search_max_candidates,
+        max_batch_queries=settings.search_batch_max,
+        fusion=settings.search_fusion,
+        rrf_k=settings.rrf_k,
+        lex_match_cap=settings.lex_match_cap,
+        chunks=settings.search_chunks,
+        chunk_fanout=settings.chunk_fanout,
+        snippet_mode=settings.search_snippet,
+        snippet_chars=settings.snippet_chars,
+        query_cache=query_cache,
+        result_cache=result_cache,
+        corpus_generation=get_corpus_generation(),
+        exact_index=get_exact_vector_index(),
+        exact_max_rows=settings.exact_index_max_rows,
+        encode_executor=BoundedExecutor(
+            workers=settings.search_encode_workers,
+            max_queue=settings.search_encode_max_queue,
+            name="search-encode",
+        ),
+        session_factory=SessionLocal,
+    )
+
+async def provide_search_service() -> SearchService:
+    # async: a sync dependency would take a threadpool thread on every request, even for async routes.
+    # Only the first call builds the service (loads the model), and that happens on a worker thread.
+    if _search_singleton.cache_info().currsize:
+        return _search_singleton()
+    return await run_in_threadpool(_search_singleton)
 
 SearchServiceDependency = Annotated[SearchService, Depends(provide_search_service)]
 
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ..domain.exceptions import Overloaded
+
+
+class BoundedExecutor:
+    """
+    Fixed-size thread pool for blocking work awaited from async routes, with load shedding.
+
+    At most `workers` calls run at once and at most `max_queue` more wait behind
+    them; any further call raises Overloaded immediately instead of queueing
+    without limit (routes map it to 503).
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64, name: str = "bounded") -> None:
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.peak = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self.inflight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise Overloaded(f"{self.inflight} calls in flight")
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "inflight": self.inflight,
+                "queued": max(0, self.inflight - self.workers),
+                "peak": self.peak,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
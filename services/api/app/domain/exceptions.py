@@ -2,4 +2,5 @@ class NotFound(ValueError): ...
 class BadRequest(ValueError): ...
 class ProcessingError(RuntimeError): ...
 class S3Unavailable(RuntimeError): ...
-class ModelServiceError(RuntimeError): ...
\ No newline at end of file
+class ModelServiceError(RuntimeError): ...
+class Overloaded(RuntimeError): ...
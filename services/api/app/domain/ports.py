@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Any, Protocol
 
 from sqlalchemy.orm import Session
@@ -8,9 +9,26 @@ from ..models import MediaAsset
 class MediaAssetRepo(Protocol):
     def get(self, db: Session, asset_id: int) -> MediaAsset: ...
     def save_text(self, db: Session, asset_id: int, text: str) -> None: ...
-    def save_embedding(self, db: Session, asset_id: int, emb: list[float]) -> None: ...
+    def save_detected_lang(self, db: Session, asset_id: int, lang: str) -> None: ...
+    def save_embedding(self, db: Session, asset_id: int, emb: list[float], model_id: str | None = None) -> None: ...
     def create(self, db: Session, media_asset: MediaAsset) -> None: ...
 
+class DocumentChunkRepo(Protocol):
+    def replace_chunks(
+        self, db: Session, asset_id: int, chunks: list[str], embeddings: list[list[float]], model_id: str | None = None
+    ) -> None: ...
+
+class DocumentPageRepo(Protocol):
+    def begin(self, db: Session, asset_id: int, total: int, lang: str) -> set[int]: ...
+    def save_page(self, db: Session, asset_id: int, page_no: int, lang: str, text: str) -> None: ...
+    def assemble(self, db: Session, asset_id: int) -> str: ...
+    def progress(self, db: Session, asset_id: int) -> tuple[int, int | None]: ...
+
+class EmbeddingCacheRepo(Protocol):
+    def get_many(self, db: Session, model_id: str, dim: int, hashes: list[str]) -> dict[str, list[float]]: ...
+    def put_many(self, db: Session, model_id: str, dim: int, entries: dict[str, list[float]]) -> None: ...
+    def prune(self, db: Session, keep_model_ids: list[str]) -> int: ...
+
 class BlobStore(Protocol):
     def put_bytes(self, bucket: str, key: str, data: bytes, content_type: str) -> None: ...
     def object_exists(self, bucket: str, key: str) -> bool: ...
@@ -24,10 +42,17 @@ class BlobStore(Protocol):
 class OcrPort(Protocol):
     def image_bytes_to_text(self, blob: bytes, lang: str | None = None) -> str: ...
     def pdf_bytes_to_text(self, blob: bytes, lang: str | None = None) -> str: ...
+    def pdf_page_count(self, blob: bytes) -> int: ...
+    def iter_pdf_pages(self, blob: bytes, lang: str | None = None, skip: frozenset[int] = frozenset()) -> Iterator[tuple[int, str]]: ...
     def xlsx_bytes_to_text(self, blob: bytes) -> str: ...
+    def detect_lang(self, blob: bytes, mime: str) -> str: ...
 
 class EmbeddingModelPort(Protocol):
+    @property
+    def model_id(self) -> str: ...
     def embed_text(self, text: str) -> list[float]: ...
+    def embed_texts(self, texts: list[str]) -> list[list[float]]: ...
+    def chunk_text(self, text: str) -> list[str]: ...
 
 class FreightRepo(Protocol):
     def create_shipment_request(self, db: Session, source_asset_id: int, status: str, meta: dict | None) -> int: ...
@@ -0,0 +1,141 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from ..core.logging import get_logger
+from ..core.metrics import timed
+from ..domain.ports import EmbeddingModelPort
+
+log = get_logger("infra.batching_embedder")
+
+
+@dataclass(slots=True)
+class _Pending:
+    text: str
+    enqueued: float
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatchingEmbedder:
+    """
+    EmbeddingModelPort that coalesces concurrent small requests into one encode call.
+
+    Callers enqueue texts and block on a future. A single worker thread takes the
+    first waiting item, keeps collecting for up to `max_wait_ms` (or until
+    `max_batch` items), runs one `inner.embed_texts` and resolves every caller with
+    its own vector. Lists of `max_batch` or more go straight to the inner model.
+    When the batch encode fails, its texts are re-encoded one by one, so only the
+    caller whose input fails gets the exception.
+
+    Metrics: one `metric:embed_batch` line per encode (size, queue wait) and
+    running totals via stats().
+    """
+
+    def __init__(self, inner: EmbeddingModelPort, max_batch: int = 32, max_wait_ms: float = 5.0) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.inner = inner
+        self.max_batch = max_batch
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self._queue: queue.Queue[_Pending] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_size = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    @property
+    def model_id(self) -> str:
+        # cache keys are scoped by model id; batching does not change the vectors
+        return self.inner.model_id
+
+    # Public
+    def embed_text(self, text: str) -> list[float]:
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        if len(texts) >= self.max_batch:
+            return self.inner.embed_texts(texts)
+        self._ensure_worker()
+        now = time.perf_counter()
+        pending = [_Pending(text=t, enqueued=now) for t in texts]
+        for p in pending:
+            self._queue.put(p)
+        return [p.future.result() for p in pending]
+
+    def chunk_text(self, text: str) -> list[str]:
+        return self.inner.chunk_text(text)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_seen": self._max_size,
+            "avg_queue_wait_ms": round(self._wait_ms_total / self._items, 3) if self._items else 0.0,
+            "max_queue_wait_ms": round(self._wait_ms_max, 3),
+            "queued": self._queue.qsize(),
+        }
+
+    # Internal
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list[_Pending]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits = [(started - p.enqueued) * 1000 for p in batch]
+            t = timed("embed_batch")
+            try:
+                vecs = self.inner.embed_texts([p.text for p in batch])
+                if len(vecs) != len(batch):
+                    raise ValueError(f"embed_texts returned {len(vecs)} vectors for {len(batch)} texts")
+            except Exception as e:
+                log.error("embed_batch_failed", extra={"size": len(batch), "exc": e.__class__.__name__})
+                self._encode_each(batch, e)
+                continue
+            t({"size": len(batch), "queue_wait_ms_max": round(max(waits), 2)})
+            for p, v in zip(batch, vecs, strict=True):
+                p.future.set_result(v)
+
+            self._batches += 1
+            self._items += len(batch)
+            self._max_size = max(self._max_size, len(batch))
+            self._wait_ms_total += sum(waits)
+            self._wait_ms_max = max(self._wait_ms_max, *waits)
+
+    def _encode_each(self, batch: list[_Pending], error: Exception) -> None:
+        # a coalesced batch mixes unrelated callers: one bad input must not fail the others
+        if len(batch) == 1:
+            batch[0].future.set_exception(error)
+            return
+        for p in batch:
+            try:
+                (vec,) = self.inner.embed_texts([p.text])
+            except Exception as e:
+                p.future.set_exception(e)
+            else:
+                p.future.set_result(vec)
@@ -0,0 +1,47 @@
+import threading
+
+from ..core.logging import get_logger
+
+log = get_logger("infra.corpus_generation")
+
+
+class CorpusGeneration:
+    """
+    Monotonic counter bumped whenever searchable content changes (OCR text or
+    embeddings committed). Caches include it in their keys, so a bump makes
+    every older entry unreachable without explicit invalidation.
+
+    With a redis_url the counter lives in Redis (INCR) so all API workers agree;
+    otherwise it is per process.
+    """
+
+    KEY = "corpus:generation"
+
+    def __init__(self, redis_url: str | None = None) -> None:
+        self._local = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url:
+            import redis  # optional; only needed for multi-worker deployments
+
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05, socket_connect_timeout=0.05)
+
+    def current(self) -> int | None:
+        """Current generation, or None when it cannot be determined (skip caching)."""
+        if self._redis is not None:
+            try:
+                return int(self._redis.get(self.KEY) or 0)
+            except Exception as e:
+                log.warning("generation_get_failed", extra={"error": e.__class__.__name__})
+                return None
+        return self._local
+
+    def bump(self) -> int:
+        with self._lock:
+            self._local += 1
+        if self._redis is not None:
+            try:
+                return int(self._redis.incr(self.KEY))
+            except Exception as e:
+                log.warning("generation_bump_failed", extra={"error": e.__class__.__name__})
+        return self._local
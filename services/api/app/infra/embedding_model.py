@@ -1,9 +1,30 @@
+from __future__ import annotations
+
 import threading
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
+
+from .text_chunking import token_windows
+
+if TYPE_CHECKING:  # torch / sentence-transformers load on first use, not at API import
+    from sentence_transformers import SentenceTransformer
+
+    from .onnx_encoder import OnnxEncoder
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def embedding_model_id(model: str, backend: str = "torch") -> str:
+    """Tag stored with every vector (embedding_model); quantized/exported backends give (slightly) different vectors."""
+    return model if backend == "torch" else f"{model}:{backend}"
+
+
+# Generous upper bound on characters per wordpiece token. Text beyond
+# max_seq_length * CHARS_PER_TOKEN can never reach the model, so it is cut before
+# tokenizing; the tokenizer's own truncation then picks the exact window.
+CHARS_PER_TOKEN = 8
 
 
 @dataclass(slots=True)
@@ -11,40 +32,101 @@ class EmbeddingModel:
     model: str  = "sentence-transformers/all-MiniLM-L6-v2"
     device: str = "auto"
     embed_dim: int = 384
-    _model: SentenceTransformer | None = None
+    batch_size: int = 32
+    chunk_tokens: int = 200  # passage size for chunk embeddings (capped by the model's max_seq_length)
+    chunk_overlap: int = 40
+    backend: str = "torch"  # "onnx" / "onnx-int8": ONNX Runtime on CPU (exported on first load)
+    onnx_dir: str = "/tmp/onnx-models"
+    onnx_threads: int = 0  # 0 = onnxruntime default
+    _model: SentenceTransformer | OnnxEncoder | None = None
     _model_lock = threading.Lock()
     
+    def __post_init__(self) -> None:
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unsupported embedding backend: {self.backend}")
+
+    @property
+    def model_id(self) -> str:
+        return embedding_model_id(self.model, self.backend)
+
     # Internal
     def _resolve_device(self, device: str) -> str:
         """Pick an available device if 'auto' is requested."""
         if device != "auto":
             return device
+        import torch
+
         if torch.cuda.is_available():
             return "cuda"
         if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
             return "mps"
         return "cpu" 
     
-    def _get_model(self) -> SentenceTransformer:
+    def _get_model(self) -> SentenceTransformer | OnnxEncoder:
         if self._model is None:
             with self._model_lock:
                 if self._model is None:
-                    resolved = self._resolve_device(self.device)
-                    self._model = SentenceTransformer(self.model, device=resolved)
+                    if self.backend == "torch":
+                        from sentence_transformers import SentenceTransformer
+
+                        resolved = self._resolve_device(self.device)
+                        self._model = SentenceTransformer(self.model, device=resolved)
+                    else:
+                        from .onnx_encoder import OnnxEncoder
+
+                        out_dir = f"{self.onnx_dir}/{self.model.replace('/', '__')}"
+                        self._model = OnnxEncoder(
+                            self.model, out_dir, quantize=self.backend == "onnx-int8", threads=self.onnx_threads
+                        )
         return self._model
     
+    def _clip(self, model, text: str) -> str:
+        return text[:model.max_seq_length * CHARS_PER_TOKEN]
+
+    def _checked(self, vec) -> list[float]:
+        if not isinstance(vec, np.ndarray) or vec.shape[0] != self.embed_dim or not np.isfinite(vec).all():
+            return [0.0] * self.embed_dim
+        return vec.tolist()
+
     # Public
     def embed_text(self, text: str) -> list[float]:
         if not text or not text.strip():
             return [0.0]*self.embed_dim
         
-        snippet = text[:5000]
         model = self._get_model()
+        snippet = self._clip(model, text)
         # normalize_embeddings=True already L2-normalizes the output
         vec = model.encode([snippet], normalize_embeddings=True, convert_to_numpy=True)[0]
-        if not isinstance(vec, np.ndarray) or vec.shape[0] != self.embed_dim or not np.isfinite(vec).all():
-            return [0.0] * self.embed_dim
-        return vec.tolist()
+        return self._checked(vec)
 
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed many texts with a single encode call; blank inputs map to zero vectors.
 
+        encode() sorts inputs by length before batching (both backends), so each
+        batch pads to similar lengths.
+        """
+        out: list[list[float]] = [[0.0] * self.embed_dim for _ in texts]
+        idx = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not idx:
+            return out
+        model = self._get_model()
+        vecs = model.encode(
+            [self._clip(model, texts[i]) for i in idx],
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        for i, vec in zip(idx, vecs, strict=True):
+            out[i] = self._checked(vec)
+        return out
 
+    def chunk_text(self, text: str) -> list[str]:
+        """Overlapping, token-bounded passages covering the whole text (no truncation)."""
+        if not text or not text.strip():
+            return []
+        model = self._get_model()
+        # leave room for [CLS]/[SEP] so every chunk fits one forward pass untruncated
+        max_tokens = max(1, min(self.chunk_tokens, model.max_seq_length - 2))
+        enc = model.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        spans = token_windows(enc["offset_mapping"], max_tokens, self.chunk_overlap)
+        return [text[a:b] for a, b in spans if text[a:b].strip()]
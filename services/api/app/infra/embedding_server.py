@@ -0,0 +1,130 @@
+"""
+Local embedding server: one model process shared by every API worker on the host.
+
+Owns a single EmbeddingModel behind the micro-batcher, so concurrent requests
+from all uvicorn workers end up in shared forward passes. Plain stdlib HTTP,
+over a Unix socket or localhost TCP; RemoteEmbeddingModel is the client.
+
+    POST /embed  {"texts": [...]}  -> {"model_id", "dim", "data": base64 float32 [n, dim]}
+    POST /chunk  {"text": "..."}   -> {"chunks": [...]}
+    GET  /health                   -> {"model_id", "batching": {...}}
+
+Run (from services/api):
+    python -m app.infra.embedding_server --socket /tmp/cargorisk-embed.sock
+    python -m app.infra.embedding_server --host 127.0.0.1 --port 8081
+"""
+import argparse
+import base64
+import json
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from ..core.logging import get_logger, setup_logging
+from ..domain.ports import EmbeddingModelPort
+
+log = get_logger("infra.embedding_server")
+
+MODEL_ID_HEADER = "X-Model-Id"
+
+
+def encode_vectors(vecs: list[list[float]]) -> str:
+    return base64.b64encode(np.asarray(vecs, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_vectors(data: str, n: int) -> list[list[float]]:
+    if n == 0:
+        return []
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).reshape(n, -1).tolist()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: clients hold one connection per thread
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            return self._send(404, {"detail": "Not found"})
+        embedder = self.server.embedder
+        stats = embedder.stats() if hasattr(embedder, "stats") else None
+        self._send(200, {"model_id": embedder.model_id, "batching": stats})
+
+    def do_POST(self) -> None:
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._send(400, {"detail": "Invalid JSON"})
+        embedder = self.server.embedder
+        try:
+            if self.path == "/embed":
+                texts = body.get("texts")
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    return self._send(400, {"detail": "texts must be a list of strings"})
+                vecs = embedder.embed_texts(texts)
+                dim = len(vecs[0]) if vecs else 0
+                return self._send(200, {"model_id": embedder.model_id, "dim": dim, "data": encode_vectors(vecs)})
+            if self.path == "/chunk":
+                text = body.get("text")
+                if not isinstance(text, str):
+                    return self._send(400, {"detail": "text must be a string"})
+                return self._send(200, {"chunks": embedder.chunk_text(text)})
+        except Exception as e:
+            log.error("embed_server_failed", extra={"path": self.path, "exc": e.__class__.__name__})
+            return self._send(500, {"detail": "Embedding failed"})
+        self._send(404, {"detail": "Not found"})
+
+    def _send(self, status: int, payload: dict) -> None:
+        raw = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.send_header(MODEL_ID_HEADER, self.server.embedder.model_id)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args) -> None:
+        pass  # one line per request is too chatty; failures are logged above
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(embedder: EmbeddingModelPort, host: str = "127.0.0.1", port: int = 8081, socket_path: str | None = None):
+    """Bound (not yet serving) server; call serve_forever() / shutdown() on it."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a previous run
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.embedder = embedder
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--socket", help="Unix socket path (preferred on a single host)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    args = ap.parse_args()
+    setup_logging()
+
+    from ..core.deps import get_local_embedding_model
+
+    embedder = get_local_embedding_model()
+    embedder.embed_texts(["warmup"])  # load the model before accepting traffic
+    server = make_server(embedder, host=args.host, port=args.port, socket_path=args.socket)
+    log.info("embed_server_listening", extra={"address": args.socket or f"{args.host}:{args.port}", "model_id": embedder.model_id})
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
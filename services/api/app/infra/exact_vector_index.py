@@ -0,0 +1,191 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.logging import get_logger
+
+log = get_logger("infra.exact_index")
+
+
+class ExactVectorIndex:
+    """
+    In-process copy of all media_assets embeddings for exact top-k search.
+
+    Refreshes are deltas keyed on media_assets.embedded_at, which every write of
+    `embedding` stamps with clock_timestamp(): rows embedded out of id order,
+    re-embedded rows and cleared embeddings all show up in the next delta. Each
+    delta re-reads `lag_s` before the previous refresh, because a row is stamped
+    before its transaction commits. A full rebuild every `rebuild_s` seconds
+    still catches deleted rows. Vectors are L2-normalized float32, so one matmul
+    gives cosine similarity for all rows.
+
+    Config:
+      max_bytes: memory cap for the matrix; above it the index disables itself
+                 and callers fall back to SQL
+      refresh_s: min seconds between delta refreshes
+      rebuild_s: seconds between full rebuilds
+      lag_s: overlap between deltas, longer than an embed transaction takes to commit
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        max_bytes: int = 256 * 1024 * 1024,
+        refresh_s: float = 5.0,
+        rebuild_s: float = 600.0,
+        batch: int = 5000,
+        lag_s: float = 30.0,
+    ) -> None:
+        self.dim = dim
+        self.max_bytes = max_bytes
+        self.refresh_s = refresh_s
+        self.rebuild_s = rebuild_s
+        self.batch = batch
+        self.lag_s = lag_s
+        self._ids = np.empty(0, dtype=np.int64)  # sorted ascending
+        self._mat = np.empty((0, dim), dtype=np.float32)
+        self._since: datetime | None = None  # database clock at the start of the last refresh
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self.over_budget = False
+
+    @property
+    def size(self) -> int:
+        return int(self._ids.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._mat.nbytes + self._ids.nbytes)
+
+    def usable(self) -> bool:
+        return not self.over_budget and self.size > 0
+
+    def due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_s
+
+    def refresh(self, db: Session, force: bool = False, wait: bool = True) -> None:
+        """Apply rows embedded since the last refresh; wait=False returns at once if another refresh runs."""
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < self.refresh_s:
+            return
+        if not self._lock.acquire(blocking=wait):
+            return  # searches keep using the current snapshot
+        try:
+            if not force and now - self._refreshed_at < self.refresh_s:
+                return
+            if self.over_budget and now - self._built_at < self.rebuild_s:
+                return  # retry only on the next full rebuild
+            rebuild = self._since is None or now - self._built_at >= self.rebuild_s
+            started = db.execute(text("SELECT clock_timestamp()")).scalar_one()
+            if rebuild:
+                # count first: an over-budget corpus is not worth reading
+                total = db.execute(text("SELECT count(*) FROM media_assets WHERE embedding IS NOT NULL")).scalar_one()
+                if total * self._row_bytes > self.max_bytes:
+                    self._disable(total)
+                    return
+                ids, mat = np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+                changed_ids, new_ids, new_vecs = self._fetch(db, None)
+            else:
+                ids, mat = self._ids, self._mat
+                changed_ids, new_ids, new_vecs = self._fetch(db, self._since - timedelta(seconds=self.lag_s))
+                if changed_ids:
+                    # re-embedded or cleared rows: drop the old vectors, re-add the current ones below
+                    keep = ~np.isin(ids, np.asarray(changed_ids, dtype=np.int64))
+                    ids, mat = ids[keep], mat[keep]
+
+            if ids.shape[0] + len(new_ids) > self.max_bytes // self._row_bytes:
+                self._disable(ids.shape[0] + len(new_ids))
+                return
+            if new_ids:
+                block = np.vstack(new_vecs)
+                norms = np.linalg.norm(block, axis=1, keepdims=True)
+                block /= np.where(norms > 0, norms, 1.0)
+                ids = np.concatenate([ids, np.asarray(new_ids, dtype=np.int64)])
+                mat = np.vstack([mat, block])
+                order = np.argsort(ids, kind="stable")
+                ids, mat = ids[order], mat[order]
+
+            self._ids, self._mat, self._since = ids, mat, started
+            self._refreshed_at = now
+            if rebuild:
+                self._built_at = now
+                self.over_budget = False
+            if changed_ids or rebuild:
+                log.info(
+                    "exact_index_refresh",
+                    extra={"rows": self.size, "changed": len(changed_ids), "rebuild": rebuild, "bytes": self.nbytes},
+                )
+        finally:
+            self._lock.release()
+
+    def search(self, qvec: list[float], k: int, metric: str = "cosine") -> list[tuple[int, float]]:
+        """Exact top-k as (id, distance); distances follow the SQL conventions for `metric`."""
+        ids, mat = self._ids, self._mat  # snapshot; refresh swaps whole arrays
+        n = ids.shape[0]
+        if n == 0 or k <= 0:
+            return []
+        q = np.asarray(qvec, dtype=np.float32)
+        qn = np.linalg.norm(q)
+        if qn > 0:
+            q = q / qn
+        sims = mat @ q
+        k = min(k, n)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.lexsort((ids[top], -sims[top]))]
+        s = sims[top].astype(np.float64)
+        if metric == "l2":
+            dist = np.sqrt(np.maximum(0.0, 2.0 - 2.0 * s))
+        else:
+            # cosine distance; for "ip" this equals the shifted (<#> + 1) value on unit vectors
+            dist = 1.0 - s
+        return [(int(i), float(d)) for i, d in zip(ids[top], dist, strict=True)]
+
+    def stats(self) -> dict:
+        return {
+            "rows": self.size,
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "since": self._since.isoformat() if self._since else None,
+            "over_budget": self.over_budget,
+        }
+
+    def _disable(self, rows: int) -> None:
+        self._ids = np.empty(0, dtype=np.int64)
+        self._mat = np.empty((0, self.dim), dtype=np.float32)
+        self._since = None
+        self.over_budget = True
+        self._built_at = self._refreshed_at = time.monotonic()
+        log.warning("exact_index_over_budget", extra={"rows": rows, "max_bytes": self.max_bytes})
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * 4 + 8
+
+    def _fetch(self, db: Session, since: datetime | None) -> tuple[list[int], list[int], list[np.ndarray]]:
+        """(every id read, ids with a vector, their vectors); since=None reads all embedded rows."""
+        where = "embedding IS NOT NULL" if since is None else "embedded_at > :since"
+        changed_ids, new_ids, new_vecs = [], [], []
+        after = 0
+        while True:
+            rows = db.execute(
+                text(f"""
+                    SELECT id, embedding FROM media_assets
+                    WHERE {where} AND id > :after
+                    ORDER BY id
+                    LIMIT :batch
+                """),
+                {"since": since, "after": after, "batch": self.batch},
+            ).all()
+            if not rows:
+                return changed_ids, new_ids, new_vecs
+            for row_id, emb in rows:
+                changed_ids.append(row_id)
+                if emb is not None:
+                    new_ids.append(row_id)
+                    new_vecs.append(np.asarray(emb, dtype=np.float32))
+            after = rows[-1][0]
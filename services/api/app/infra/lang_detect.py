@@ -0,0 +1,46 @@
+import re
+from collections.abc import Sequence
+
+# Frequent function words per Tesseract language code. Words both languages use
+# ("for", "per", "at", "under") are left out so they count for neither.
+STOPWORDS: dict[str, frozenset[str]] = {
+    "eng": frozenset(
+        "the and of in is are be this that with from by on as or will shall all any not an "
+        "which subject charges included including rates valid until applies".split()
+    ),
+    "nor": frozenset(
+        "og av til på med er som det den de et en ikke fra eller skal kan ved pr alle hvis om "
+        "gjelder inkl inkludert priser gyldig tillegg etter vil blir har".split()
+    ),
+}
+# letters only one candidate writes; OCR with the other model may drop them, so they count as extra evidence
+MARKER_CHARS: dict[str, str] = {"nor": "æøå"}
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def pick_languages(
+    text: str,
+    candidates: Sequence[str] = ("eng", "nor"),
+    min_hits: int = 8,
+    minor_share: float = 0.1,
+) -> str | None:
+    """
+    Smallest "+"-joined subset of `candidates` that the text is written in, or None when unsure.
+
+    Counts stopword hits (plus marker letters) per language. A language is kept when it
+    has at least `minor_share` of the hits, so a rate sheet with a few Norwegian terms
+    stays "eng" while a genuinely bilingual one keeps both. None when there are fewer
+    than `min_hits` hits in total or a candidate has no word list.
+    """
+    if any(c not in STOPWORDS for c in candidates):
+        return None
+    words = _WORD_RE.findall(text.lower())
+    hits = {c: sum(w in STOPWORDS[c] for w in words) for c in candidates}
+    for c, chars in MARKER_CHARS.items():
+        if c in hits:
+            hits[c] += sum(any(ch in w for ch in chars) for w in words)
+    total = sum(hits.values())
+    if total < min_hits:
+        return None
+    return "+".join(c for c in candidates if hits[c] / total >= minor_share)
@@ -1,9 +1,45 @@
+from __future__ import annotations
+
 import io
+import math
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .lang_detect import pick_languages
+from .ocr_page_cache import OcrPageCache, page_key
+from .tesseract_pool import TesseractApiPool, parse_tesseract_config
+
+if TYPE_CHECKING:  # PyMuPDF / Tesseract / openpyxl / Pillow load on first use, not at API import
+    from PIL import Image
+
+log = get_logger("infra.ocr")
+
+PROBE_DPI = 72  # low-res render used to estimate text line height
+OCR_BACKENDS = ("pytesseract", "tesserocr")  # tesserocr: pooled in-process Tesseract handles
+LANG_SAMPLE_PAGES = 3  # leading PDF pages read for language detection
+LANG_SAMPLE_CHARS = 400  # native text that is enough to judge without OCR
+LANG_SAMPLE_BAND = (0.3, 0.55)  # slice of a scanned page OCRed for detection (fractions of its height)
+
 
-import fitz  # PyMuPDF
-import pytesseract
-from openpyxl import load_workbook
-from PIL import Image, ImageFilter, ImageOps
+@dataclass(slots=True)
+class _Page:
+    no: int
+    result: Future | tuple[str, float, int] | str  # str: native text or page-cache hit
+    key: str | None = None  # page-cache key to store the OCR text under
+    dpi: int = 0
+    render_ms: float = 0.0
 
 
 class OcrEngine:
@@ -18,41 +54,174 @@ class OcrEngine:
       pdf_dpi: rasterization DPI when OCRing image-only PDF pages
       oem: Tesseract OCR Engine Mode (default 3: default)
       psm: Page segmentation mode (default 6: Assume a single uniform block of text)
+      workers: processes OCRing image-only PDF pages in parallel (<= 1: in-process, one page at a time)
+      max_inflight_pages: rasterized pages queued or in OCR at once, bounds memory (0 = 2 * workers)
+      page_cache: persistent OCR results per rendered page (skips Tesseract for repeated pages)
+      adaptive_dpi: pick the DPI per page so text lines are ~target_line_px tall (pdf_dpi if no text is found)
+      min_dpi / max_dpi: clamp for the adaptive DPI
+      max_page_pixels: pixel budget per rendered page; large pages get a lower DPI instead of more memory
+      backend: "pytesseract" (a tesseract process per page) or "tesserocr" (initialized handles kept per process)
+      tesserocr_handles: live handles per language set and process (tesserocr backend)
     """
 
-    def __init__(self, lang: str = "eng+nor", pdf_dpi: int = 200, oem: int = 3, psm: int = 6) -> None:
+    def __init__(
+        self,
+        lang: str = "eng+nor",
+        pdf_dpi: int = 200,
+        oem: int = 3,
+        psm: int = 6,
+        workers: int = 1,
+        max_inflight_pages: int = 0,
+        page_cache: OcrPageCache | None = None,
+        adaptive_dpi: bool = False,
+        min_dpi: int = 150,
+        max_dpi: int = 300,
+        target_line_px: int = 20,
+        max_page_pixels: int = 16_000_000,
+        backend: str = "pytesseract",
+        tesserocr_handles: int = 1,
+    ) -> None:
+        if backend not in OCR_BACKENDS:
+            raise ValueError(f"Unsupported OCR backend: {backend}")
         self.lang = lang
         self.pdf_dpi = pdf_dpi
         self._tesseract_config = f"--oem {oem} --psm {psm}"
-
+        self.workers = max(1, int(workers))
+        self.max_inflight_pages = max(1, int(max_inflight_pages) or 2 * self.workers)
+        self.page_cache = page_cache
+        self.adaptive_dpi = adaptive_dpi
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.target_line_px = target_line_px
+        self.max_page_pixels = max_page_pixels
+        self.backend = backend
+        self.tesserocr_handles = tesserocr_handles
+        if backend == "tesserocr":
+            configure_tesseract_pool(tesserocr_handles)  # in-process pages (workers <= 1, images)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
 
     def pdf_bytes_to_text(self, pdf_bytes: bytes, lang: str | None = None) -> str:
-        eff_lang = (lang or self.lang)
-        parts: list[str] = []
+        return "\n".join(text for _, text in self.iter_pdf_pages(pdf_bytes, lang=lang)).strip()
+
+    def pdf_page_count(self, pdf_bytes: bytes) -> int:
+        import fitz  # PyMuPDF
+
         with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-            for page in doc:
-                # 1) Try native text (fast & accurate for digital PDFs)
-                native = page.get_text("text") or ""
-                if native.strip():
-                    parts.append(native)
-                    continue
+            return doc.page_count
+
+    def iter_pdf_pages(
+        self, pdf_bytes: bytes, lang: str | None = None, skip: frozenset[int] = frozenset()
+    ) -> Iterator[tuple[int, str]]:
+        """
+        (page index, text) for every page not in `skip`, in page order.
+
+        Native-text pages are returned as-is; image-only pages are rasterized here,
+        looked up in the page cache and otherwise OCRed on the worker pool. At most
+        max_inflight_pages rasters are queued at a time: when the window is full,
+        the oldest page is awaited first.
+        """
+        import fitz  # PyMuPDF
+
+        eff_lang = (lang or self.lang)
+        window: deque[_Page] = deque()
+        inflight = 0
+        try:
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+                for i, page in enumerate(doc):
+                    if i in skip:
+                        continue
+                    # 1) Try native text (fast & accurate for digital PDFs)
+                    native = page.get_text("text") or ""
+                    if native.strip():
+                        window.append(_Page(i, native))
+                    else:
+                        # 2) Rasterize + OCR for image-only pages
+                        while inflight >= self.max_inflight_pages:
+                            inflight -= isinstance(window[0].result, Future)
+                            yield self._pop(window)
+                        window.append(self._render_and_ocr(fitz, page, i, eff_lang))
+                        inflight += isinstance(window[-1].result, Future)
+                    # hand back everything at the head that is already finished
+                    while window and not (isinstance(window[0].result, Future) and not window[0].result.done()):
+                        inflight -= isinstance(window[0].result, Future)
+                        yield self._pop(window)
+                while window:
+                    yield self._pop(window)
+        except BrokenProcessPool:
+            self.close()  # a worker died (OOM, segfault): the next document gets a fresh pool
+            raise
+        finally:
+            for p in window:  # consumer stopped early or a page failed
+                if isinstance(p.result, Future):
+                    p.result.cancel()
+
+    def page_dpi(self, fitz, page) -> int:
+        """Render DPI for an image-only page: from its estimated line height, capped by the pixel budget."""
+        dpi = float(self.pdf_dpi)
+        if self.adaptive_dpi:
+            probe = page.get_pixmap(dpi=PROBE_DPI, colorspace=fitz.csGRAY, alpha=False)
+            gray = np.frombuffer(probe.samples_mv, dtype=np.uint8).reshape(probe.height, probe.stride)[:, :probe.width]
+            line_px = line_height_px(gray)
+            if line_px:
+                line_pt = line_px * 72 / PROBE_DPI
+                dpi = min(max(self.target_line_px * 72 / line_pt, self.min_dpi), self.max_dpi)
+        area_in2 = (page.rect.width / 72) * (page.rect.height / 72)
+        if area_in2 > 0:
+            dpi = min(dpi, math.sqrt(self.max_page_pixels / area_in2))
+        return max(int(dpi), 36)
+
+    def detect_lang(self, blob: bytes, mime: str) -> str:
+        """
+        Smallest subset of self.lang the document is written in; self.lang when unsure.
+
+        Judged on native PDF text when the first pages have enough of it. Otherwise
+        a horizontal band of one scanned page (LANG_SAMPLE_BAND, below letterheads
+        and logos) is OCRed with the first language only, which costs about a
+        quarter of a single-language pass over that page.
+        """
+        candidates = self.lang.split("+")
+        if len(candidates) < 2:
+            return self.lang
+        if mime.startswith("image/"):
+            from PIL import Image
+
+            sample = self._lang_sample_ocr(Image.open(io.BytesIO(blob)).convert("L"), candidates[0])
+        elif mime == "application/pdf":
+            sample = self._pdf_lang_sample(blob, candidates[0])
+        else:
+            return self.lang
+        picked = pick_languages(sample, candidates) or self.lang
+        log.info("ocr_lang_detected", extra={"lang": picked, "sample_chars": len(sample)})
+        return picked
 
-                # 2) Rasterize + OCR for image-only pages
-                pix = page.get_pixmap(dpi=self.pdf_dpi, alpha=False)
-                img = Image.open(io.BytesIO(pix.tobytes("png"))).convert("RGB")
-                parts.append(self._ocr_image(img, lang=eff_lang))
-        return "\n".join(parts).strip()
+    def cache_stats(self) -> dict | None:
+        return self.page_cache.stats() if self.page_cache else None
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
 
     def image_bytes_to_text(self, img_bytes: bytes, lang: str | None = None) -> str:
+        from PIL import Image
+
         eff_lang = (lang or self.lang)
-        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        return self._ocr_image(img, lang=eff_lang).strip()
+        img = Image.open(io.BytesIO(img_bytes)).convert("L")
+        done, key = self._ocr_raster_cached((img.width, img.height, img.width, img.tobytes()), eff_lang, inline=True)
+        text = done if isinstance(done, str) else done[0]
+        if key:
+            self.page_cache.put(key, text)
+        return text.strip()
 
     def xlsx_bytes_to_text(self, xlsx_bytes: bytes, max_cells: int = 2000) -> str:
         """
         Extracts text from an XLSX/XLSM file (all sheets) and flattens to a string.
         Limits cells to avoid huge payloads for embedding/search.
         """
+        from openpyxl import load_workbook
+
         wb = load_workbook(io.BytesIO(xlsx_bytes), data_only=True, read_only=True)
         parts: list[str] = []
         cells_seen = 0
@@ -74,10 +243,169 @@ class OcrEngine:
 
 
     def _ocr_image(self, img: Image.Image, lang: str) -> str:
-        # light denoise and contrast enhancement
-        gray = img.convert("L")
-        gray = ImageOps.autocontrast(gray)
-        gray = gray.filter(ImageFilter.MedianFilter(size=3))
-        return pytesseract.image_to_string(gray, lang=lang, config=self._tesseract_config)
+        return ocr_image(img, lang, self._tesseract_config, self.backend)
 
+    def _pdf_lang_sample(self, pdf_bytes: bytes, lang: str) -> str:
+        import fitz  # PyMuPDF
 
+        native: list[str] = []
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            scanned = None
+            for i in range(min(doc.page_count, LANG_SAMPLE_PAGES)):
+                text = doc[i].get_text("text") or ""
+                if text.strip():
+                    native.append(text)
+                elif scanned is None:
+                    scanned = i
+            if sum(map(len, native)) >= LANG_SAMPLE_CHARS or scanned is None:
+                return "\n".join(native)
+            from PIL import Image
+
+            page = doc[scanned]
+            pix = page.get_pixmap(dpi=self.page_dpi(fitz, page), colorspace=fitz.csGRAY, alpha=False)
+            img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+            return self._lang_sample_ocr(img, lang)
+
+    def _lang_sample_ocr(self, img: Image.Image, lang: str) -> str:
+        top, bottom = LANG_SAMPLE_BAND
+        band = img.crop((0, int(img.height * top), img.width, int(img.height * bottom)))
+        return self._ocr_image(band, lang)
+
+    def _render_and_ocr(self, fitz, page, page_no: int, lang: str) -> _Page:
+        start = time.perf_counter()
+        dpi = self.page_dpi(fitz, page)
+        # grayscale straight from MuPDF: no RGB frame, no PNG round-trip
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        # a view is enough in-process; the pool needs bytes it can pickle
+        samples = pix.samples_mv if self.workers <= 1 else pix.samples
+        raster = (pix.width, pix.height, pix.stride, samples)
+        render_ms = (time.perf_counter() - start) * 1000
+        result, key = self._ocr_raster_cached(raster, lang)
+        return _Page(page_no, result, key=key, dpi=dpi, render_ms=render_ms)
+
+    def _ocr_raster_cached(self, raster: tuple, lang: str, inline: bool = False) -> tuple[Future | tuple | str, str | None]:
+        """Cached text, or the OCR result / pending future plus the cache key to store it under."""
+        key = None
+        if self.page_cache is not None:
+            key = page_key(raster[0], raster[1], raster[3], lang, self._tesseract_config)
+            hit = self.page_cache.get(key)
+            if hit is not None:
+                return hit, None
+        if self.workers > 1 and not inline:
+            return self._pool().submit(ocr_raster_timed, raster, lang, self._tesseract_config, self.backend), key
+        return ocr_raster_timed(raster, lang, self._tesseract_config, self.backend), key
+
+    def _pop(self, window: deque[_Page]) -> tuple[int, str]:
+        p = window.popleft()
+        done = p.result.result() if isinstance(p.result, Future) else p.result
+        if isinstance(done, str):
+            if p.dpi:
+                log.info("ocr_page", extra={"page": p.no, "dpi": p.dpi, "render_ms": round(p.render_ms, 1), "cached": True})
+            return p.no, done
+        text, ocr_ms, peak_rss_kb = done
+        if p.key:
+            self.page_cache.put(p.key, text)
+        log.info(
+            "ocr_page",
+            extra={
+                "page": p.no,
+                "dpi": p.dpi,
+                "render_ms": round(p.render_ms, 1),
+                "ocr_ms": round(ocr_ms, 1),
+                "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+                "cached": False,
+            },
+        )
+        return p.no, text
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a threaded API/worker process is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.backend, self.tesserocr_handles),
+                    )
+                    log.info("ocr_pool_started", extra={"workers": self.workers, "max_inflight_pages": self.max_inflight_pages})
+        return self._executor
+
+
+# Worker-side functions (module level so the process pool can pickle them)
+def _init_worker(backend: str = "pytesseract", tesserocr_handles: int = 1) -> None:
+    # one page per process: Tesseract's own OpenMP threads would oversubscribe the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if backend == "tesserocr":
+        configure_tesseract_pool(tesserocr_handles)
+
+
+_tesseract_pool: TesseractApiPool | None = None
+_tesseract_pool_lock = threading.Lock()
+
+
+def configure_tesseract_pool(handles_per_key: int = 1) -> TesseractApiPool:
+    """This process's handle pool (created once; later calls return it unchanged)."""
+    global _tesseract_pool
+    with _tesseract_pool_lock:
+        if _tesseract_pool is None:
+            _tesseract_pool = TesseractApiPool(handles_per_key=handles_per_key)
+        return _tesseract_pool
+
+
+def ocr_image(img: Image.Image, lang: str, config: str, backend: str = "pytesseract") -> str:
+    from PIL import ImageFilter, ImageOps
+
+    # light denoise and contrast enhancement
+    gray = img if img.mode == "L" else img.convert("L")
+    gray = ImageOps.autocontrast(gray)
+    gray = gray.filter(ImageFilter.MedianFilter(size=3))
+    if backend == "tesserocr":
+        oem, psm = parse_tesseract_config(config)
+        with configure_tesseract_pool().acquire(lang, oem, psm) as api:
+            api.SetImage(gray)
+            return api.GetUTF8Text()
+
+    import pytesseract
+
+    return pytesseract.image_to_string(gray, lang=lang, config=config)
+
+
+def ocr_raster(raster: tuple, lang: str, config: str, backend: str = "pytesseract") -> str:
+    """OCR one rendered grayscale page given as (width, height, stride, samples)."""
+    from PIL import Image
+
+    width, height, stride, samples = raster
+    try:
+        # wraps the samples buffer without copying it
+        img = Image.frombuffer("L", (width, height), samples, "raw", "L", stride, 1)
+        return ocr_image(img, lang, config, backend)
+    except Exception as e:
+        # pytesseract's exceptions don't survive pickling and would break the whole pool
+        raise RuntimeError(f"{e.__class__.__name__}: {e}") from None
+
+
+def ocr_raster_timed(raster: tuple, lang: str, config: str, backend: str = "pytesseract") -> tuple[str, float, int]:
+    """(text, OCR ms, peak RSS of this process in KiB)."""
+    start = time.perf_counter()
+    text = ocr_raster(raster, lang, config, backend)
+    return text, (time.perf_counter() - start) * 1000, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def line_height_px(gray: np.ndarray, ink: int = 128) -> float | None:
+    """
+    Median height of text lines in a grayscale page, from the horizontal ink profile.
+
+    Rows with a little dark ink form runs; each run is a text line. None when the
+    page has too few lines to say (blank page, photo).
+    """
+    if gray.size == 0:
+        return None
+    inked = (gray < ink).mean(axis=1) > 0.005
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inked.astype(np.int8), [0]))))
+    runs = edges[1::2] - edges[::2]
+    runs = runs[runs >= 2]  # specks and rules
+    if len(runs) < 3:
+        return None
+    return float(np.median(runs))
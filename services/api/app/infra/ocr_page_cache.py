@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from ..core.logging import get_logger
+
+log = get_logger("infra.ocr_page_cache")
+
+
+def page_key(width: int, height: int, pixels: bytes, lang: str, config: str) -> str:
+    """Identity of one OCR result: the rendered pixels plus everything that changes Tesseract's output."""
+    h = hashlib.sha256()
+    h.update(f"{width}x{height}|{lang}|{config}|".encode())
+    h.update(pixels)
+    return h.hexdigest()
+
+
+class OcrPageCache:
+    """
+    Persistent page-level OCR cache: one small UTF-8 file per page under `root`.
+
+    Keyed by page_key(), so the same cover or T&C page inside a new PDF (new
+    sha256) is a hit. Files are written atomically (tmp + rename), which makes
+    the directory safe to share between API workers. Reads refresh the file's
+    mtime; when the directory grows past max_bytes the least recently used
+    files are deleted down to 90% of it.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self.bytes = sum(size for _, size, _ in self._scan())
+
+    # Public
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # LRU clock
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        data = text.encode("utf-8")
+        try:
+            old = os.path.getsize(path)  # overwrite of the same page: only the difference is new
+        except OSError:
+            old = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("ocr_page_cache_write_failed", extra={"error": e.__class__.__name__})
+            return
+        with self._lock:
+            self.bytes += len(data) - old
+            over = self.max_bytes and self.bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "dir": self.root,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # Internal
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        out = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # evicted by another worker
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _evict(self) -> None:
+        # rescan: other workers write to the same directory
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.bytes = total
+            self.evictions += evicted
+        log.info("ocr_page_cache_evicted", extra={"files": evicted, "bytes": total})
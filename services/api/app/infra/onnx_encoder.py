@@ -0,0 +1,130 @@
+import inspect
+import os
+import threading
+
+import numpy as np
+
+from ..core.logging import get_logger
+from .text_chunking import length_buckets
+
+log = get_logger("infra.onnx_encoder")
+
+_export_lock = threading.Lock()
+
+
+def export_onnx(model_name: str, out_dir: str, quantize: bool = False) -> str:
+    """
+    Export a sentence-transformers model's transformer to ONNX (once) and return the file path.
+
+    Pooling and normalization stay in numpy (see OnnxEncoder), so only the
+    transformer body is exported. With quantize=True the weights are dynamically
+    quantized to int8 (activations stay float, no calibration data needed).
+    """
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model_int8.onnx")
+    path = int8_path if quantize else fp32_path
+    if os.path.exists(path):
+        return path
+
+    with _export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(out_dir, exist_ok=True)
+        if not os.path.exists(fp32_path):
+            _export_fp32(model_name, out_dir, fp32_path)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            log.info("onnx_quantized", extra={"model": model_name, "path": int8_path})
+    return path
+
+
+def _export_fp32(model_name: str, out_dir: str, path: str) -> None:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    tokenizer = st.tokenizer
+    sample = tokenizer(["container detention and demurrage"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class _Body(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(names, inputs, strict=True)))[0]
+
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False  # classic exporter: no onnxscript dependency
+    axes = {n: {0: "batch", 1: "seq"} for n in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Body(st[0].auto_model.eval()),
+            tuple(sample[n] for n in names),
+            path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=14,
+            **kwargs,
+        )
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "max_seq_length"), "w") as f:
+        f.write(str(st.max_seq_length))
+    log.info("onnx_exported", extra={"model": model_name, "path": path})
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime stand-in for SentenceTransformer on CPU.
+
+    Exposes the subset EmbeddingModel uses (encode, tokenizer, max_seq_length)
+    and reproduces the MiniLM pipeline: transformer -> attention-masked mean
+    pooling -> L2 normalization.
+    """
+
+    def __init__(self, model_name: str, out_dir: str, quantize: bool = False, threads: int = 0) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = export_onnx(model_name, out_dir, quantize=quantize)
+        opts = ort.SessionOptions()
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+        with open(os.path.join(out_dir, "max_seq_length")) as f:
+            self.max_seq_length = int(f.read().strip())
+
+    def encode(
+        self,
+        sentences: list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        vecs = np.zeros((len(sentences), 0), dtype=np.float32)
+        for bucket in length_buckets([len(s) for s in sentences], batch_size):
+            enc = self.tokenizer(
+                [sentences[i] for i in bucket],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {n: enc[n].astype(np.int64) for n in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if not vecs.shape[1]:
+                vecs = np.zeros((len(sentences), pooled.shape[1]), dtype=np.float32)
+            vecs[bucket] = pooled
+        if normalize_embeddings and vecs.size:
+            vecs /= np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+        return vecs
@@ -0,0 +1,86 @@
+import hashlib
+
+import numpy as np
+
+from ..core.cache import TtlLruCache
+from ..core.logging import get_logger
+
+log = get_logger("infra.query_cache")
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings:
+      - L1: bounded in-process LRU with TTL (per uvicorn worker)
+      - L2: optional Redis, shared by all workers; vectors stored as float32 bytes
+
+    Keys combine the model id with the normalized query (case-folded, whitespace
+    collapsed), so switching models never serves stale vectors.
+    """
+
+    def __init__(self, model_id: str, maxsize: int = 1024, ttl_s: float = 600.0, redis_url: str | None = None) -> None:
+        self.model_id = model_id
+        self.ttl_s = ttl_s
+        self._local = TtlLruCache(maxsize=maxsize, ttl_s=ttl_s)
+        self._redis = None
+        self.redis_hits = 0
+        self.redis_errors = 0
+        if redis_url:
+            import redis  # optional tier; only needed when enabled
+
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05, socket_connect_timeout=0.05)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def key(self, query: str) -> str:
+        digest = hashlib.sha256(self.normalize(query).encode("utf-8")).hexdigest()
+        return f"qemb:{self.model_id}:{digest}"
+
+    def get_local(self, query: str) -> list[float] | None:
+        """L1 only: never touches the network, safe to call on the event loop."""
+        return self._local.get(self.key(query))
+
+    def get(self, query: str) -> list[float] | None:
+        vec = self.get_local(query)
+        return vec if vec is not None else self.get_remote(query)
+
+    def get_remote(self, query: str) -> list[float] | None:
+        """L2 only, for callers that already missed L1 via get_local(); a hit is copied into L1."""
+        if self._redis is None:
+            return None
+        k = self.key(query)
+        try:
+            raw = self._redis.get(k)
+        except Exception as e:
+            self.redis_errors += 1
+            log.warning("query_cache_redis_get_failed", extra={"error": e.__class__.__name__})
+            return None
+        if raw is None:
+            return None
+        self.redis_hits += 1
+        vec = np.frombuffer(raw, dtype=np.float32).tolist()
+        self._local.set(k, vec)
+        return vec
+
+    def put(self, query: str, vec: list[float]) -> None:
+        k = self.key(query)
+        self._local.set(k, vec)
+        if self._redis is None:
+            return
+        try:
+            ttl = int(self.ttl_s) if self.ttl_s > 0 else None
+            self._redis.set(k, np.asarray(vec, dtype=np.float32).tobytes(), ex=ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            log.warning("query_cache_redis_set_failed", extra={"error": e.__class__.__name__})
+
+    def stats(self) -> dict:
+        return {
+            "model_id": self.model_id,
+            **self._local.stats(),
+            "redis": self._redis is not None,
+            "redis_hits": self.redis_hits,
+            "redis_errors": self.redis_errors,
+        }
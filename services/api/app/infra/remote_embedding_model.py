@@ -0,0 +1,154 @@
+import http.client
+import json
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+from ..core.logging import get_logger
+from ..domain.ports import EmbeddingModelPort
+from .embedding_server import MODEL_ID_HEADER, decode_vectors
+
+log = get_logger("infra.remote_embedding")
+
+
+class RemoteEmbeddingError(RuntimeError):
+    pass
+
+
+class RemoteRequestError(RemoteEmbeddingError):
+    """The server answered but rejected this one request (4xx, or 500 on a bad input); it stays usable."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
+
+
+class RemoteEmbeddingModel:
+    """
+    EmbeddingModelPort client for app.infra.embedding_server.
+
+    url: "unix:///path/to.sock" or "http://127.0.0.1:8081". Every call falls back
+    to the in-process `fallback` model when the server is unreachable or answers
+    503 (then the server is retried after `retry_s`), or permanently when it serves
+    a different model id than expected, so vectors of two models never mix. A
+    request the server rejects on its own (4xx, 500) falls back for that call only.
+    A kept-alive connection the server has closed is reopened once before any of this.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model_id: str,
+        fallback: EmbeddingModelPort,
+        timeout_s: float = 10.0,
+        retry_s: float = 30.0,
+    ) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("unix", "http"):
+            raise ValueError(f"Unsupported embedding server url: {url}")
+        self.url = url
+        self._parsed = parsed
+        self._model_id = model_id
+        self.fallback = fallback
+        self.timeout_s = timeout_s
+        self.retry_s = retry_s
+        self._local = threading.local()
+        self._down_until = 0.0
+        self._disabled = False
+        self.remote_calls = 0
+        self.fallback_calls = 0
+
+    @property
+    def model_id(self) -> str:
+        return self._model_id
+
+    # Public
+    def embed_text(self, text: str) -> list[float]:
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        def remote():
+            body = self._post("/embed", {"texts": texts})
+            return decode_vectors(body["data"], len(texts))
+
+        return self._call(remote, lambda: self.fallback.embed_texts(texts))
+
+    def chunk_text(self, text: str) -> list[str]:
+        return self._call(lambda: self._post("/chunk", {"text": text})["chunks"], lambda: self.fallback.chunk_text(text))
+
+    def stats(self) -> dict:
+        return {
+            "server": self.url,
+            "remote_calls": self.remote_calls,
+            "fallback_calls": self.fallback_calls,
+            "server_usable": not self._disabled and time.monotonic() >= self._down_until,
+        }
+
+    # Internal
+    def _call(self, remote, local):
+        if not self._disabled and time.monotonic() >= self._down_until:
+            try:
+                out = remote()
+                self.remote_calls += 1
+                return out
+            except (RemoteRequestError, ValueError) as e:
+                log.warning("embed_server_request_failed", extra={"url": self.url, "error": str(e)})
+            except (OSError, http.client.HTTPException, RemoteEmbeddingError) as e:
+                self._down_until = time.monotonic() + self.retry_s
+                log.warning("embed_server_unavailable", extra={"url": self.url, "error": e.__class__.__name__, "retry_s": self.retry_s})
+        self.fallback_calls += 1
+        return local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._parsed.scheme == "unix":
+                conn = _UnixHTTPConnection(self._parsed.path, timeout=self.timeout_s)
+            else:
+                conn = http.client.HTTPConnection(self._parsed.hostname, self._parsed.port or 80, timeout=self.timeout_s)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, path: str, body: str) -> tuple[http.client.HTTPResponse, bytes]:
+        conn = self._connection()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            return resp, resp.read()
+        except Exception:
+            conn.close()
+            self._local.conn = None
+            raise
+
+    def _post(self, path: str, payload: dict) -> dict:
+        body = json.dumps(payload)
+        reused = getattr(self._local, "conn", None) is not None
+        try:
+            resp, raw = self._request(path, body)
+        except (OSError, http.client.HTTPException):
+            if not reused:
+                raise
+            # the server closed the kept-alive socket (idle timeout, restart): one retry on a fresh one
+            resp, raw = self._request(path, body)
+        served = resp.getheader(MODEL_ID_HEADER)
+        if served != self._model_id:
+            self._disabled = True
+            log.error("embed_server_model_mismatch", extra={"url": self.url, "expected": self._model_id, "served": served})
+            raise RemoteEmbeddingError(f"server runs {served}, expected {self._model_id}")
+        if resp.status == 503:
+            raise RemoteEmbeddingError("embedding server returned 503")
+        if resp.status != 200:
+            raise RemoteRequestError(f"embedding server returned {resp.status}")
+        return json.loads(raw)
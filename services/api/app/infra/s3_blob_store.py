@@ -2,13 +2,14 @@ import hashlib
 import io
 from urllib.parse import urlparse
 
-import boto3
-from botocore.client import Config
 from botocore.exceptions import ClientError, EndpointConnectionError
 
 
 class S3BlobStore:
     def __init__(self, settings):
+        import boto3  # slow import (~100 ms); only paid when the store is first built
+        from botocore.client import Config
+
         # Path-style addressing is more MinIO-friendly
         access_key = settings.s3_access_key.get_secret_value()
         secret_key = settings.s3_secret_key.get_secret_value()
@@ -0,0 +1,21 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from ..domain.ports import DocumentChunkRepo
+from ..models import DocumentChunk
+
+
+class SqlAlchemyDocumentChunkRepo(DocumentChunkRepo):
+    def replace_chunks(
+        self, db: Session, asset_id: int, chunks: list[str], embeddings: list[list[float]], model_id: str | None = None
+    ) -> None:
+        db.execute(delete(DocumentChunk).where(DocumentChunk.asset_id == asset_id))
+        if not chunks:
+            return
+        db.execute(
+            insert(DocumentChunk),
+            [
+                {"asset_id": asset_id, "chunk_index": i, "text": chunk, "embedding": emb, "embedding_model": model_id}
+                for i, (chunk, emb) in enumerate(zip(chunks, embeddings, strict=True))
+            ],
+        )
@@ -0,0 +1,47 @@
+from sqlalchemy import delete, func, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..domain.ports import DocumentPageRepo
+from ..models import DocumentPage, MediaAsset
+
+
+class SqlAlchemyDocumentPageRepo(DocumentPageRepo):
+    def begin(self, db: Session, asset_id: int, total: int, lang: str) -> set[int]:
+        """
+        Record the page count and return the pages already done with `lang` (others are dropped).
+
+        Only an incomplete run is resumed. When every page is stored and the asset
+        already has its text, the previous run finished: its pages are dropped so
+        this run OCRs the document again (e.g. after an OCR_BACKEND or DPI change).
+        """
+        has_text = db.execute(
+            update(MediaAsset).where(MediaAsset.id == asset_id).values(ocr_pages_total=total)
+            .returning(MediaAsset.ocr_text.is_not(None))
+        ).scalar_one_or_none()
+        stale = (DocumentPage.lang != lang) | (DocumentPage.page_no >= total)
+        done = set(db.execute(select(DocumentPage.page_no).where(DocumentPage.asset_id == asset_id, ~stale)).scalars())
+        if has_text and len(done) == total:
+            stale, done = true(), set()
+        db.execute(delete(DocumentPage).where(DocumentPage.asset_id == asset_id, stale))
+        return done
+
+    def save_page(self, db: Session, asset_id: int, page_no: int, lang: str, text: str) -> None:
+        stmt = insert(DocumentPage).values(asset_id=asset_id, page_no=page_no, lang=lang, text=text)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["asset_id", "page_no"],
+                set_={"lang": stmt.excluded.lang, "text": stmt.excluded.text},
+            )
+        )
+
+    def assemble(self, db: Session, asset_id: int) -> str:
+        texts = db.execute(
+            select(DocumentPage.text).where(DocumentPage.asset_id == asset_id).order_by(DocumentPage.page_no)
+        ).scalars()
+        return "\n".join(texts).strip()
+
+    def progress(self, db: Session, asset_id: int) -> tuple[int, int | None]:
+        done = db.execute(select(func.count()).where(DocumentPage.asset_id == asset_id)).scalar_one()
+        total = db.execute(select(MediaAsset.ocr_pages_total).where(MediaAsset.id == asset_id)).scalar_one_or_none()
+        return done, total
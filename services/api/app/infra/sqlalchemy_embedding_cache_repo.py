@@ -0,0 +1,32 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..domain.ports import EmbeddingCacheRepo
+from ..models import EmbeddingCacheEntry
+
+
+class SqlAlchemyEmbeddingCacheRepo(EmbeddingCacheRepo):
+    def get_many(self, db: Session, model_id: str, dim: int, hashes: list[str]) -> dict[str, list[float]]:
+        if not hashes:
+            return {}
+        rows = db.execute(
+            select(EmbeddingCacheEntry.text_sha256, EmbeddingCacheEntry.embedding).where(
+                EmbeddingCacheEntry.model_id == model_id,
+                EmbeddingCacheEntry.dim == dim,
+                EmbeddingCacheEntry.text_sha256.in_(set(hashes)),
+            )
+        ).all()
+        return {h: list(map(float, emb)) for h, emb in rows}
+
+    def put_many(self, db: Session, model_id: str, dim: int, entries: dict[str, list[float]]) -> None:
+        if not entries:
+            return
+        stmt = insert(EmbeddingCacheEntry).on_conflict_do_nothing(
+            index_elements=["text_sha256", "model_id", "dim"]
+        )
+        db.execute(stmt, [{"text_sha256": h, "model_id": model_id, "dim": dim, "embedding": emb} for h, emb in entries.items()])
+
+    def prune(self, db: Session, keep_model_ids: list[str]) -> int:
+        result = db.execute(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.model_id.not_in(keep_model_ids)))
+        return result.rowcount or 0
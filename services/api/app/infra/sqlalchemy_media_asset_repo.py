@@ -1,3 +1,4 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from ..domain.exceptions import NotFound
@@ -16,9 +17,18 @@ class SqlAlchemyMediaAssetRepo(MediaAssetRepo):
         asset = self.get(db, asset_id)
         asset.ocr_text = text
 
-    def save_embedding(self, db: Session, asset_id: int, emb: list[float]) -> None:
+    def save_detected_lang(self, db: Session, asset_id: int, lang: str) -> None:
+        asset = self.get(db, asset_id)
+        asset.detected_lang = lang
+
+    def save_embedding(self, db: Session, asset_id: int, emb: list[float], model_id: str | None = None) -> None:
         asset = self.get(db, asset_id)
         asset.embedding = emb
+        asset.embedding_model = model_id
+        asset.embedded_at = func.clock_timestamp()  # delta key for in-process indexes (ExactVectorIndex)
+        # a running re-embed computed its pending vector from older text: make it redo this row
+        asset.embedding_pending = None
+        asset.embedding_pending_model = None
 
     def create(self, db: Session, asset: MediaAsset) -> None: 
         db.add(asset)
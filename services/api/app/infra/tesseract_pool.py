@@ -0,0 +1,123 @@
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from ..core.logging import get_logger
+
+log = get_logger("infra.tesseract_pool")
+
+_CONFIG_RE = re.compile(r"--(oem|psm)\s+(\d+)")
+
+
+def parse_tesseract_config(config: str) -> tuple[int, int]:
+    """(oem, psm) from a pytesseract-style config string such as "--oem 3 --psm 6"."""
+    opts = {k: int(v) for k, v in _CONFIG_RE.findall(config)}
+    return opts.get("oem", 3), opts.get("psm", 6)
+
+
+def _tesserocr_api(lang: str, oem: int, psm: int):
+    import tesserocr
+
+    return tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM(oem), psm=tesserocr.PSM(psm))
+
+
+class TesseractApiPool:
+    """
+    Initialized Tesseract API handles (tesserocr), reused across pages.
+
+    Loading traineddata is the expensive part of a pytesseract call, and it is
+    paid on every page. Here each (lang, oem, psm) key keeps up to
+    `handles_per_key` live handles; callers borrow one, feed it an in-memory
+    image and give it back. At most `max_keys` language sets stay loaded: the
+    least recently used key's idle handles are closed when a new one is needed.
+    """
+
+    def __init__(
+        self,
+        handles_per_key: int = 1,
+        max_keys: int = 4,
+        factory: Callable[[str, int, int], Any] = _tesserocr_api,
+    ) -> None:
+        self.handles_per_key = max(1, handles_per_key)
+        self.max_keys = max(1, max_keys)
+        self._factory = factory
+        self._cond = threading.Condition()
+        # key -> [idle handles, handles created]
+        self._keys: OrderedDict[tuple, list] = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+
+    @contextmanager
+    def acquire(self, lang: str, oem: int, psm: int) -> Iterator[Any]:
+        key = (lang, oem, psm)
+        api = self._take(key)
+        try:
+            yield api
+        finally:
+            api.Clear()  # drop the image and results, keep the loaded model
+            with self._cond:
+                self._keys[key][0].append(api)
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "keys": [list(k) for k in self._keys],
+                "created": self.created,
+                "reused": self.reused,
+                "closed": self.closed,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            for idle, _ in self._keys.values():
+                for api in idle:
+                    api.End()
+                    self.closed += 1
+            self._keys.clear()
+
+    # Internal
+    def _take(self, key: tuple) -> Any:
+        with self._cond:
+            while True:
+                entry = self._keys.get(key)
+                if entry is None:
+                    self._evict_idle_keys()
+                    entry = self._keys[key] = [[], 0]
+                self._keys.move_to_end(key)
+                idle, created = entry
+                if idle:
+                    self.reused += 1
+                    return idle.pop()
+                if created < self.handles_per_key:
+                    entry[1] += 1
+                    break
+                self._cond.wait()
+        # create outside the lock: loading traineddata takes a while
+        try:
+            api = self._factory(*key)
+        except Exception:
+            with self._cond:
+                self._keys[key][1] -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self.created += 1
+        log.info("tesseract_handle_created", extra={"lang": key[0], "oem": key[1], "psm": key[2]})
+        return api
+
+    def _evict_idle_keys(self) -> None:
+        # caller holds the lock; keys with borrowed handles are kept until they are returned
+        for old in list(self._keys):
+            if len(self._keys) < self.max_keys:
+                return
+            idle, created = self._keys[old]
+            if len(idle) == created:
+                for api in idle:
+                    api.End()
+                    self.closed += 1
+                del self._keys[old]
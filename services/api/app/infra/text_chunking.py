@@ -0,0 +1,37 @@
+def length_buckets(lengths: list[int], batch_size: int) -> list[list[int]]:
+    """
+    Group input indices into batches of similar length (longest first).
+
+    Every batch is padded to its longest member, so batching neighbours in
+    length order keeps padding waste small. Returns index lists; callers
+    scatter results back by index.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def token_windows(offsets: list[tuple[int, int]], max_tokens: int, overlap: int) -> list[tuple[int, int]]:
+    """
+    Split a tokenized text into overlapping windows of at most max_tokens tokens.
+
+    offsets: per-token (start, end) character offsets, as returned by a fast
+    tokenizer with return_offsets_mapping=True. Returns (start, end) character
+    spans, one per window; consecutive windows share `overlap` tokens.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    overlap = max(0, min(overlap, max_tokens - 1))
+    step = max_tokens - overlap
+
+    spans: list[tuple[int, int]] = []
+    n = len(offsets)
+    start = 0
+    while start < n:
+        end = min(start + max_tokens, n)
+        spans.append((offsets[start][0], offsets[end - 1][1]))
+        if end == n:
+            break
+        start += step
+    return spans
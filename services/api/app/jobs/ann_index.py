@@ -0,0 +1,99 @@
+"""
+Build the ANN indexes described by ANN_INDEX / ANN_METRIC / ANN_STORAGE and drop the others.
+
+Migrations create one fixed index per table (ivfflat, cosine, float32). Switching
+index type, metric or float16 storage is a deployment decision, so it lives here
+instead: for media_assets and document_chunks the configured index is built with
+CREATE INDEX CONCURRENTLY (search keeps using the old one meanwhile), then every
+other ivfflat/hnsw index on the table is dropped concurrently. An existing
+index of the configured type and opclass counts as in place (whatever its name
+or build options), so re-running is a no-op. Deploy the API with the same settings
+right after, so its ORDER BY operator matches the new opclass.
+
+Usage (from services/api):
+    ANN_INDEX=hnsw python -m app.jobs.ann_index --dry-run
+    ANN_INDEX=hnsw ANN_STORAGE=halfvec python -m app.jobs.ann_index --m 16 --ef-construction 64
+"""
+import argparse
+
+from sqlalchemy import text
+
+from ..core.config import get_settings
+from ..core.db import get_engine
+from ..core.logging import get_logger, setup_logging
+
+log = get_logger("job.ann_index")
+
+TABLES = ("media_assets", "document_chunks")
+
+
+def index_ddl(
+    table: str,
+    kind: str,
+    metric: str,
+    storage: str = "vector",
+    dim: int = 384,
+    lists: int = 100,
+    m: int = 16,
+    ef_construction: int = 64,
+) -> tuple[str, str]:
+    """(index name, CREATE INDEX CONCURRENTLY statement) for one table."""
+    if kind not in ("ivfflat", "hnsw") or metric not in ("cosine", "l2", "ip"):
+        raise ValueError(f"Unsupported ANN index: {kind}/{metric}")
+    if storage == "halfvec":
+        # must match the expression search orders by: (embedding::halfvec(dim))
+        name, expr = f"{table}_embedding_half_{kind}_{metric}", f"(embedding::halfvec({dim})) halfvec_{metric}_ops"
+    else:
+        name, expr = f"{table}_embedding_{kind}_{metric}", f"embedding vector_{metric}_ops"
+    opts = f"WITH (m = {m}, ef_construction = {ef_construction})" if kind == "hnsw" else f"WITH (lists = {lists})"
+    return name, f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {kind} ({expr}) {opts}"
+
+
+def is_target(indexdef: str, kind: str, metric: str, storage: str = "vector") -> bool:
+    """Whether an existing index (pg_indexes.indexdef) is the configured type and opclass."""
+    return f"USING {kind} " in indexdef and f"{'halfvec' if storage == 'halfvec' else 'vector'}_{metric}_ops" in indexdef
+
+
+def ann_indexes(conn, table: str) -> list[tuple[str, str]]:
+    """(name, definition) of the existing ivfflat/hnsw indexes on `table`."""
+    return conn.execute(
+        text("""
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE tablename = :t AND (indexdef ILIKE '%USING ivfflat%' OR indexdef ILIKE '%USING hnsw%')
+        """),
+        {"t": table},
+    ).all()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lists", type=int, default=100, help="ivfflat lists")
+    ap.add_argument("--m", type=int, default=16, help="hnsw m")
+    ap.add_argument("--ef-construction", type=int, default=64, help="hnsw ef_construction")
+    ap.add_argument("--dry-run", action="store_true", help="only print the statements")
+    args = ap.parse_args()
+    setup_logging()
+
+    s = get_settings()
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in TABLES:
+            name, ddl = index_ddl(
+                table, s.ann_index, s.ann_metric, s.ann_storage, s.embed_dim, args.lists, args.m, args.ef_construction
+            )
+            existing = ann_indexes(conn, table)
+            keep = next((n for n, d in existing if is_target(d, s.ann_index, s.ann_metric, s.ann_storage)), None)
+            # build first so search never runs without an index, then drop the rest
+            stale = [n for n, _ in existing if n != keep]
+            statements = ([] if keep else [ddl]) + [f'DROP INDEX CONCURRENTLY IF EXISTS "{old}"' for old in stale]
+            if statements:
+                statements.append(f"ANALYZE {table}")
+            for sql in statements:
+                print(f"{sql};")
+                if not args.dry_run:
+                    conn.execute(text(sql))
+            if not args.dry_run:
+                log.info("ann_index_ready", extra={"table": table, "index": keep or name, "dropped": stale})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Delete embedding_cache entries of retired models.
+
+Keeps the model id the API is configured with (EMBED_BACKEND aware) plus any
+--keep ids, e.g. while a re-embed to a new model is still running.
+
+Usage (from services/api):
+    python -m app.jobs.prune_embedding_cache --dry-run
+    python -m app.jobs.prune_embedding_cache --keep sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+
+from sqlalchemy import func, select
+
+from ..core.db import SessionLocal
+from ..core.deps import get_embedding_cache_repo, get_embedding_model
+from ..core.logging import get_logger, setup_logging
+from ..models import EmbeddingCacheEntry
+
+log = get_logger("job.prune_embedding_cache")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--keep", action="append", default=[], help="additional model id to keep (repeatable)")
+    ap.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    args = ap.parse_args()
+    setup_logging()
+
+    keep = sorted({get_embedding_model().model_id, *args.keep})
+    with SessionLocal() as db, db.begin():
+        if args.dry_run:
+            rows = db.execute(
+                select(EmbeddingCacheEntry.model_id, func.count())
+                .where(EmbeddingCacheEntry.model_id.not_in(keep))
+                .group_by(EmbeddingCacheEntry.model_id)
+            ).all()
+            for model_id, n in rows:
+                print(f"would delete {n} entries of {model_id}")
+            return
+        deleted = get_embedding_cache_repo().prune(db, keep_model_ids=keep)
+    log.info("embedding_cache_pruned", extra={"deleted": deleted, "kept": keep})
+    print(f"deleted {deleted} entries; kept {', '.join(keep)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Re-embed all assets with another model while search keeps serving the old vectors.
+
+Walk (default): keyset-paginates media_assets, then document_chunks, by id,
+encodes their text with the target model in large batches and writes
+embedding_pending(_model) with one bulk UPDATE per batch. Search only reads
+`embedding`, so nothing changes for live traffic. Each batch is its own short
+transaction and the job is throttled to --max-rows-per-s. Re-running resumes:
+rows already pending for the target model are skipped. Chunks keep their
+boundaries; only their vectors are replaced.
+
+Cut-over (--cutover): first catches up rows that changed since the walk (a live
+/embed clears the pending vector and replaces the chunks), then swaps pending
+into `embedding` for both tables in one transaction and bumps the corpus
+generation. It refuses while any asset or chunk still lacks a target vector, so
+SEARCH_CHUNKS never compares new-model queries with old-model chunks. Deploy
+the API with EMBED_MODEL=<target> right after, so queries are encoded by the
+same model.
+
+The bump only reaches running API workers through Redis
+(CORPUS_GENERATION_REDIS=true). Without it, their result caches are dropped
+by the restart that deploys the new EMBED_MODEL.
+
+Usage (from services/api):
+    python -m app.jobs.reembed --model sentence-transformers/paraphrase-MiniLM-L6-v2
+    python -m app.jobs.reembed --model sentence-transformers/paraphrase-MiniLM-L6-v2 --cutover --reindex
+"""
+import argparse
+import hashlib
+import time
+
+from pgvector.psycopg import Vector as PgVector
+from sqlalchemy import text
+
+from ..core.config import get_settings
+from ..core.db import SessionLocal, get_engine
+from ..core.deps import get_corpus_generation
+from ..core.logging import get_logger, setup_logging
+from ..infra.embedding_model import BACKENDS, EmbeddingModel
+from ..services.document_service import normalize_embedding_text
+
+log = get_logger("job.reembed")
+
+# text each table's vectors were computed from
+TABLES = {"media_assets": "coalesce(ocr_text, '')", "document_chunks": "text"}
+
+# Rows still carrying a vector from another model and nothing pending for the target
+_TODO = """
+    embedding IS NOT NULL
+    AND embedding_model IS DISTINCT FROM :model
+    AND embedding_pending_model IS DISTINCT FROM :model
+"""
+
+
+class Throttle:
+    """Sleeps just enough to keep the average rate at or below `rate` rows/s (0 = unthrottled)."""
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=time.sleep) -> None:
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        self.started = clock()
+        self.done = 0
+
+    def wait(self, rows: int) -> None:
+        self.done += rows
+        if self.rate <= 0:
+            return
+        ahead = self.done / self.rate - (self.clock() - self.started)
+        if ahead > 0:
+            self.sleep(ahead)
+
+
+def walk(embedder: EmbeddingModel, batch: int, max_rows_per_s: float, dim: int, table: str = "media_assets") -> int:
+    model_id = embedder.model_id
+    body = TABLES[table]
+    throttle = Throttle(max_rows_per_s)
+    last_id, written = 0, 0
+    with SessionLocal() as db:
+        while True:
+            with db.begin():
+                rows = db.execute(
+                    text(f"""
+                        SELECT id, {body} AS body FROM {table}
+                        WHERE id > :last_id AND {_TODO}
+                        ORDER BY id
+                        LIMIT :batch
+                    """),
+                    {"last_id": last_id, "model": model_id, "batch": batch},
+                ).all()
+            if not rows:
+                return written
+
+            vecs = embedder.embed_texts([normalize_embedding_text(r.body) for r in rows])
+            if vecs and len(vecs[0]) != dim:
+                raise SystemExit(
+                    f"{model_id} produces {len(vecs[0])}-d vectors but {table}.embedding is {dim}-d; "
+                    "migrate the column first"
+                )
+
+            with db.begin():
+                # the text guard skips rows whose text changed after we read it
+                db.execute(
+                    text(f"""
+                        UPDATE {table}
+                        SET embedding_pending = CAST(:emb AS vector), embedding_pending_model = :model
+                        WHERE id = :id AND md5({body}) = :text_md5
+                    """),
+                    [
+                        {
+                            "id": r.id,
+                            "emb": PgVector(v),
+                            "model": model_id,
+                            "text_md5": hashlib.md5(r.body.encode("utf-8")).hexdigest(),
+                        }
+                        for r, v in zip(rows, vecs, strict=True)
+                    ],
+                )
+            written += len(rows)
+            last_id = rows[-1].id
+            log.info("reembed_batch", extra={"table": table, "rows": len(rows), "last_id": last_id, "written": written})
+            throttle.wait(len(rows))
+
+
+def cutover(model_id: str, dim: int) -> int:
+    with SessionLocal() as db, db.begin():
+        # blocks concurrent writers (live /embed) for the check + swap only
+        db.execute(text("LOCK TABLE media_assets, document_chunks IN SHARE ROW EXCLUSIVE MODE"))
+        for table in TABLES:
+            missing = db.execute(text(f"SELECT count(*) FROM {table} WHERE {_TODO}"), {"model": model_id}).scalar()
+            if missing:
+                raise SystemExit(f"{missing} {table} rows still lack a {model_id} vector; run the walk again")
+        swapped = db.execute(
+            text(f"""
+                UPDATE media_assets
+                SET embedding = embedding_pending::vector({dim}),
+                    embedding_model = embedding_pending_model,
+                    embedded_at = clock_timestamp(),
+                    embedding_pending = NULL,
+                    embedding_pending_model = NULL
+                WHERE embedding_pending_model = :model
+            """),
+            {"model": model_id},
+        ).rowcount
+        chunks = db.execute(
+            text(f"""
+                UPDATE document_chunks
+                SET embedding = embedding_pending::vector({dim}),
+                    embedding_model = embedding_pending_model,
+                    embedding_pending = NULL,
+                    embedding_pending_model = NULL
+                WHERE embedding_pending_model = :model
+            """),
+            {"model": model_id},
+        ).rowcount
+    if not get_settings().corpus_generation_redis:
+        log.warning("reembed_generation_local", extra={"hint": "set CORPUS_GENERATION_REDIS=true so API workers see the bump"})
+    get_corpus_generation().bump()
+    log.info("reembed_cutover", extra={"model": model_id, "rows": swapped, "chunks": chunks})
+    return swapped
+
+
+def reindex_ivfflat() -> None:
+    """ivfflat centroids were trained on the old vectors; rebuild them without blocking search."""
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        names = conn.execute(
+            text("""
+                SELECT indexname FROM pg_indexes
+                WHERE tablename IN ('media_assets', 'document_chunks') AND indexdef ILIKE '%ivfflat%'
+            """)
+        ).scalars().all()
+        for name in names:
+            conn.execute(text(f'REINDEX INDEX CONCURRENTLY "{name}"'))
+            log.info("reembed_reindexed", extra={"index": name})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", required=True, help="target sentence-transformers model")
+    ap.add_argument("--backend", default="torch", choices=BACKENDS)
+    ap.add_argument("--batch", type=int, default=512, help="rows per keyset page / bulk UPDATE")
+    ap.add_argument("--encode-batch", type=int, default=64, help="texts per forward pass")
+    ap.add_argument("--max-rows-per-s", type=float, default=100.0, help="throttle; 0 disables it")
+    ap.add_argument("--cutover", action="store_true", help="catch up, then swap pending vectors in")
+    ap.add_argument("--reindex", action="store_true", help="after cut-over, REINDEX ivfflat indexes concurrently")
+    args = ap.parse_args()
+    setup_logging()
+
+    settings = get_settings()
+    embedder = EmbeddingModel(
+        model=args.model,
+        device="cpu",
+        embed_dim=settings.embed_dim,
+        batch_size=args.encode_batch,
+        backend=args.backend,
+        onnx_dir=settings.embed_onnx_dir,
+    )
+    written = walk(embedder, args.batch, args.max_rows_per_s, settings.embed_dim)
+    chunks = walk(embedder, args.batch, args.max_rows_per_s, settings.embed_dim, table="document_chunks")
+    print(f"{written} assets and {chunks} chunks embedded with {embedder.model_id}")
+    if args.cutover:
+        swapped = cutover(embedder.model_id, settings.embed_dim)
+        print(f"cut over {swapped} assets; deploy the API with EMBED_MODEL={args.model} EMBED_BACKEND={args.backend}")
+        if args.reindex:
+            reindex_ivfflat()
+
+
+if __name__ == "__main__":
+    main()
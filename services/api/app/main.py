@@ -8,7 +8,14 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from .core.config import Settings, get_settings
-from .core.deps import _s3_singleton, get_db, get_embedding_model, get_ocr_service
+from .core.db import SessionLocal, get_async_engine
+from .core.deps import (
+    _s3_singleton,
+    _search_singleton,
+    get_db,
+    get_embedding_model,
+    get_ocr_service,
+)
 from .core.http_logging import http_logging_middleware
 from .core.logging import get_logger, setup_logging
 from .infra.llm_extractor_hf import HfQwenFreightExtractor
@@ -31,11 +38,26 @@ async def _warm_heavy_singletons():
     finally:
         _WARMED_UP.set()  # set even if partial failures; or set only on success
 
+def _check_ann_plan():
+    # Best effort: a missing DB or extension must not break startup.
+    # Runs on a worker thread, so it uses the sync builder, not the async FastAPI dependency.
+    try:
+        with SessionLocal() as db:
+            _search_singleton().check_ann_plan(db)
+    except Exception as e:
+        log.warning("ann_plan_check_failed", extra={"error": e.__class__.__name__})
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.warmup_task = asyncio.create_task(_warm_heavy_singletons())
+    if get_settings().ann_plan_check:
+        app.state.plan_check_task = asyncio.create_task(to_thread.run_sync(_check_ann_plan))
     yield
     await app.state.warmup_task
+    if getattr(app.state, "plan_check_task", None):
+        await app.state.plan_check_task
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
 
 
 
@@ -57,7 +79,7 @@ app.middleware("http")(http_logging_middleware)
 
 # TODO: Move to route 
 @app.get("/health")
-def health():
+async def health():  # async: must answer even when the threadpool is saturated
     return {"status": "ok"}
 
 @app.get("/ready")
@@ -10,8 +10,10 @@ from sqlalchemy import (
     Integer,
     Numeric,
     String,
+    UniqueConstraint,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from .core.db import Base
@@ -24,7 +26,51 @@ class MediaAsset(Base):
     storage_uri = Column(String, nullable=False)
     sha256 = Column(String, nullable=False, unique=True)
     ocr_text = Column(String)
+    # to_tsvector('simple', ocr_text); maintained by the media_assets_ocr_tsv_trg trigger
+    ocr_tsv = deferred(Column(TSVECTOR))
     embedding = Column(Vector(384))  # open up vector search later
+    embedding_model = Column(String)  # model id that produced `embedding`
+    embedded_at = Column(DateTime(timezone=True))  # clock_timestamp() of the last write to `embedding`
+    # written by app.jobs.reembed, swapped into `embedding` at cut-over; search never reads them
+    embedding_pending = deferred(Column(Vector()))
+    embedding_pending_model = Column(String)
+    ocr_pages_total = Column(Integer)  # PDF page count, set when page-by-page OCR starts
+    detected_lang = Column(String)  # Tesseract languages picked by the OCR pre-pass, e.g. "eng"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DocumentPage(Base):
+    """OCR text of one PDF page, written as soon as the page is done (resume + progress)."""
+    __tablename__ = "document_pages"
+    asset_id = Column(Integer, ForeignKey("media_assets.id", ondelete="CASCADE"), primary_key=True)
+    page_no = Column(Integer, primary_key=True)  # 0-based
+    lang = Column(String, nullable=False)  # Tesseract language(s) the page was read with
+    text = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    __table_args__ = (UniqueConstraint("asset_id", "chunk_index"),)
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(Integer, ForeignKey("media_assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    text = Column(String, nullable=False)
+    embedding = Column(Vector(384))
+    embedding_model = Column(String)  # model id that produced `embedding`
+    # written by app.jobs.reembed, swapped into `embedding` at cut-over together with media_assets
+    embedding_pending = deferred(Column(Vector()))
+    embedding_pending_model = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class EmbeddingCacheEntry(Base):
+    """Content-addressed vectors: sha256(normalized text) + model id + dim -> embedding."""
+    __tablename__ = "embedding_cache"
+    text_sha256 = Column(String(64), primary_key=True)
+    model_id = Column(String, primary_key=True, index=True)
+    dim = Column(Integer, primary_key=True)
+    embedding = Column(Vector(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
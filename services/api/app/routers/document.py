@@ -7,12 +7,22 @@ from sqlalchemy.orm import Session
 from ..core.deps import DocumentServiceDependency, get_db
 from ..core.logging import get_logger
 from ..domain.exceptions import BadRequest, NotFound, ProcessingError, S3Unavailable
-from ..schemas.document import DocumentOut, DocumentTextOut, OcrRunOut
+from ..schemas.document import DocumentOut, DocumentTextOut, OcrProgressOut, OcrRunOut
 
 router = APIRouter(prefix="/document", tags=["document"])
 
 log = get_logger("api.document")
 
+@router.get("/embed/cache")
+def embedding_cache_stats(document_service: DocumentServiceDependency):
+    return document_service.embedding_cache_stats()
+
+
+@router.get("/ocr/cache")
+def ocr_page_cache_stats(document_service: DocumentServiceDependency):
+    return document_service.ocr_cache_stats()
+
+
 @router.get("/{asset_id}", response_model=DocumentOut)
 def get_document(
     asset_id: int,
@@ -67,6 +77,18 @@ def run_ocr(
         raise HTTPException(500, "Unexpected server error.") from e
 
 
+@router.get("/{asset_id}/ocr/progress", response_model=OcrProgressOut)
+def ocr_progress(
+    asset_id: int,
+    document_service: DocumentServiceDependency,
+    db: Session = Depends(get_db),
+):
+    try:
+        return document_service.ocr_progress(db=db, asset_id=asset_id)
+    except NotFound as e:
+        raise HTTPException(404, "Not found") from e
+
+
 @router.post("/{asset_id}/embed")
 def embed_document(
     asset_id: int,
@@ -1,33 +1,74 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.deps import SearchServiceDependency, get_db
+from ..core.deps import SearchServiceDependency, get_async_db, get_db
 from ..core.logging import get_logger
-from ..domain.exceptions import BadRequest, ProcessingError
+from ..domain.exceptions import BadRequest, Overloaded, ProcessingError
+from ..schemas.search import SearchBatchIn
 
 log = get_logger("api.search")
 
 router = APIRouter(prefix="/search", tags=["search"])
 
 # EMBED_DIM = 384  # keep in sync with your model
+MAX_LIMIT = 100  # results per page
 
 
 
 @router.get("")
-def search(
+async def search(
     search_service: SearchServiceDependency,
     q: str = Query(...),
-    limit: int = 5,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+    limit: int = Query(5, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    recall: float | None = Query(None, gt=0, le=1, description="Target ANN recall, maps to probes/ef_search"),
+    latency_budget_ms: int | None = Query(None, gt=0, description="Caps ANN effort to roughly this latency"),
+    cursor: str | None = Query(None, description="Opaque next_cursor from a previous page; overrides offset"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        return search_service.search(db=db, query=q, limit=limit, offset=offset)
+        return await search_service.search_async(
+            db=db, query=q, limit=limit, offset=offset, recall=recall, latency_budget_ms=latency_budget_ms,
+            cursor=cursor,
+        )
     except BadRequest as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except Overloaded as e:
+        log.warning("search_overloaded", extra={"reason": str(e)})
+        raise HTTPException(status_code=503, detail="Search is overloaded, retry shortly.", headers={"Retry-After": "1"}) from e
     except ProcessingError as e:
         # Embedding/dimension mismatch etc. — treat as 500 to surface infra/config problems
         msg = str(e) if "Embedding dimension mismatch" not in str(e) else "Embedding dimension mismatch"
         raise HTTPException(status_code=500, detail=msg) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Unexpected server error.") from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Unexpected server error.") from e
+
+
+@router.post("/batch")
+def search_batch(
+    body: SearchBatchIn,
+    search_service: SearchServiceDependency,
+    db: Session = Depends(get_db),
+):
+    try:
+        results = search_service.search_batch(
+            db=db,
+            queries=body.queries,
+            limit=body.limit,
+            recall=body.recall,
+            latency_budget_ms=body.latency_budget_ms,
+        )
+        return {"results": results}
+    except BadRequest as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except ProcessingError as e:
+        msg = str(e) if "Embedding dimension mismatch" not in str(e) else "Embedding dimension mismatch"
+        raise HTTPException(status_code=500, detail=msg) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Unexpected server error.") from e
+
+
+@router.get("/cache")
+def search_cache_stats(search_service: SearchServiceDependency):
+    return search_service.cache_stats()
@@ -14,3 +14,10 @@ class DocumentTextOut(BaseModel):
 class OcrRunOut(BaseModel):
     id: int
     ocr_chars: int
+    lang: str | None = None  # Tesseract languages used (explicit, detected or default)
+
+class OcrProgressOut(BaseModel):
+    id: int
+    pages_done: int
+    pages_total: int | None  # None until page-by-page OCR has started (and for non-PDF assets)
+    has_text: bool
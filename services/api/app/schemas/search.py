@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class SearchBatchIn(BaseModel):
+    queries: list[str] = Field(min_length=1)
+    limit: int = Field(default=5, gt=0, le=100)
+    recall: float | None = Field(default=None, gt=0, le=1)
+    latency_budget_ms: int | None = Field(default=None, gt=0)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, field
 
 # from amqp import NotFound
 from botocore.exceptions import ClientError, EndpointConnectionError
@@ -9,11 +10,27 @@ from sqlalchemy.orm import Session
 from ..core.logging import get_logger
 from ..core.metrics import timed
 from ..domain.exceptions import NotFound, ProcessingError, S3Unavailable
-from ..domain.ports import BlobStore, EmbeddingModelPort, MediaAssetRepo, OcrPort
-from ..schemas.document import DocumentOut, DocumentTextOut, OcrRunOut
+from ..domain.ports import (
+    BlobStore,
+    DocumentChunkRepo,
+    DocumentPageRepo,
+    EmbeddingCacheRepo,
+    EmbeddingModelPort,
+    MediaAssetRepo,
+    OcrPort,
+)
+from ..infra.corpus_generation import CorpusGeneration
+from ..models import MediaAsset
+from ..schemas.document import DocumentOut, DocumentTextOut, OcrProgressOut, OcrRunOut
 
 log = get_logger("svc.document")
 
+
+def normalize_embedding_text(text: str) -> str:
+    """What the model is fed (and the embedding cache is keyed by): whitespace runs collapsed."""
+    return " ".join(text.split())
+
+
 @dataclass(slots=True)
 class DocumentService:
     ocr: OcrPort
@@ -21,6 +38,16 @@ class DocumentService:
     s3: BlobStore
     media_asset_repo: MediaAssetRepo
     s3_public_base: str
+    corpus_generation: CorpusGeneration | None = None  # bumped after every searchable change
+    chunk_repo: DocumentChunkRepo | None = None  # passage embeddings; None disables chunking
+    chunk_batch_size: int = 64
+    embedding_cache: EmbeddingCacheRepo | None = None  # vectors by sha256(normalized text) + model + dim
+    embed_dim: int = 384
+    page_repo: DocumentPageRepo | None = None  # page-by-page PDF OCR (resume + progress); None: one pass in memory
+    default_lang: str = "eng+nor"
+    auto_lang: bool = False  # narrow default_lang per asset with a detection pre-pass (cached on the asset)
+    _cache_hits: int = field(default=0, init=False)
+    _cache_misses: int = field(default=0, init=False)
     
     # Public 
     def get_document(self, db: Session, asset_id: int) -> DocumentOut:
@@ -46,10 +73,13 @@ class DocumentService:
 
         try:
             mime = m.type or ""
-            eff_lang = lang or "eng+nor"
+            eff_lang = lang or self._document_lang(db, m, blob, mime)
             if mime.startswith("image/"):
                 text = self.ocr.image_bytes_to_text(blob, lang=eff_lang)
                 mode = "image"
+            elif mime == "application/pdf" and self.page_repo is not None:
+                text = self._ocr_pdf_pages(db, asset_id, blob, eff_lang)
+                mode = "pdf_pages"
             elif mime == "application/pdf":
                 text = self.ocr.pdf_bytes_to_text(blob, lang=eff_lang)
                 mode = "pdf"
@@ -73,28 +103,54 @@ class DocumentService:
 
         self.media_asset_repo.save_text(db, asset_id, text=text)
         db.commit()
+        self._corpus_changed()
 
         t({"asset_id": asset_id})
         log.info("ocr_done", extra={"asset_id": asset_id, "chars": len(text or ""), "mode": mode})
-        return OcrRunOut(id=m.id, ocr_chars=len(text or ""))
+        return OcrRunOut(id=m.id, ocr_chars=len(text or ""), lang=eff_lang)
     
+    def ocr_progress(self, db: Session, asset_id: int) -> OcrProgressOut:
+        m = self.media_asset_repo.get(db, asset_id)
+        done, total = self.page_repo.progress(db, asset_id) if self.page_repo else (0, None)
+        return OcrProgressOut(id=m.id, pages_done=done, pages_total=total, has_text=m.ocr_text is not None)
+
     def embed_document(self, db: Session, asset_id: int) -> dict:
         t = timed("embed")
         m = self.media_asset_repo.get(db, asset_id)
         text = m.ocr_text or ""
 
         try:
-            emb = self.embedder.embed_text(text)
+            emb = self._embed_cached(db, [text])[0]
+            chunks, chunk_embs = self._embed_chunks(db, text)
         except Exception as e:
             log.error("embed_failed", extra={"asset_id": asset_id, "error": e})
             raise ProcessingError(f"Embedding failed: {e}") from e
 
         # Use UPDATE to avoid loading large vector back into ORM if undesired
-        self.media_asset_repo.save_embedding(db, asset_id, emb=emb)
+        self.media_asset_repo.save_embedding(db, asset_id, emb=emb, model_id=self.embedder.model_id)
+        if self.chunk_repo is not None:
+            self.chunk_repo.replace_chunks(
+                db, asset_id, chunks=chunks, embeddings=chunk_embs, model_id=self.embedder.model_id
+            )
         db.commit()
+        self._corpus_changed()
 
-        t({"asset_id": asset_id, "chars": len(text), "dim": len(emb)})
-        return {"id": m.id, "dim": len(emb)}
+        t({"asset_id": asset_id, "chars": len(text), "dim": len(emb), "chunks": len(chunks)})
+        return {"id": m.id, "dim": len(emb), "chunks": len(chunks)}
+
+    def embedding_cache_stats(self) -> dict:
+        lookups = self._cache_hits + self._cache_misses
+        return {
+            "enabled": self.embedding_cache is not None,
+            "model_id": self.embedder.model_id,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": round(self._cache_hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def ocr_cache_stats(self) -> dict:
+        stats = self.ocr.cache_stats() if hasattr(self.ocr, "cache_stats") else None
+        return {"enabled": stats is not None, **(stats or {})}
 
     def generate_download_url(self, db: Session, asset_id: int) -> str:
         m = self.media_asset_repo.get(db, asset_id)
@@ -115,4 +171,75 @@ class DocumentService:
         # Normalize to public base if needed
         url = url.replace("http://minio:9000", self.s3_public_base)
         return url
-    
\ No newline at end of file
+
+    # Internal
+    def _embed_chunks(self, db: Session, text: str) -> tuple[list[str], list[list[float]]]:
+        if self.chunk_repo is None:
+            return [], []
+        chunks = self.embedder.chunk_text(text)
+        embs: list[list[float]] = []
+        for i in range(0, len(chunks), self.chunk_batch_size):
+            embs.extend(self._embed_cached(db, chunks[i:i + self.chunk_batch_size]))
+        return chunks, embs
+
+    def _document_lang(self, db: Session, m: MediaAsset, blob: bytes, mime: str) -> str:
+        """Languages to OCR with when the caller gave none: the asset's cached detection, else a fresh one."""
+        if not self.auto_lang or not (mime.startswith("image/") or mime == "application/pdf"):
+            return self.default_lang
+        if m.detected_lang:
+            return m.detected_lang
+        try:
+            detected = self.ocr.detect_lang(blob, mime)
+        except Exception as e:
+            log.warning("ocr_lang_detect_failed", extra={"asset_id": m.id, "error": e})
+            return self.default_lang
+        # committed right away: a retried or resumed run must pick the same languages
+        self.media_asset_repo.save_detected_lang(db, m.id, detected)
+        db.commit()
+        return detected
+
+    def _ocr_pdf_pages(self, db: Session, asset_id: int, blob: bytes, lang: str) -> str:
+        """OCR page by page, committing each page as it finishes; pages already stored for `lang` are skipped."""
+        total = self.ocr.pdf_page_count(blob)
+        done = self.page_repo.begin(db, asset_id, total=total, lang=lang)
+        db.commit()
+        if done:
+            log.info("ocr_resume", extra={"asset_id": asset_id, "pages_done": len(done), "pages_total": total})
+        for page_no, page_text in self.ocr.iter_pdf_pages(blob, lang=lang, skip=frozenset(done)):
+            self.page_repo.save_page(db, asset_id, page_no, lang, page_text)
+            db.commit()
+        return self.page_repo.assemble(db, asset_id)
+
+    def _embed_cached(self, db: Session, texts: list[str]) -> list[list[float]]:
+        """embed_texts, consulting the content-addressed cache first; new vectors are stored in db's transaction.
+
+        The model sees the normalized text, so the cached vector is exactly what a
+        fresh encode would produce for any text with the same key.
+        """
+        normalized = [normalize_embedding_text(t) for t in texts]
+        if self.embedding_cache is None:
+            return self.embedder.embed_texts(normalized)
+
+        model_id = self.embedder.model_id
+        keys = [hashlib.sha256(n.encode("utf-8")).hexdigest() if n else None for n in normalized]
+        cached = self.embedding_cache.get_many(db, model_id, self.embed_dim, [k for k in keys if k])
+
+        out: list[list[float] | None] = [cached.get(k) if k else None for k in keys]
+        misses = [i for i, (k, v) in enumerate(zip(keys, out, strict=True)) if k and v is None]
+        self._cache_hits += sum(1 for k in keys if k and k in cached)
+        self._cache_misses += len(misses)
+
+        if misses:
+            fresh = self.embedder.embed_texts([normalized[i] for i in misses])
+            for i, emb in zip(misses, fresh, strict=True):
+                out[i] = emb
+            self.embedding_cache.put_many(
+                db, model_id, self.embed_dim,
+                {keys[i]: emb for i, emb in zip(misses, fresh, strict=True) if any(emb)},
+            )
+        zero = [0.0] * self.embed_dim
+        return [v if v is not None else zero for v in out]
+
+    def _corpus_changed(self) -> None:
+        if self.corpus_generation is not None:
+            self.corpus_generation.bump()
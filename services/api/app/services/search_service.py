@@ -1,31 +1,446 @@
+import asyncio
+import base64
+import json
+import math
+from collections.abc import Callable
 from dataclasses import dataclass
 
 from pgvector.psycopg import Vector as PgVector
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..core.cache import TtlLruCache
+from ..core.executor import BoundedExecutor
 from ..core.logging import get_logger
 from ..core.metrics import timed
-from ..domain.exceptions import ProcessingError
+from ..domain.exceptions import BadRequest, ProcessingError
 from ..domain.ports import EmbeddingModelPort
+from ..infra.corpus_generation import CorpusGeneration
+from ..infra.exact_vector_index import ExactVectorIndex
+from ..infra.query_embedding_cache import QueryEmbeddingCache
 
 log = get_logger("svc.search")
 
+# pgvector distance operator per index opclass (vector_<metric>_ops)
+DISTANCE_OPS = {"cosine": "<=>", "l2": "<->", "ip": "<#>"}
+ANN_INDEXES = ("ivfflat", "hnsw")
+ANN_STORAGES = ("vector", "halfvec")  # halfvec: search the float16 expression index
+SNIPPET_MODES = ("prefix", "headline")
+FUSION_MODES = ("linear", "rrf")
+
+# Recall/latency tiers used to map per-request knobs onto index parameters:
+# (recall target, ivfflat.probes, hnsw.ef_search, rough latency in ms on ~50k rows)
+RECALL_TIERS = (
+    (0.80, 4, 40, 5),
+    (0.90, 10, 64, 10),
+    (0.95, 20, 100, 20),
+    (0.98, 40, 200, 40),
+    (1.00, 100, 400, 100),
+)
+
+
+@dataclass(slots=True, frozen=True)
+class AnnParams:
+    probes: int
+    ef_search: int
+
+
+@dataclass(slots=True, frozen=True)
+class Cursor:
+    """Keyset position: the last returned (score, distance, id) and the window it came from."""
+    score: float
+    distance: float | None
+    id: int
+    window: int
+
+
+def encode_cursor(row: dict, window: int) -> str:
+    payload = json.dumps([row["score"], row["distance"], row["id"], window], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, distance, id_, window = json.loads(raw)
+        return Cursor(
+            score=float(score),
+            distance=None if distance is None else float(distance),
+            id=int(id_),
+            window=max(1, int(window)),
+        )
+    except (ValueError, TypeError) as e:
+        raise BadRequest("Invalid cursor") from e
+
+
+def _rank_key(score: float, distance: float | None, id_: int) -> tuple:
+    # Mirrors ORDER BY score DESC, distance ASC, id ASC
+    return (-score, math.inf if distance is None else distance, id_)
+
+
+def _position_after(ranked: tuple[dict, ...], after: Cursor) -> int:
+    key = _rank_key(after.score, after.distance, after.id)
+    for i, r in enumerate(ranked):
+        if _rank_key(r["score"], r["distance"], r["id"]) > key:
+            return i
+    return len(ranked)
+
+
 # TODO: Create DB repo for search
 @dataclass(slots=True)
 class SearchService:
     embedder: EmbeddingModelPort
     embed_dim: int | None = 384 # keep in sync with your model
     ivfflat_probes: int = 20  # number of probes for ivfflat index scan
+    hnsw_ef_search: int = 100  # candidate list size for hnsw index scan
+    ann_index: str = "ivfflat"  # must match the index built by migrations
+    ann_metric: str = "cosine"
+    ann_storage: str = "vector"  # must match the index opclass
+    query_cache: QueryEmbeddingCache | None = None
+    result_cache: TtlLruCache | None = None  # ranked windows, keyed by corpus generation
+    corpus_generation: CorpusGeneration | None = None
+    max_candidates: int = 1000  # upper bound for the adaptive candidate window
+    max_batch_queries: int = 100  # per POST /search/batch
+    fusion: str = "linear"  # linear: 0.7 ANN + 0.3 ts_rank_cd over ANN hits; rrf: reciprocal rank fusion of both legs
+    rrf_k: int = 60
+    lex_match_cap: int = 2000  # keyword matches scored per query in rrf mode
+    chunks: bool = False  # rank documents by their best passage in document_chunks
+    chunk_fanout: int = 4  # chunk hits fetched per document candidate
+    exact_index: ExactVectorIndex | None = None  # in-process exact top-k (fallback + small corpora)
+    exact_max_rows: int = 20000  # corpora up to this size always use the exact index
+    snippet_mode: str = "prefix"  # "headline": ts_headline excerpt around the best match
+    snippet_chars: int = 200
+    encode_executor: BoundedExecutor | None = None  # search_async: query encoding off the event loop
+    session_factory: Callable[[], Session] | None = None  # search_async: sync sessions for exact index refreshes
 
-    def search(self, db: Session, query: str, limit: int = 5, offset: int = 0) -> dict:
+    def __post_init__(self) -> None:
+        if self.ann_metric not in DISTANCE_OPS:
+            raise ValueError(f"Unsupported ann_metric: {self.ann_metric}")
+        if self.ann_index not in ANN_INDEXES:
+            raise ValueError(f"Unsupported ann_index: {self.ann_index}")
+        if self.ann_storage not in ANN_STORAGES:
+            raise ValueError(f"Unsupported ann_storage: {self.ann_storage}")
+        if self.fusion not in FUSION_MODES:
+            raise ValueError(f"Unsupported fusion: {self.fusion}")
+        if self.snippet_mode not in SNIPPET_MODES:
+            raise ValueError(f"Unsupported snippet_mode: {self.snippet_mode}")
+
+    # Public
+    def search(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 5,
+        offset: int = 0,
+        recall: float | None = None,
+        latency_budget_ms: int | None = None,
+        cursor: str | None = None,
+        qvec: PgVector | None = None,
+        refresh_exact: bool = True,
+        windows: dict[int, tuple[tuple | None, tuple[dict, ...] | None]] | None = None,
+    ) -> dict:
         if not query or not query.strip():
             return {"query": query, "results": [], "total": 0} # raise BadRequest("Empty query")
-    
+        if limit < 1:
+            raise BadRequest("limit must be at least 1")
+
         t = timed("search")
         log.info("search_start", extra={"limit": limit, "offset": offset})
+
+        after = decode_cursor(cursor) if cursor else None
+        ann = self.ann_params(recall=recall, latency_budget_ms=latency_budget_ms)
+
+        cached = True
+        fallback_used = False
+
+        def fetch(candidates: int) -> tuple[dict, ...]:
+            nonlocal cached, fallback_used, qvec
+            # The whole ranked window is cached once; every page of it is a slice
+            if windows is not None and candidates in windows:
+                cache_key, ranked = windows[candidates]  # the caller already looked this one up
+            else:
+                cache_key = self._result_key(query, candidates, ann)
+                ranked = self.result_cache.get(cache_key) if cache_key else None
+            if ranked is None:
+                cached = False
+                if qvec is None:
+                    qvec = self._query_vector(query, t)
+                ranked, fallback_used = self._rank(db, query, qvec, candidates, ann, t, refresh_exact=refresh_exact)
+                if cache_key:
+                    self.result_cache.set(cache_key, ranked)
+            return ranked
+
+        candidates, ranked, start, page, saturated = self._walk_window(limit, offset, after, fetch)
+
+        results = self._materialize(db, [(query, page)])[0]
+        has_more = start + len(page) < len(ranked) or (saturated and candidates < self.max_candidates)
+        # from the ranked page, not the materialized rows: a row deleted in between only shortens this page
+        next_offset = (start + len(page)) if page and has_more else None
+        next_cursor = encode_cursor(page[-1], candidates) if next_offset is not None else None
+
+        ms = t()
+
+        log.info(
+            "search_complete",
+            extra={
+                "duration": ms,
+                "returned": len(results),
+                "index": self.ann_index,
+                "probes": ann.probes,
+                "ef_search": ann.ef_search,
+                "candidates": candidates,
+                "fallback": fallback_used,
+                "cached": cached,
+                "next_offset": next_offset,
+                "cursor": after is not None,
+            },
+        )
+
+        return {"query": query, "results": results, "next_offset": next_offset, "next_cursor": next_cursor}
+
+    async def search_async(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 5,
+        offset: int = 0,
+        recall: float | None = None,
+        latency_budget_ms: int | None = None,
+        cursor: str | None = None,
+    ) -> dict:
+        """
+        search() for async routes: the query is encoded on encode_executor (raises
+        Overloaded when its queue is full), then the DB work runs through run_sync
+        so no request thread is held while Postgres answers.
+
+        Only in-process work stays on the event loop. The result cache is checked
+        first, and a page it can serve skips encoding altogether; its lookups are
+        handed to search() so none is repeated. An L1 query-cache hit goes straight
+        through, while the Redis tier is consulted on the executor with the model.
+        The exact index is refreshed on a worker thread with its own sync session;
+        run_sync then uses it as is.
+        """
+        qvec = None
+        windows = None
+        if query and query.strip() and limit >= 1:
+            windows = self._cached_windows(query, limit, offset, cursor, recall, latency_budget_ms)
+            if windows is None or any(ranked is None for _, ranked in windows.values()):
+                qvec = await self._encode_async(query)
+        refresh_exact = self.session_factory is None
+        exact = self._exact_ready_index()
+        if not refresh_exact and exact is not None and exact.due():
+            await asyncio.to_thread(self._refresh_exact_index)
+        return await db.run_sync(
+            lambda s: self.search(
+                db=s, query=query, limit=limit, offset=offset, recall=recall,
+                latency_budget_ms=latency_budget_ms, cursor=cursor, qvec=qvec, refresh_exact=refresh_exact,
+                windows=windows,
+            )
+        )
+
+    def search_batch(
+        self,
+        db: Session,
+        queries: list[str],
+        limit: int = 5,
+        recall: float | None = None,
+        latency_budget_ms: int | None = None,
+    ) -> list[dict]:
+        """First page for each query: one batched embedding call and one SQL round-trip.
+
+        Each entry has the same shape as search(); queries already in the result
+        cache skip both the model and the database.
+        """
+        if not queries:
+            raise BadRequest("No queries given")
+        if len(queries) > self.max_batch_queries:
+            raise BadRequest(f"At most {self.max_batch_queries} queries per batch")
+        if limit < 1:
+            raise BadRequest("limit must be at least 1")
+
+        t = timed("search_batch")
+        log.info("search_batch_start", extra={"queries": len(queries), "limit": limit})
+
+        ann = self.ann_params(recall=recall, latency_budget_ms=latency_budget_ms)
+        candidates = min(max(limit * 10, 100), max(self.max_candidates, limit))
+
+        ranked: dict[int, tuple[dict, ...]] = {}
+        keys: dict[int, tuple | None] = {}
+        pending: list[int] = []
+        for i, query in enumerate(queries):
+            if not query or not query.strip():
+                ranked[i] = ()
+                continue
+            keys[i] = self._result_key(query, candidates, ann)
+            hit = self.result_cache.get(keys[i]) if keys[i] else None
+            if hit is None:
+                pending.append(i)
+            else:
+                ranked[i] = hit
+
+        fallback_used = False
+        if pending:
+            qvecs = self._query_vectors([queries[i] for i in pending], t)
+            fresh, fallback_used = self._rank_many(
+                db, [(queries[i], v) for i, v in zip(pending, qvecs, strict=True)], candidates, ann, t
+            )
+            for i, r in zip(pending, fresh, strict=True):
+                ranked[i] = r
+                if keys[i]:
+                    self.result_cache.set(keys[i], r)
+
+        pages = self._materialize(db, [(query, ranked[i][:limit]) for i, query in enumerate(queries)])
+        out = []
+        for i, query in enumerate(queries):
+            results, page = pages[i], ranked[i][:limit]
+            has_more = len(ranked[i]) > limit or len(ranked[i]) >= candidates
+            next_offset = len(page) if page and has_more else None
+            next_cursor = encode_cursor(page[-1], candidates) if next_offset is not None else None
+            out.append({"query": query, "results": results, "next_offset": next_offset, "next_cursor": next_cursor})
+
+        ms = t()
+        log.info(
+            "search_batch_complete",
+            extra={
+                "duration": ms,
+                "queries": len(queries),
+                "ranked": len(pending),
+                "cached": len(queries) - len(pending),
+                "candidates": candidates,
+                "fallback": fallback_used,
+            },
+        )
+        return out
+
+    def ann_params(self, recall: float | None = None, latency_budget_ms: int | None = None) -> AnnParams:
+        """Map optional recall target / latency budget onto probes and ef_search.
+
+        Without knobs the configured defaults are used. A recall target picks the
+        cheapest tier that reaches it; a latency budget caps the tier from above.
+        """
+        if recall is not None and not 0.0 < recall <= 1.0:
+            raise BadRequest("recall must be in (0, 1]")
+        if latency_budget_ms is not None and latency_budget_ms <= 0:
+            raise BadRequest("latency_budget_ms must be positive")
+
+        if recall is None:
+            params = AnnParams(probes=self.ivfflat_probes, ef_search=self.hnsw_ef_search)
+        else:
+            tier = next(t for t in RECALL_TIERS if t[0] >= recall)
+            params = AnnParams(probes=tier[1], ef_search=tier[2])
+
+        if latency_budget_ms is not None:
+            affordable = [t for t in RECALL_TIERS if t[3] <= latency_budget_ms] or [RECALL_TIERS[0]]
+            cap = affordable[-1]
+            params = AnnParams(probes=min(params.probes, cap[1]), ef_search=min(params.ef_search, cap[2]))
+
+        return AnnParams(
+            probes=max(1, min(int(params.probes), 1024)),
+            ef_search=max(1, min(int(params.ef_search), 1000)),
+        )
+
+    def cache_stats(self) -> dict:
+        return {
+            "query_embeddings": self.query_cache.stats() if self.query_cache else None,
+            "results": self.result_cache.stats() if self.result_cache else None,
+            "generation": self.corpus_generation.current() if self.corpus_generation else None,
+            "exact_index": self.exact_index.stats() if self.exact_index else None,
+            "embedder": self.embedder.stats() if hasattr(self.embedder, "stats") else None,
+            "encode_executor": self.encode_executor.stats() if self.encode_executor else None,
+        }
+
+    def check_ann_plan(self, db: Session) -> bool:
+        """EXPLAIN the ANN query and warn when the planner cannot use a vector index.
+
+        Sequential scans are disabled for the check, so a remaining Seq Scan means the
+        ORDER BY operator does not match the opclass of any index on the searched table
+        (media_assets, or document_chunks in chunk mode).
+        """
+        table = "document_chunks" if self.chunks else "media_assets"
+        dim = self.embed_dim or 384
+        probe = PgVector([1.0] + [0.0] * (dim - 1))
+        sql = text(f"EXPLAIN (FORMAT JSON) {self._ann_sql(':qvec')}")
+        with db.begin():
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = db.execute(sql, {"qvec": probe, "candidates": 100, "chunk_candidates": self._ann_limit(100)}).scalar()
+
+        nodes = list(_walk_plan(plan[0]["Plan"] if isinstance(plan, list) else plan["Plan"]))
+        index_names = [
+            n.get("Index Name")
+            for n in nodes
+            if n.get("Node Type") in ("Index Scan", "Index Only Scan") and n.get("Relation Name") == table
+        ]
+        if not index_names:
+            log.warning(
+                "ann_plan_no_index",
+                extra={
+                    "index": self.ann_index,
+                    "table": table,
+                    "metric": self.ann_metric,
+                    "operator": DISTANCE_OPS[self.ann_metric],
+                    "plan": [n.get("Node Type") for n in nodes],
+                },
+            )
+            return False
+        log.info("ann_plan_ok", extra={"index_names": index_names, "metric": self.ann_metric})
+        return True
+
+    # Internal
+    def _walk_window(self, limit: int, offset: int, after: Cursor | None, fetch) -> tuple:
+        """Pick the ranked window that holds the requested page; fetch(candidates) returns one window.
+
+        Returns (candidates, ranked, start, page, saturated).
+        """
+        # widen then re-rank; deep pages and resumed cursors start from a wider window
+        candidates = max(limit * 10, 100, after.window if after else offset + limit)
+        candidates = min(candidates, max(self.max_candidates, limit))
+        while True:
+            ranked = fetch(candidates)
+            if ranked is None:
+                return candidates, None, 0, (), False
+            start = _position_after(ranked, after) if after else offset
+            page = ranked[start:start + limit]
+            saturated = len(ranked) >= candidates  # the window may have cut off more rows
+            if len(page) < limit and saturated and candidates < self.max_candidates:
+                # the page runs past the window: grow it instead of silently truncating
+                candidates = min(candidates * 2, self.max_candidates)
+                continue
+            return candidates, ranked, start, page, saturated
+
+    def _cached_windows(
+        self, query: str, limit: int, offset: int, cursor: str | None, recall: float | None, latency_budget_ms: int | None
+    ) -> dict[int, tuple[tuple | None, tuple[dict, ...] | None]] | None:
+        """The result-cache lookups search() would make, as {candidates: (key, window)}, up to the first miss.
+
+        None when there is no result cache.
+        """
+        if self.result_cache is None:
+            return None
+        after = decode_cursor(cursor) if cursor else None
+        ann = self.ann_params(recall=recall, latency_budget_ms=latency_budget_ms)
+        windows: dict[int, tuple[tuple | None, tuple[dict, ...] | None]] = {}
+
+        def lookup(candidates: int) -> tuple[dict, ...] | None:
+            key = self._result_key(query, candidates, ann)
+            windows[candidates] = (key, self.result_cache.get(key) if key else None)
+            return windows[candidates][1]
+
+        self._walk_window(limit, offset, after, lookup)
+        return windows
+
+    async def _encode_async(self, query: str) -> PgVector | None:
+        emb = self.query_cache.get_local(query) if self.query_cache else None
+        if emb is not None:
+            return PgVector(emb)
+        if self.encode_executor is None:
+            return None  # search() encodes inline
+        # L1 already missed: the executor only consults Redis and the model
+        return await self.encode_executor.run(self._query_vector, query, timed("search_encode"), True)
+
+    def _query_vector(self, query: str, t, l1_checked: bool = False) -> PgVector:
         try:
-            emb = self.embedder.embed_text(query)
+            emb = self._embed_query(query, l1_checked=l1_checked)
         except Exception as e:
             ms = t()
             log.error("search_embedding_failed", extra={"error": e.__class__.__name__, "duration": ms})
@@ -34,105 +449,368 @@ class SearchService:
             ms = t()
             log.warning("search_embedding_dim_mismatch", extra={"duration": ms, "expected": self.embed_dim, "actual": len(emb)})
             raise ProcessingError("Embedding dimension mismatch")
-        
-        qvec = PgVector(emb)
+        return PgVector(emb)
 
+    def _query_vectors(self, queries: list[str], t) -> list[PgVector]:
+        """Embed several queries; cache misses go to the model in a single embed_texts call."""
+        embs: list[list[float] | None] = [self.query_cache.get(q) if self.query_cache else None for q in queries]
+        misses = [i for i, e in enumerate(embs) if e is None]
+        if misses:
+            try:
+                fresh = self.embedder.embed_texts([queries[i] for i in misses])
+            except Exception as e:
+                ms = t()
+                log.error("search_embedding_failed", extra={"error": e.__class__.__name__, "duration": ms, "queries": len(misses)})
+                raise ProcessingError("Failed to embed query") from e
+            for i, emb in zip(misses, fresh, strict=True):
+                embs[i] = emb
+                if self.query_cache:
+                    self.query_cache.put(queries[i], emb)
+        if self.embed_dim and any(len(e) != self.embed_dim for e in embs):
+            ms = t()
+            log.warning("search_embedding_dim_mismatch", extra={"duration": ms, "expected": self.embed_dim})
+            raise ProcessingError("Embedding dimension mismatch")
+        return [PgVector(e) for e in embs]
 
-        candidates = max(limit * 10, 100)  # widen then re-rank
-        probes = max(1, min(int(self.ivfflat_probes), 1024))
+    def _rank(
+        self, db: Session, query: str, qvec: PgVector, candidates: int, ann: AnnParams, t, refresh_exact: bool = True
+    ) -> tuple[tuple[dict, ...], bool]:
+        """Run the hybrid ranking SQL and return the full ranked candidate window."""
+        ranked, fallback_used = self._rank_many(db, [(query, qvec)], candidates, ann, t, refresh_exact=refresh_exact)
+        return ranked[0], fallback_used
 
-        sql = text("""
-            WITH ann AS (
-                SELECT id, storage_uri, ocr_text,
-                       (embedding <-> :qvec)::float AS distance
-                FROM media_assets
-                WHERE embedding IS NOT NULL
-                ORDER BY (embedding <-> :qvec), id ASC
-                LIMIT :candidates
-            ),
-            lex AS (
-                SELECT id,
-                       ts_rank_cd(
-                         to_tsvector('simple', coalesce(ocr_text,'')),
-                         plainto_tsquery('simple', :qtext)
-                       ) AS bm25
-                FROM media_assets
-                WHERE to_tsvector('simple', coalesce(ocr_text,'')) @@ plainto_tsquery('simple', :qtext)
-            )
-            SELECT a.id,
-                   a.storage_uri,
-                   LEFT(coalesce(a.ocr_text,''), 200) AS snippet,
-                   a.distance,
-                   coalesce(l.bm25, 0) AS bm25,
-                   (0.7 * (1 - LEAST(1.0, a.distance)) + 0.3 * coalesce(l.bm25,0)) AS score
-            FROM ann a
-            LEFT JOIN lex l USING (id)
-            ORDER BY score DESC, a.distance ASC, a.id ASC
-            LIMIT :limit OFFSET :offset
-        """)
+    def _rank_many(
+        self, db: Session, queries: list[tuple[str, PgVector]], candidates: int, ann: AnnParams, t, refresh_exact: bool = True
+    ) -> tuple[list[tuple[dict, ...]], bool]:
+        """Rank every query in one statement: a VALUES list of query vectors LATERAL-joined to the ranking SQL."""
+        params = self._rank_params(queries, candidates)
 
-        params = {
-            "qvec": qvec,
-            "qtext": query,
-            "candidates": candidates,
-            "limit": limit,
-            "offset": offset,
-        }
+        fallback_used = False
+        exact_used = False
         try:
             with db.begin():
-                # set ivfflat.probes for this transaction
+                exact = self._exact_ready(db, refresh=refresh_exact)
                 db.execute(text("SET LOCAL statement_timeout = '5s'"))
-                db.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
-
-                rows = db.execute(sql, params).mappings().all()
-                fallback_used = False
-                if not rows:
-                    # one-time brute-force fallback
-                    db.execute(text("SET LOCAL enable_indexscan = off"))
-                    db.execute(text("SET LOCAL enable_bitmapscan = off"))
-                    rows = db.execute(sql, params).mappings().all()
+                self._set_ann_params(db, ann, self._ann_limit(candidates))
+
+                exact_used = exact is not None and exact.size <= self.exact_max_rows
+                if exact_used:
+                    # small corpus: exact in-process top-k beats any index probe
+                    rows = self._execute_exact(db, exact, queries, params, candidates)
+                else:
+                    rows = db.execute(self._batch_sql(len(queries)), params).mappings().all()
+                answered = {r["qi"] for r in rows}
+                empty = [i for i in range(len(queries)) if i not in answered]
+                if empty and not exact_used:
+                    # re-run only the queries the index returned nothing for
                     fallback_used = True
-                if rows:
-                    print(rows[0].keys())
+                    retry = [queries[i] for i in empty]
+                    retry_params = self._rank_params(retry, candidates)
+                    if exact is not None:
+                        # exact top-k from memory instead of a forced full-table scan
+                        retry_rows = self._execute_exact(db, exact, retry, retry_params, candidates)
+                        exact_used = True
+                    else:
+                        # one-time brute-force fallback
+                        db.execute(text("SET LOCAL enable_indexscan = off"))
+                        db.execute(text("SET LOCAL enable_bitmapscan = off"))
+                        retry_rows = db.execute(self._batch_sql(len(retry)), retry_params).mappings().all()
+                    rows = [*rows, *({**r, "qi": empty[r["qi"]]} for r in retry_rows)]
         except Exception as e:
             ms = t()
             log.error(
                 "search_db_failed",
                 extra={
                     "duration": ms,
-                    "sqlstate": getattr(e, "orig", {}).get("pgcode", "N/A"),
+                    "sqlstate": getattr(getattr(e, "orig", None), "sqlstate", "N/A"),
                     "exc": e.__class__.__name__,
-                    "probes": probes,
+                    "queries": len(queries),
+                    "exact": exact_used,
+                    "probes": ann.probes,
+                    "ef_search": ann.ef_search,
                     "candidates": candidates,
                 },
             )
             raise ProcessingError("Search failed due to a database error.") from e
 
-        results = [
-            {
-                "id": r["id"],
-                "storage_uri": r["storage_uri"],
-                "snippet": r["snippet"],
-                "distance": r["distance"],
-                "score": r["score"],
-                "bm25": r["bm25"],
-            }
-            for r in rows
-        ]
-        next_offset = (offset + limit) if len(results) == limit else None
+        ranked: list[list[dict]] = [[] for _ in queries]
+        for r in rows:
+            ranked[r["qi"]].append(
+                {
+                    "id": r["id"],
+                    "distance": r["distance"],
+                    "score": r["score"],
+                    "bm25": r["bm25"],
+                    "chunk_id": r["chunk_id"],
+                }
+            )
+        return [tuple(x) for x in ranked], fallback_used
 
-        ms = t()
+    def _rank_params(self, queries: list[tuple[str, PgVector]], candidates: int) -> dict:
+        params: dict = {"candidates": candidates, "chunk_candidates": self._ann_limit(candidates)}
+        if self.fusion == "rrf":
+            params |= {"rrf_k": self.rrf_k, "lex_cap": max(self.lex_match_cap, candidates)}
+        for i, (query, qvec) in enumerate(queries):
+            params[f"qvec_{i}"] = qvec
+            params[f"qtext_{i}"] = query
+        return params
 
-        log.info(
-            "search_complete",
-            extra={
-                "duration": ms,
-                "returned": len(results),
-                "probes": probes,
-                "candidates": candidates,
-                "fallback": fallback_used,
-                "next_offset": next_offset,
-            },
+    def _batch_sql(self, n: int, exact: bool = False):
+        cols = "qi, qvec, qtext, ann_ids, ann_dists" if exact else "qi, qvec, qtext"
+        values = ", ".join(
+            f"({i}, CAST(:qvec_{i} AS vector), CAST(:qtext_{i} AS text)"
+            + (f", CAST(:ann_ids_{i} AS int[]), CAST(:ann_dists_{i} AS float8[])" if exact else "")
+            + ")"
+            for i in range(n)
         )
+        return text(f"""
+            SELECT q.qi, r.*
+            FROM (VALUES {values}) AS q({cols})
+            CROSS JOIN LATERAL (
+                {self._ranking_sql("q.qvec", "q.qtext", exact=exact)}
+            ) r
+            ORDER BY q.qi, r.score DESC, r.distance ASC, r.id ASC
+        """)
+
+    def _materialize(self, db: Session, pages: list[tuple[str, tuple[dict, ...]]]) -> list[list[dict]]:
+        """Attach storage_uri + snippet to the final page(s) only, in one statement.
+
+        Ranking carries ids and scores; document text is read here for at most
+        `limit` rows per query (the best passage when the hit came from a chunk).
+        """
+        flat = [(query, r) for query, page in pages for r in page]
+        if not flat:
+            return [[] for _ in pages]
+
+        sql = text(self._snippet_sql())
+        params = {
+            "ids": [r["id"] for _, r in flat],
+            "chunk_ids": [r.get("chunk_id") for _, r in flat],
+            "qtexts": [query for query, _ in flat],
+            "chars": self.snippet_chars,
+        }
+        try:
+            with db.begin():
+                found = {row.ord - 1: row for row in db.execute(sql, params)}
+        except Exception as e:
+            log.error("search_snippets_failed", extra={"rows": len(flat), "exc": e.__class__.__name__})
+            raise ProcessingError("Search failed due to a database error.") from e
+
+        out: list[list[dict]] = []
+        pos = 0
+        for _, page in pages:
+            results = []
+            for r in page:
+                row = found.get(pos)
+                pos += 1
+                if row is None:
+                    continue  # deleted between ranking (or caching) and now
+                results.append(
+                    {
+                        "id": r["id"],
+                        "storage_uri": row.storage_uri,
+                        "snippet": row.snippet,
+                        "distance": r["distance"],
+                        "score": r["score"],
+                        "bm25": r["bm25"],
+                        "chunk_id": r.get("chunk_id"),
+                    }
+                )
+            out.append(results)
+        return out
+
+    def _snippet_sql(self) -> str:
+        """storage_uri + snippet for (:ids, :chunk_ids, :qtexts), keyed by 1-based array position."""
+        if self.snippet_mode == "headline":
+            # no StartSel/StopSel markup: clients highlight the query terms themselves
+            snippet = """LEFT(ts_headline('simple', coalesce(c.text, m.ocr_text, ''), plainto_tsquery('simple', p.qtext),
+                                          'MaxFragments=1, MaxWords=35, MinWords=15, StartSel="", StopSel=""'), :chars * 2)"""
+        else:
+            snippet = "LEFT(coalesce(c.text, m.ocr_text, ''), :chars)"
+        return f"""
+            SELECT p.ord, m.storage_uri, {snippet} AS snippet
+            FROM unnest(CAST(:ids AS int[]), CAST(:chunk_ids AS int[]), CAST(:qtexts AS text[]))
+                 WITH ORDINALITY AS p(id, chunk_id, qtext, ord)
+            JOIN media_assets m ON m.id = p.id
+            LEFT JOIN document_chunks c ON c.id = p.chunk_id
+        """
+
+    def _exact_ready(self, db: Session, refresh: bool = True) -> ExactVectorIndex | None:
+        """The in-process index, refreshed, if it can serve this search (document mode only)."""
+        exact = self._exact_ready_index()
+        if exact is None:
+            return None
+        if refresh:
+            exact.refresh(db)
+        return exact if exact.usable() else None
+
+    def _exact_ready_index(self) -> ExactVectorIndex | None:
+        return self.exact_index if self.exact_index is not None and not self.chunks else None
+
+    def _refresh_exact_index(self) -> None:
+        # worker thread: the refresh's queries and numpy work stay off the event loop
+        with self.session_factory() as s:
+            self.exact_index.refresh(s, wait=False)
+
+    def _execute_exact(self, db: Session, exact: ExactVectorIndex, queries: list[tuple[str, PgVector]], params: dict, candidates: int):
+        params = dict(params)
+        for i, (_, qvec) in enumerate(queries):
+            hits = exact.search(qvec.to_list(), candidates, metric=self.ann_metric)
+            params[f"ann_ids_{i}"] = [h[0] for h in hits]
+            params[f"ann_dists_{i}"] = [h[1] for h in hits]
+        return db.execute(self._batch_sql(len(queries), exact=True), params).mappings().all()
+
+    def _result_key(self, query: str, candidates: int, ann: AnnParams) -> tuple | None:
+        if self.result_cache is None or self.corpus_generation is None:
+            return None
+        generation = self.corpus_generation.current()
+        if generation is None:
+            return None
+        return (generation, " ".join(query.casefold().split()), candidates, self.ann_index, ann.probes, ann.ef_search)
+
+    def _embed_query(self, query: str, l1_checked: bool = False) -> list[float]:
+        if self.query_cache is None:
+            return self.embedder.embed_text(query)
+        emb = self.query_cache.get_remote(query) if l1_checked else self.query_cache.get(query)
+        if emb is None:
+            emb = self.embedder.embed_text(query)
+            self.query_cache.put(query, emb)
+        return emb
+
+    def _ann_sql(self, qvec: str = ":qvec", exact: bool = False) -> str:
+        """ANN leg: (id, distance, chunk_id) for the nearest documents.
+
+        In chunk mode documents are ranked by their best passage and chunk_id
+        names it. With exact=True the neighbours come precomputed from the
+        in-process index (q.ann_ids/ann_dists). No text is read here; snippets
+        are materialized for the final page only.
+        """
+        if exact:
+            return """
+                SELECT e.id, e.distance, NULL::int AS chunk_id
+                FROM unnest(q.ann_ids, q.ann_dists) AS e(id, distance)
+            """
+        op = DISTANCE_OPS[self.ann_metric]
+        col = "embedding"
+        if self.ann_storage == "halfvec":
+            # must match the indexed expression exactly: (embedding::halfvec(dim))
+            dim = self.embed_dim or 384
+            col, qvec = f"(embedding::halfvec({dim}))", f"CAST({qvec} AS halfvec({dim}))"
+        # <#> returns the negated inner product; shift it so smaller is closer and
+        # unit vectors land in the same [0, 2] range as cosine distance
+        distance = f"({col} {op} {qvec}) + 1" if self.ann_metric == "ip" else f"{col} {op} {qvec}"
+        # ORDER BY must be the bare operator expression, otherwise the index is not usable
+        if self.chunks:
+            return f"""
+                SELECT c.asset_id AS id, c.distance, c.chunk_id
+                FROM (
+                    SELECT DISTINCT ON (asset_id) asset_id, chunk_id, distance
+                    FROM (
+                        SELECT asset_id, id AS chunk_id, ({distance})::float AS distance
+                        FROM document_chunks
+                        WHERE embedding IS NOT NULL
+                        ORDER BY {col} {op} {qvec}
+                        LIMIT :chunk_candidates
+                    ) hits
+                    ORDER BY asset_id, distance, chunk_id
+                ) c
+                ORDER BY c.distance, c.asset_id
+                LIMIT :candidates
+            """
+        return f"""
+                SELECT id,
+                       ({distance})::float AS distance,
+                       NULL::int AS chunk_id
+                FROM media_assets
+                WHERE embedding IS NOT NULL
+                ORDER BY {col} {op} {qvec}
+                LIMIT :candidates
+        """
+
+    def _ann_limit(self, candidates: int) -> int:
+        """Rows the vector index has to return for a window of `candidates` documents."""
+        return candidates * max(1, self.chunk_fanout) if self.chunks else candidates
+
+    def _ranking_sql(self, qvec: str, qtext: str, exact: bool = False) -> str:
+        """Hybrid ranking for one query; qvec/qtext are SQL expressions (bind params or lateral columns)."""
+        if self.fusion == "rrf":
+            return self._rrf_sql(qvec, qtext, exact=exact)
+        return f"""
+                SELECT a.id,
+                       a.chunk_id,
+                       a.distance,
+                       coalesce(l.bm25, 0) AS bm25,
+                       (0.7 * (1 - LEAST(1.0, a.distance)) + 0.3 * coalesce(l.bm25,0)) AS score
+                FROM ({self._ann_sql(qvec, exact=exact)}) a
+                LEFT JOIN LATERAL (
+                    -- lexical score only for ANN candidates: PK lookups instead of a corpus-wide scan
+                    SELECT ts_rank_cd(m.ocr_tsv, plainto_tsquery('simple', {qtext})) AS bm25
+                    FROM media_assets m
+                    WHERE m.id = a.id AND m.ocr_tsv @@ plainto_tsquery('simple', {qtext})
+                ) l ON true
+                ORDER BY score DESC, a.distance ASC, a.id ASC
+        """
+
+    def _rrf_sql(self, qvec: str, qtext: str, exact: bool = False) -> str:
+        """
+        Reciprocal rank fusion: each leg keeps its own top :candidates, and
+        score = 1/(k + ann_rank) + 1/(k + lex_rank). The FULL JOIN lets keyword-only
+        hits through (distance is NULL for them).
+
+        GIN cannot return matches in rank order, so the lexical leg scores at most
+        :lex_cap matching rows before taking its top :candidates. Which rows make the
+        cap is fixed by id (newest first), so a query ranks the same on every call
+        and keyset cursors stay valid; sorting ids is cheap, unlike ranking them all.
+        """
+        return f"""
+                SELECT coalesce(a.id, l.id) AS id,
+                       a.chunk_id,
+                       a.distance,
+                       coalesce(l.bm25, 0) AS bm25,
+                       (coalesce(1.0 / (:rrf_k + a.rnk), 0) + coalesce(1.0 / (:rrf_k + l.rnk), 0))::float AS score
+                FROM (
+                    SELECT id, distance, chunk_id,
+                           row_number() OVER (ORDER BY distance, id) AS rnk
+                    FROM ({self._ann_sql(qvec, exact=exact)}) s
+                ) a
+                FULL OUTER JOIN (
+                    SELECT id, bm25, row_number() OVER (ORDER BY bm25 DESC, id) AS rnk
+                    FROM ({self._lex_sql(qtext)}) s
+                ) l ON l.id = a.id
+                ORDER BY score DESC, a.distance ASC NULLS LAST, coalesce(a.id, l.id) ASC
+                LIMIT :candidates
+        """
+
+    def _lex_sql(self, qtext: str) -> str:
+        """Lexical leg of rrf: (id, bm25) for the top :candidates of at most :lex_cap keyword matches."""
+        return f"""
+                        SELECT id, ts_rank_cd(ocr_tsv, plainto_tsquery('simple', {qtext})) AS bm25
+                        FROM (
+                            SELECT id, ocr_tsv
+                            FROM media_assets
+                            WHERE ocr_tsv @@ plainto_tsquery('simple', {qtext})
+                            ORDER BY id DESC
+                            LIMIT :lex_cap
+                        ) hits
+                        ORDER BY bm25 DESC, id
+                        LIMIT :candidates
+        """
+
+    def _set_ann_params(self, db: Session, ann: AnnParams, candidates: int) -> None:
+        if self.ann_index == "hnsw":
+            # hnsw returns at most ef_search rows, so keep it >= the candidate window
+            ef_search = max(1, min(max(ann.ef_search, candidates), 1000))
+            db.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        else:
+            db.execute(text(f"SET LOCAL ivfflat.probes = {ann.probes}"))
+
+
+def _walk_plan(node: dict):
+    yield node
+    for child in node.get("Plans", []) or []:
+        yield from _walk_plan(child)
+
 
-        return {"query": query, "results": results, "next_offset": next_offset}
+def ranked_sizeof(ranked: tuple[dict, ...]) -> int:
+    """Rough bytes held by a cached ranked window (ids + boxed floats; no text)."""
+    return 400 * len(ranked)
@@ -0,0 +1,87 @@
+"""add ocr_tsv tsvector column + gin index
+
+Revision ID: 5b1e9c3a7f20
+Revises: 244840b238d8
+Create Date: 2026-10-18 09:12:41.203117
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e9c3a7f20'
+down_revision: str | Sequence[str] | None = '244840b238d8'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Rows per backfill UPDATE; each batch commits on its own so locks stay short.
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    # 1) Nullable column without default: catalog-only change, no table rewrite
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS ocr_tsv tsvector;")
+
+    # 2) Keep it in sync from now on (covers save_text -> UPDATE of ocr_text)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION media_assets_ocr_tsv_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.ocr_tsv := to_tsvector('simple', coalesce(NEW.ocr_text, ''));
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TRIGGER IF EXISTS media_assets_ocr_tsv_trg ON media_assets;")
+    op.execute("""
+        CREATE TRIGGER media_assets_ocr_tsv_trg
+        BEFORE INSERT OR UPDATE OF ocr_text ON media_assets
+        FOR EACH ROW EXECUTE FUNCTION media_assets_ocr_tsv_update();
+    """)
+
+    # 3) Backfill existing rows in id-keyed batches, one short transaction each
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            row = bind.execute(
+                sa.text("""
+                    SELECT max(id) FROM (
+                        SELECT id FROM media_assets
+                        WHERE id > :last_id
+                        ORDER BY id
+                        LIMIT :batch
+                    ) s
+                """),
+                {"last_id": last_id, "batch": BACKFILL_BATCH},
+            ).scalar()
+            if row is None:
+                break
+            bind.execute(
+                sa.text("""
+                    UPDATE media_assets
+                    SET ocr_tsv = to_tsvector('simple', coalesce(ocr_text, ''))
+                    WHERE id > :last_id AND id <= :upper AND ocr_tsv IS NULL
+                """),
+                {"last_id": last_id, "upper": row},
+            )
+            last_id = row
+
+    # 4) GIN index without blocking writes
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS media_assets_ocr_tsv_gin
+            ON media_assets
+            USING gin (ocr_tsv);
+        """)
+
+    op.execute("ANALYZE media_assets;")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS media_assets_ocr_tsv_gin;")
+    op.execute("DROP TRIGGER IF EXISTS media_assets_ocr_tsv_trg ON media_assets;")
+    op.execute("DROP FUNCTION IF EXISTS media_assets_ocr_tsv_update();")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS ocr_tsv;")
@@ -0,0 +1,47 @@
+"""add document_chunks for passage-level embeddings
+
+Revision ID: 9e2f4a6b8c15
+Revises: 5b1e9c3a7f20
+Create Date: 2026-10-18 11:40:03.918274
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2f4a6b8c15'
+down_revision: str | Sequence[str] | None = '5b1e9c3a7f20'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_chunks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("asset_id", sa.Integer(), sa.ForeignKey("media_assets.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("embedding", Vector(384), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.UniqueConstraint("asset_id", "chunk_index"),
+    )
+    op.create_index("ix_document_chunks_asset_id", "document_chunks", ["asset_id"])
+
+    # Fixed like media_assets' index from dd07e2692202 (ivfflat, cosine); app.jobs.ann_index
+    # switches both tables to another type/metric/storage. The table starts empty: with
+    # ivfflat, REINDEX once chunks are backfilled so the list centroids reflect real data.
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS document_chunks_embedding_ann
+        ON document_chunks
+        USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS document_chunks_embedding_ann;")
+    op.drop_index("ix_document_chunks_asset_id", table_name="document_chunks")
+    op.drop_table("document_chunks")
@@ -0,0 +1,39 @@
+"""add content-addressed embedding_cache table
+
+Revision ID: b4a7d1e9c362
+Revises: 9e2f4a6b8c15
+Create Date: 2026-10-18 13:05:27.551903
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4a7d1e9c362'
+down_revision: str | Sequence[str] | None = '9e2f4a6b8c15'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Unconstrained vector: entries of different models/dims share the table.
+    # Lookups go by primary key only, so no ANN index.
+    op.create_table(
+        "embedding_cache",
+        sa.Column("text_sha256", sa.String(length=64), nullable=False),
+        sa.Column("model_id", sa.String(), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("embedding", Vector(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("text_sha256", "model_id", "dim"),
+    )
+    # prune job deletes by model_id
+    op.create_index("ix_embedding_cache_model_id", "embedding_cache", ["model_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_embedding_cache_model_id", table_name="embedding_cache")
+    op.drop_table("embedding_cache")
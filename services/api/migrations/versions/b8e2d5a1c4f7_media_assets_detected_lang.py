@@ -0,0 +1,25 @@
+"""media_assets.detected_lang (OCR language pre-pass, cached per asset)
+
+Revision ID: b8e2d5a1c4f7
+Revises: f3a9c2d7b481
+Create Date: 2026-10-18 21:06:37.402115
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2d5a1c4f7'
+down_revision: str | Sequence[str] | None = 'f3a9c2d7b481'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: catalog-only change; existing assets are detected on their next OCR run
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS detected_lang varchar;")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS detected_lang;")
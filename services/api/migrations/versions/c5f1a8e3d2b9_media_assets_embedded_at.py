@@ -0,0 +1,28 @@
+"""media_assets.embedded_at (delta key for the in-process exact index)
+
+Revision ID: c5f1a8e3d2b9
+Revises: b8e2d5a1c4f7
+Create Date: 2026-10-19 10:14:52.730418
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a8e3d2b9'
+down_revision: str | Sequence[str] | None = 'b8e2d5a1c4f7'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: catalog-only change. Existing rows are read by the first full
+    # rebuild; only rows embedded from now on need the stamp to show up in a delta.
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS embedded_at timestamptz;")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_media_assets_embedded_at ON media_assets (embedded_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_media_assets_embedded_at;")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS embedded_at;")
@@ -0,0 +1,66 @@
+"""record the embedding model per row + shadow columns for re-embedding
+
+Revision ID: d2f8a3c6e017
+Revises: b4a7d1e9c362
+Create Date: 2026-10-18 14:21:48.306712
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.config import get_settings
+from app.infra.embedding_model import embedding_model_id
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a3c6e017'
+down_revision: str | Sequence[str] | None = 'b4a7d1e9c362'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    # Nullable, no default: catalog-only changes
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS embedding_model text;")
+    # unconstrained vector: the next model may have another dimension
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS embedding_pending vector;")
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS embedding_pending_model text;")
+
+    # Existing vectors came from the configured model; tag them exactly like save_embedding does
+    settings = get_settings()
+    model_id = embedding_model_id(settings.embed_model, settings.embed_backend)
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            upper = bind.execute(
+                sa.text("""
+                    SELECT max(id) FROM (
+                        SELECT id FROM media_assets
+                        WHERE id > :last_id
+                        ORDER BY id
+                        LIMIT :batch
+                    ) s
+                """),
+                {"last_id": last_id, "batch": BACKFILL_BATCH},
+            ).scalar()
+            if upper is None:
+                break
+            bind.execute(
+                sa.text("""
+                    UPDATE media_assets SET embedding_model = :model
+                    WHERE id > :last_id AND id <= :upper
+                      AND embedding IS NOT NULL AND embedding_model IS NULL
+                """),
+                {"model": model_id, "last_id": last_id, "upper": upper},
+            )
+            last_id = upper
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS embedding_pending_model;")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS embedding_pending;")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS embedding_model;")
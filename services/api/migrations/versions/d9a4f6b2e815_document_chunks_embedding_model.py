@@ -0,0 +1,34 @@
+"""document_chunks: embedding model per row + shadow columns for re-embedding
+
+Revision ID: d9a4f6b2e815
+Revises: c5f1a8e3d2b9
+Create Date: 2026-10-19 11:02:17.584903
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4f6b2e815'
+down_revision: str | Sequence[str] | None = 'c5f1a8e3d2b9'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: catalog-only changes
+    op.execute("ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_model text;")
+    # unconstrained vector: the next model may have another dimension
+    op.execute("ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_pending vector;")
+    op.execute("ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_pending_model text;")
+
+    # No backfill: a chunk's model cannot be told from its asset's (the asset may have been
+    # re-embedded without its chunks). Untagged chunks count as another model's, so the next
+    # app.jobs.reembed walk re-embeds them once.
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_pending_model;")
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_pending;")
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_model;")
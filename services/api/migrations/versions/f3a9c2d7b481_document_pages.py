@@ -0,0 +1,38 @@
+"""per-page OCR text (document_pages) + media_assets.ocr_pages_total
+
+Revision ID: f3a9c2d7b481
+Revises: d2f8a3c6e017
+Create Date: 2026-10-18 17:42:09.118254
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d7b481'
+down_revision: str | Sequence[str] | None = 'd2f8a3c6e017'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nullable, no default: catalog-only change
+    op.execute("ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS ocr_pages_total integer;")
+    # The primary key (asset_id, page_no) serves resume, progress and ordered assembly
+    op.create_table(
+        "document_pages",
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        sa.Column("page_no", sa.Integer(), nullable=False),
+        sa.Column("lang", sa.String(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["asset_id"], ["media_assets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("asset_id", "page_no"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_pages")
+    op.execute("ALTER TABLE media_assets DROP COLUMN IF EXISTS ocr_pages_total;")
@@ -0,0 +1,67 @@
+"""
+Embedding throughput on a query/OCR mix: fixed 5000-char cut vs. token-aware clip.
+
+"before" feeds encode() the old text[:5000] inputs; "after" goes through
+EmbeddingModel.embed_texts (clip at max_seq_length * CHARS_PER_TOKEN, one
+tokenization, length-sorted batches). Both produce the same vectors whenever
+the first max_seq_length tokens fit in the cut, which the script also checks.
+
+Usage (from services/api):
+    python -m scripts.bench_embed_truncation --backend torch --texts 1000 --long-share 0.3
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.infra.embedding_model import BACKENDS, EmbeddingModel
+
+WORDS = (
+    "container vessel port oslo rotterdam hamburg cargo pallet freight invoice bill lading "
+    "shipper consignee customs tariff hazardous reefer weight volume draft berth crane "
+    "kg 1200 45HC MSKU7781234 NO-0150 etd eta incoterms fob cif dap"
+).split()
+
+
+def _mix(n: int, long_share: float, rnd: random.Random) -> list[str]:
+    out = []
+    for _ in range(n):
+        if rnd.random() < long_share:
+            out.append(" ".join(rnd.choices(WORDS, k=rnd.randint(800, 3000))))  # OCR page(s)
+        else:
+            out.append(" ".join(rnd.choices(WORDS, k=rnd.randint(2, 8))))  # search query
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", default="torch", choices=BACKENDS)
+    ap.add_argument("--texts", type=int, default=1000)
+    ap.add_argument("--long-share", type=float, default=0.3, help="fraction of long OCR texts")
+    ap.add_argument("--batch-size", type=int, default=32)
+    args = ap.parse_args()
+
+    texts = _mix(args.texts, args.long_share, random.Random(0))
+    model = EmbeddingModel(device="cpu", backend=args.backend, batch_size=args.batch_size)
+    model.embed_texts(texts[:args.batch_size])  # load + warm up
+    encoder = model._get_model()
+
+    start = time.perf_counter()
+    before = encoder.encode([t[:5000] for t in texts], batch_size=args.batch_size, normalize_embeddings=True, convert_to_numpy=True)
+    t_before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = np.asarray(model.embed_texts(texts))
+    t_after = time.perf_counter() - start
+
+    chars_before = sum(min(len(t), 5000) for t in texts)
+    chars_after = sum(len(model._clip(encoder, t)) for t in texts)
+    cos = (before * after).sum(axis=1)
+    print(f"before  {len(texts) / t_before:>8.1f} texts/s  chars tokenized {chars_before:>10}")
+    print(f"after   {len(texts) / t_after:>8.1f} texts/s  chars tokenized {chars_after:>10}")
+    print(f"min cosine before/after {cos.min():.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Embedding throughput per backend (torch, onnx, onnx-int8) on this machine.
+
+Reports texts/s for batched embed_texts and p50/p95 latency of single-text
+embed_text (the /search path).
+
+Usage (from services/api):
+    python -m scripts.bench_embedding_backends
+    python -m scripts.bench_embedding_backends --backends torch onnx-int8 --texts 2000 --threads 4
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.core.config import get_settings
+from app.infra.embedding_model import BACKENDS, EmbeddingModel
+
+WORDS = (
+    "container vessel port oslo rotterdam hamburg cargo pallet freight invoice bill lading "
+    "shipper consignee customs tariff hazardous reefer weight volume draft berth crane"
+).split()
+
+
+def _corpus(n: int, words: int) -> list[str]:
+    rnd = random.Random(0)
+    return [" ".join(rnd.choices(WORDS, k=rnd.randint(words // 2, words))) for _ in range(n)]
+
+
+def bench(backend: str, texts: list[str], singles: int, batch_size: int, threads: int, onnx_dir: str) -> None:
+    model = EmbeddingModel(device="cpu", backend=backend, batch_size=batch_size, onnx_dir=onnx_dir, onnx_threads=threads)
+    model.embed_texts(texts[:batch_size])  # load / export + warm up
+
+    start = time.perf_counter()
+    model.embed_texts(texts)
+    batched = time.perf_counter() - start
+
+    lat = []
+    for t in texts[:singles]:
+        s = time.perf_counter()
+        model.embed_text(t)
+        lat.append((time.perf_counter() - s) * 1000)
+    lat.sort()
+    print(
+        f"{backend:<10} batched {len(texts) / batched:>8.1f} texts/s"
+        f"  single p50 {statistics.median(lat):>6.2f} ms  p95 {lat[int(len(lat) * 0.95) - 1]:>6.2f} ms"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    ap.add_argument("--texts", type=int, default=1000)
+    ap.add_argument("--words", type=int, default=60, help="max words per text")
+    ap.add_argument("--singles", type=int, default=200, help="single-text calls for the latency figures")
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = default)")
+    args = ap.parse_args()
+
+    texts = _corpus(args.texts, args.words)
+    for backend in args.backends:
+        bench(backend, texts, min(args.singles, len(texts)), args.batch_size, args.threads, get_settings().embed_onnx_dir)
+
+
+if __name__ == "__main__":
+    main()
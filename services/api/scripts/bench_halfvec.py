@@ -0,0 +1,118 @@
+"""
+float32 vs halfvec ANN index: size, recall@k and latency on a synthetic corpus.
+
+Builds a scratch table (bench_halfvec, dropped afterwards unless --keep) with
+clustered unit vectors, indexes it once as `embedding` (vector) and once as
+`(embedding::halfvec(dim))`, and runs the same queries against both. Ground
+truth is exact float32 top-k computed in numpy.
+
+Usage (from services/api, against a scratch database):
+    python -m scripts.bench_halfvec --rows 50000 --index ivfflat --probes 10
+    python -m scripts.bench_halfvec --rows 50000 --index hnsw --ef-search 64
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+from pgvector.psycopg import Vector as PgVector
+from sqlalchemy import text
+
+from app.core.db import SessionLocal
+
+TABLE = "bench_halfvec"
+
+
+def _corpus(rows: int, centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    x = centers[rng.integers(0, len(centers), rows)] + 0.35 * rng.standard_normal((rows, centers.shape[1])).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _load(db, vecs: np.ndarray, batch: int = 2000) -> None:
+    dim = vecs.shape[1]
+    with db.begin():
+        db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        db.execute(text(f"CREATE TABLE {TABLE} (id int PRIMARY KEY, embedding vector({dim}) NOT NULL)"))
+    for start in range(0, len(vecs), batch):
+        with db.begin():
+            db.execute(
+                text(f"INSERT INTO {TABLE} (id, embedding) VALUES (:id, :emb)"),
+                [{"id": i, "emb": PgVector(vecs[i])} for i in range(start, min(start + batch, len(vecs)))],
+            )
+    with db.begin():
+        db.execute(text(f"ANALYZE {TABLE}"))
+
+
+def _build(db, kind: str, half: bool, dim: int, lists: int) -> int:
+    name = f"{TABLE}_{'half' if half else 'full'}"
+    expr = f"(embedding::halfvec({dim})) halfvec_cosine_ops" if half else "embedding vector_cosine_ops"
+    opts = "WITH (m = 16, ef_construction = 64)" if kind == "hnsw" else f"WITH (lists = {lists})"
+    with db.begin():
+        db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        db.execute(text(f"CREATE INDEX {name} ON {TABLE} USING {kind} ({expr}) {opts}"))
+        size = db.execute(text("SELECT pg_relation_size(CAST(:n AS regclass))"), {"n": name}).scalar()
+    return size
+
+
+def _run(db, queries: np.ndarray, truth: list[set[int]], half: bool, kind: str, k: int, knob: int, dim: int) -> dict:
+    col, q = (f"(embedding::halfvec({dim}))", f"CAST(:q AS halfvec({dim}))") if half else ("embedding", ":q")
+    sql = text(f"SELECT id FROM {TABLE} ORDER BY {col} <=> {q} LIMIT :k")
+    setting = f"SET LOCAL hnsw.ef_search = {knob}" if kind == "hnsw" else f"SET LOCAL ivfflat.probes = {knob}"
+    lat, hits = [], 0
+    for qv, want in zip(queries, truth, strict=True):
+        with db.begin():
+            db.execute(text(setting))
+            start = time.perf_counter()
+            got = db.execute(sql, {"q": PgVector(qv), "k": k}).scalars().all()
+            lat.append((time.perf_counter() - start) * 1000)
+        hits += len(want.intersection(got))
+    lat.sort()
+    return {
+        "recall": hits / (k * len(queries)),
+        "p50": statistics.median(lat),
+        "p95": lat[max(0, int(len(lat) * 0.95) - 1)],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--clusters", type=int, default=200)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--index", choices=["ivfflat", "hnsw"], default="ivfflat")
+    ap.add_argument("--lists", type=int, default=100)
+    ap.add_argument("--probes", type=int, default=10)
+    ap.add_argument("--ef-search", type=int, default=64)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch table")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.clusters, args.dim)).astype(np.float32)
+    vecs = _corpus(args.rows, centers, rng)
+    queries = _corpus(args.queries, centers, rng)
+    top = np.argsort(-(queries @ vecs.T), axis=1)[:, :args.k]
+    truth = [set(map(int, row)) for row in top]
+    knob = args.ef_search if args.index == "hnsw" else args.probes
+
+    with SessionLocal() as db:
+        _load(db, vecs)
+        try:
+            for half in (False, True):
+                size = _build(db, args.index, half, args.dim, args.lists)
+                with db.begin():
+                    db.execute(text(f"DROP INDEX IF EXISTS {TABLE}_{'full' if half else 'half'}"))
+                r = _run(db, queries, truth, half, args.index, args.k, knob, args.dim)
+                print(
+                    f"{'halfvec' if half else 'vector':<8} index {size / 2**20:>7.1f} MiB"
+                    f"  recall@{args.k} {r['recall']:.4f}  p50 {r['p50']:.2f} ms  p95 {r['p95']:.2f} ms"
+                )
+        finally:
+            if not args.keep:
+                with db.begin():
+                    db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+OCR throughput: pytesseract (a tesseract process per page) vs. pooled tesserocr handles.
+
+Both backends get the same preprocessed grayscale pages through ocr_image(), so
+the difference is process spawn + temp files + traineddata load per page versus
+one initialized handle reused for every page. The tesserocr handle is created
+before timing starts and its load time is printed on its own line. Texts are
+compared, since both paths should read identically with the same libtesseract.
+
+Fixtures: every PDF/PNG/JPEG/TIFF under --dir (PDF pages rendered like OcrEngine
+does), or generated scanned pages when --dir is omitted.
+
+Usage (from services/api):
+    python -m scripts.bench_ocr_backends --pages 20
+    python -m scripts.bench_ocr_backends --dir tests/fixtures/scans --lang eng+nor --rounds 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from app.infra.ocr_engine import OcrEngine, configure_tesseract_pool, ocr_image
+from scripts.bench_ocr_render import _scanned_pdf
+
+CONFIG = "--oem 3 --psm 6"
+
+
+def _pages_from_pdf(path: str, engine: OcrEngine) -> list[Image.Image]:
+    out = []
+    with fitz.open(path) as doc:
+        for page in doc:
+            pix = page.get_pixmap(dpi=engine.page_dpi(fitz, page), colorspace=fitz.csGRAY, alpha=False)
+            out.append(Image.frombytes("L", (pix.width, pix.height), pix.samples))
+    return out
+
+
+def _fixtures(args) -> list[Image.Image]:
+    engine = OcrEngine(adaptive_dpi=True)
+    if not args.dir:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scan.pdf")
+            _scanned_pdf(args.pages, path)
+            return _pages_from_pdf(path, engine)
+    pages = []
+    for name in sorted(os.listdir(args.dir)):
+        path = os.path.join(args.dir, name)
+        if name.lower().endswith(".pdf"):
+            pages += _pages_from_pdf(path, engine)
+        elif name.lower().endswith((".png", ".jpg", ".jpeg", ".tif", ".tiff")):
+            pages.append(Image.open(path).convert("L"))
+    return pages
+
+
+def _run(pages: list[Image.Image], backend: str, lang: str) -> tuple[list[str], list[float]]:
+    texts, lat = [], []
+    for img in pages:
+        start = time.perf_counter()
+        texts.append(ocr_image(img, lang, CONFIG, backend))
+        lat.append(time.perf_counter() - start)
+    return texts, lat
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dir", help="fixture directory (default: generated pages)")
+    ap.add_argument("--pages", type=int, default=20, help="generated pages when --dir is omitted")
+    ap.add_argument("--lang", default="eng")
+    ap.add_argument("--rounds", type=int, default=1)
+    args = ap.parse_args()
+
+    pages = _fixtures(args)
+    print(f"{len(pages)} pages, lang={args.lang}, {args.rounds} round(s)")
+
+    pool = configure_tesseract_pool()
+    start = time.perf_counter()
+    with pool.acquire(args.lang, 3, 6):
+        pass
+    print(f"tesserocr handle init: {(time.perf_counter() - start) * 1000:.0f} ms (once per process and language set)")
+
+    results = {}
+    for backend in ("pytesseract", "tesserocr"):
+        lat = []
+        for _ in range(args.rounds):
+            texts, round_lat = _run(pages, backend, args.lang)
+            lat += round_lat
+        results[backend] = texts
+        print(f"{backend:<12} {len(lat) / sum(lat):6.2f} pages/s   mean {sum(lat) / len(lat) * 1000:7.1f} ms/page")
+
+    same = sum(a.strip() == b.strip() for a, b in zip(results["pytesseract"], results["tesserocr"], strict=True))
+    print(f"identical text on {same}/{len(pages)} pages")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Per-page raster cost of image-only PDF OCR: old PNG round-trip vs. grayscale zero-copy.
+
+before: fixed 200 DPI RGB pixmap -> PNG bytes -> PIL decode -> convert("L")
+after:  OcrEngine.page_dpi (adaptive) -> grayscale pixmap -> Image.frombuffer over pix.samples
+
+Both then run the same autocontrast + median filter (and Tesseract with --ocr).
+Each mode runs in its own interpreter, so the reported peak RSS is that mode's.
+Without --pdf a scanned-looking PDF (pages of text stored as images) is generated.
+
+Usage (from services/api):
+    python -m scripts.bench_ocr_render --pages 10
+    python -m scripts.bench_ocr_render --pdf ~/tariff_scan.pdf --ocr
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageFilter, ImageOps
+
+from app.infra.ocr_engine import OcrEngine, ocr_image
+
+LINES = (
+    "Ocean freight rate sheet  POL NOOSL  POD NLRTM  valid 2026-11-01",
+    "20DV USD 1450  40DV USD 2380  40HC USD 2410  BAF incl.  THC origin NOK 2150",
+    "Surcharges: ISPS EUR 12 / cntr, LSS USD 45, PSS on request, free time 7 days",
+)
+
+
+def _scanned_pdf(pages: int, path: str) -> None:
+    src, out = fitz.open(), fitz.open()
+    for n in range(pages):
+        page = src.new_page()
+        for i, y in enumerate(range(72, 760, 16)):
+            page.insert_text((56, y), f"{LINES[(i + n) % len(LINES)]}  ({n + 1}.{i})", fontsize=9 + n % 4)
+        png = page.get_pixmap(dpi=200, colorspace=fitz.csGRAY).tobytes("png")
+        out.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, stream=png)
+    out.save(path)
+
+
+def _prep(img: Image.Image) -> Image.Image:
+    return ImageOps.autocontrast(img).filter(ImageFilter.MedianFilter(size=3))
+
+
+def _run_mode(mode: str, pdf: str, ocr: bool) -> dict:
+    engine = OcrEngine(adaptive_dpi=True)
+    pages = []
+    with fitz.open(pdf) as doc:
+        for page in doc:
+            start = time.perf_counter()
+            if mode == "before":
+                dpi = 200
+                pix = page.get_pixmap(dpi=dpi, alpha=False)
+                img = Image.open(io.BytesIO(pix.tobytes("png"))).convert("RGB").convert("L")
+            else:
+                dpi = engine.page_dpi(fitz, page)
+                pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+                img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+            render_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            _prep(img)
+            prep_ms = (time.perf_counter() - start) * 1000
+            ocr_ms = 0.0
+            if ocr:
+                start = time.perf_counter()
+                ocr_image(img, "eng", "--oem 3 --psm 6")
+                ocr_ms = (time.perf_counter() - start) * 1000
+            pages.append({"dpi": dpi, "render_ms": render_ms, "prep_ms": prep_ms, "ocr_ms": ocr_ms})
+            del img, pix
+    return {"pages": pages, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def _p95(xs: list[float]) -> float:
+    xs = sorted(xs)
+    return xs[max(0, int(len(xs) * 0.95) - 1)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pdf", help="image-only PDF to measure (default: generated)")
+    ap.add_argument("--pages", type=int, default=10, help="pages of the generated PDF")
+    ap.add_argument("--ocr", action="store_true", help="include Tesseract time (needs tesseract installed)")
+    ap.add_argument("--mode", choices=["before", "after"], help=argparse.SUPPRESS)  # child process
+    args = ap.parse_args()
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.pdf, args.ocr)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf or os.path.join(tmp, "scan.pdf")
+        if not args.pdf:
+            _scanned_pdf(args.pages, pdf)
+        print(f"{'mode':<7} {'dpi':>5} {'render ms':>16} {'prep ms':>16} {'ocr ms':>16} {'peak RSS':>10}")
+        for mode in ("before", "after"):
+            cmd = [sys.executable, "-m", "scripts.bench_ocr_render", "--mode", mode, "--pdf", pdf]
+            out = subprocess.run(cmd + (["--ocr"] if args.ocr else []), capture_output=True, text=True, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            cols = {k: [p[k] for p in r["pages"]] for k in ("dpi", "render_ms", "prep_ms", "ocr_ms")}
+            fmt = lambda xs: f"{statistics.mean(xs):7.1f} /{_p95(xs):7.1f}"  # noqa: E731
+            print(
+                f"{mode:<7} {statistics.mean(cols['dpi']):>5.0f} {fmt(cols['render_ms']):>16} "
+                f"{fmt(cols['prep_ms']):>16} {fmt(cols['ocr_ms']):>16} {r['peak_rss_mb']:>7.0f} MB"
+            )
+        print("(mean / p95 per page)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Buffer reads for /search: text carried through ranking vs. late-materialized snippets.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) for the old single-statement query (ANN leg selecting
+ocr_text, LEFT(ocr_text, 200) for every candidate) and for the current two steps
+(id/score ranking, then snippets for the final page only), and prints shared
+buffer hits/reads and execution time for each.
+
+Usage (from services/api, against a scratch database):
+    python -m scripts.bench_snippets --seed 50000      # insert synthetic docs first
+    python -m scripts.bench_snippets --queries 20 --limit 10
+    python -m scripts.bench_snippets --cleanup         # drop the synthetic docs
+"""
+import argparse
+import json
+import random
+import statistics
+
+import numpy as np
+from pgvector.psycopg import Vector as PgVector
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.services.search_service import SearchService
+
+SEED_PREFIX = "bench-snippets-"
+WORDS = (
+    "container vessel port oslo rotterdam hamburg cargo pallet freight invoice bill lading "
+    "shipper consignee customs tariff hazardous reefer weight volume draft berth crane "
+    "insurance claim damage delay route transit booking manifest seal inspection"
+).split()
+
+# The ranking statement before late materialization (linear fusion, document mode)
+LEGACY_SQL = """
+    SELECT a.id, a.storage_uri,
+           LEFT(coalesce(a.ocr_text,''), 200) AS snippet,
+           a.distance,
+           coalesce(l.bm25, 0) AS bm25,
+           (0.7 * (1 - LEAST(1.0, a.distance)) + 0.3 * coalesce(l.bm25,0)) AS score
+    FROM (
+        SELECT id, storage_uri, ocr_text, (embedding <=> :qvec)::float AS distance
+        FROM media_assets
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> :qvec
+        LIMIT :candidates
+    ) a
+    LEFT JOIN LATERAL (
+        SELECT ts_rank_cd(m.ocr_tsv, plainto_tsquery('simple', :qtext)) AS bm25
+        FROM media_assets m
+        WHERE m.id = a.id AND m.ocr_tsv @@ plainto_tsquery('simple', :qtext)
+    ) l ON true
+    ORDER BY score DESC, a.distance ASC, a.id ASC
+    LIMIT :limit
+"""
+
+
+def _unit(rng: np.random.Generator, dim: int) -> list[float]:
+    v = rng.standard_normal(dim).astype(np.float32)
+    return (v / np.linalg.norm(v)).tolist()
+
+
+def _doc(rnd: random.Random, chars: int) -> str:
+    out, n = [], 0
+    while n < chars:
+        w = rnd.choice(WORDS)
+        out.append(w)
+        n += len(w) + 1
+    return " ".join(out)
+
+
+def seed(n: int, dim: int, doc_chars: int, batch: int = 1000) -> None:
+    rng, rnd = np.random.default_rng(0), random.Random(0)
+    with SessionLocal() as db:
+        for start in range(0, n, batch):
+            rows = [
+                {
+                    "type": "pdf",
+                    "uri": f"s3://bench/{SEED_PREFIX}{i}",
+                    "sha": f"{SEED_PREFIX}{i}",
+                    "txt": _doc(rnd, doc_chars),
+                    "emb": PgVector(_unit(rng, dim)),
+                }
+                for i in range(start, min(start + batch, n))
+            ]
+            with db.begin():
+                db.execute(
+                    text("""
+                        INSERT INTO media_assets (type, storage_uri, sha256, ocr_text, embedding)
+                        VALUES (:type, :uri, :sha, :txt, :emb)
+                        ON CONFLICT (sha256) DO NOTHING
+                    """),
+                    rows,
+                )
+            print(f"seeded {min(start + batch, n)}/{n}")
+        with db.begin():
+            db.execute(text("ANALYZE media_assets"))
+
+
+def cleanup() -> None:
+    with SessionLocal() as db, db.begin():
+        n = db.execute(text("DELETE FROM media_assets WHERE sha256 LIKE :p"), {"p": SEED_PREFIX + "%"}).rowcount
+    print(f"deleted {n}")
+
+
+def _explain(db, sql: str, params: dict) -> dict:
+    plan = db.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql), params).scalar()
+    plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+    top = plan["Plan"]
+    return {
+        "hit": top.get("Shared Hit Blocks", 0),
+        "read": top.get("Shared Read Blocks", 0),
+        "ms": plan.get("Execution Time", 0.0),
+    }
+
+
+def bench(queries: int, limit: int) -> None:
+    settings = get_settings()
+    svc = SearchService(embedder=None, embed_dim=settings.embed_dim, ann_index=settings.ann_index)
+    candidates = max(limit * 10, 100)
+    rng, rnd = np.random.default_rng(1), random.Random(1)
+    before, after = [], []
+
+    with SessionLocal() as db:
+        for _ in range(queries):
+            qvec = PgVector(_unit(rng, settings.embed_dim))
+            qtext = " ".join(rnd.sample(WORDS, 2))
+            with db.begin():
+                old = _explain(db, LEGACY_SQL, {"qvec": qvec, "qtext": qtext, "candidates": candidates, "limit": limit})
+
+                params = {"qvec_0": qvec, "qtext_0": qtext, "candidates": candidates, "chunk_candidates": candidates}
+                rank = _explain(db, str(svc._batch_sql(1)), params)
+                ids = [r.id for r in db.execute(svc._batch_sql(1), params)][:limit]
+                snip = _explain(
+                    db, svc._snippet_sql(),
+                    {"ids": ids, "chunk_ids": [None] * len(ids), "qtexts": [qtext] * len(ids), "chars": svc.snippet_chars},
+                )
+            before.append(old)
+            after.append({k: rank[k] + snip[k] for k in old})
+
+    def report(label: str, runs: list[dict]) -> None:
+        print(
+            f"{label:<8} shared hit {statistics.median(r['hit'] for r in runs):>8.0f}"
+            f"  read {statistics.median(r['read'] for r in runs):>7.0f}"
+            f"  exec {statistics.median(r['ms'] for r in runs):>8.2f} ms  (median of {len(runs)})"
+        )
+
+    print(f"candidates={candidates} limit={limit}")
+    report("before", before)
+    report("after", after)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seed", type=int, default=0, help="insert this many synthetic documents first")
+    ap.add_argument("--doc-chars", type=int, default=4000, help="ocr_text length of seeded documents")
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--cleanup", action="store_true", help="delete the synthetic documents and exit")
+    args = ap.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.seed, get_settings().embed_dim, args.doc_chars)
+    bench(args.queries, args.limit)
+
+
+if __name__ == "__main__":
+    main()
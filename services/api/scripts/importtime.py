@@ -0,0 +1,106 @@
+"""
+Cold-start import cost of the API, from `python -X importtime`.
+
+Imports the target module in a fresh interpreter, parses the importtime trace
+and prints the total, the slowest top-level packages (cumulative) and the
+slowest single modules (self time). Exits non-zero when the total exceeds
+--budget-ms or a --forbid module got imported, so it doubles as a CI gate.
+
+Usage (from services/api):
+    python -m scripts.importtime
+    python -m scripts.importtime --module app.main --top 15 --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Must only load on first use (see core.deps / infra); importing any of them at startup is a regression
+HEAVY_MODULES = (
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "onnxruntime",
+    "fitz",
+    "pytesseract",
+    "openpyxl",
+    "PIL",
+    "boto3",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class ImportRow:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(trace: str) -> list[ImportRow]:
+    """Rows of `import time: self [us] | cumulative | imported package` lines, in trace order."""
+    rows = []
+    for line in trace.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        rows.append(ImportRow(stripped, int(parts[0]), int(parts[1]), (len(name) - len(stripped) - 1) // 2))
+    return rows
+
+
+def measure(module: str, cwd: str | None = None) -> list[ImportRow]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def total_ms(rows: list[ImportRow], module: str) -> float:
+    return next((r.cumulative_us for r in rows if r.module == module and r.depth == 0), 0) / 1000
+
+
+def heavy_imported(rows: list[ImportRow], heavy: tuple[str, ...] = HEAVY_MODULES) -> list[str]:
+    return sorted({r.module.split(".")[0] for r in rows} & set(heavy))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--module", default="app.main")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--budget-ms", type=float, default=0, help="fail above this total (0 = report only)")
+    ap.add_argument("--forbid", nargs="*", default=list(HEAVY_MODULES), help="modules that must not be imported")
+    args = ap.parse_args()
+
+    rows = measure(args.module, cwd=os.getcwd())
+    total = total_ms(rows, args.module)
+    print(f"import {args.module}: {total:.0f} ms, {len(rows)} modules\n")
+
+    print("slowest top-level packages (cumulative):")
+    for r in sorted((r for r in rows if r.depth <= 1), key=lambda r: -r.cumulative_us)[:args.top]:
+        print(f"  {r.cumulative_us / 1000:>8.1f} ms  {r.module}")
+    print("\nslowest modules (self):")
+    for r in sorted(rows, key=lambda r: -r.self_us)[:args.top]:
+        print(f"  {r.self_us / 1000:>8.1f} ms  {r.module}")
+
+    failed = False
+    heavy = heavy_imported(rows, tuple(args.forbid))
+    if heavy:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if args.budget_ms and total > args.budget_ms:
+        print(f"\nFAIL: {total:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -73,4 +73,18 @@ def ensure_seed(wait_for_api):
 
 @pytest.fixture(scope="session")
 def embedding_model() -> EmbeddingModelPort:
-    return EmbeddingModel()
\ No newline at end of file
+    return EmbeddingModel()
+
+@pytest.fixture
+def passthrough_snippets(monkeypatch):
+    """Unit tests rank without a DB: skip snippet materialization, keep the ranked rows as-is."""
+    from services.api.app.services.search_service import SearchService
+
+    pages_seen = []
+
+    def fake_materialize(self, db, pages):
+        pages_seen.append(pages)
+        return [[dict(r) for r in page] for _, page in pages]
+
+    monkeypatch.setattr(SearchService, "_materialize", fake_materialize)
+    return pages_seen
@@ -0,0 +1,30 @@
+import pytest
+
+from services.api.app.jobs.ann_index import index_ddl, is_target
+
+
+def test_ddl_per_storage_and_kind():
+    name, ddl = index_ddl("media_assets", "hnsw", "l2", m=32, ef_construction=128)
+    assert name == "media_assets_embedding_hnsw_l2"
+    assert "USING hnsw (embedding vector_l2_ops) WITH (m = 32, ef_construction = 128)" in ddl
+
+    name, ddl = index_ddl("document_chunks", "ivfflat", "cosine", storage="halfvec", dim=384)
+    assert name == "document_chunks_embedding_half_ivfflat_cosine"
+    assert "((embedding::halfvec(384)) halfvec_cosine_ops) WITH (lists = 100)" in ddl
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS")
+
+    with pytest.raises(ValueError):
+        index_ddl("media_assets", "btree", "cosine")
+
+
+def test_existing_index_is_matched_by_definition_not_name():
+    # the migration-built default index: same type/opclass as the default settings
+    ivf = "CREATE INDEX media_assets_embedding_ivf ON public.media_assets USING ivfflat (embedding vector_cosine_ops) WITH (lists='100')"
+    half = (
+        "CREATE INDEX x ON public.media_assets USING hnsw "
+        "(((embedding)::halfvec(384)) halfvec_cosine_ops) WITH (m='16', ef_construction='64')"
+    )
+    assert is_target(ivf, "ivfflat", "cosine")
+    assert not is_target(ivf, "hnsw", "cosine") and not is_target(ivf, "ivfflat", "l2")
+    assert not is_target(ivf, "ivfflat", "cosine", storage="halfvec")
+    assert is_target(half, "hnsw", "cosine", storage="halfvec") and not is_target(half, "hnsw", "cosine")
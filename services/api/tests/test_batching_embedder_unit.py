@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from services.api.app.infra.batching_embedder import MicroBatchingEmbedder
+
+
+class _FakeModel:
+    model_id = "fake"
+
+    def __init__(self, fail=False, fail_on=None):
+        self.batches = []
+        self.fail = fail
+        self.fail_on = fail_on
+
+    def embed_texts(self, texts):
+        self.batches.append(list(texts))
+        if self.fail or self.fail_on in texts:
+            raise RuntimeError("boom")
+        return [[float(len(t))] for t in texts]
+
+
+def test_concurrent_callers_share_one_encode():
+    inner = _FakeModel()
+    emb = MicroBatchingEmbedder(inner, max_batch=8, max_wait_ms=200)
+    texts = ["a" * n for n in range(1, 9)]
+    out = {}
+    start = threading.Barrier(len(texts))
+
+    def call(t):
+        start.wait()
+        out[t] = emb.embed_text(t)
+
+    threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(timeout=5)
+
+    assert all(out[t] == [float(len(t))] for t in texts)  # each caller gets its own vector
+    assert len(inner.batches) < len(texts)
+    stats = emb.stats()
+    assert stats["items"] == len(texts) and stats["max_batch_seen"] <= 8
+    assert emb.model_id == "fake"
+
+
+def test_large_lists_bypass_the_queue():
+    inner = _FakeModel()
+    emb = MicroBatchingEmbedder(inner, max_batch=2)
+    assert emb.embed_texts(["x", "yy", "zzz"]) == [[1.0], [2.0], [3.0]]
+    assert inner.batches == [["x", "yy", "zzz"]] and emb.stats()["batches"] == 0
+
+
+def test_encode_errors_reach_every_caller():
+    emb = MicroBatchingEmbedder(_FakeModel(fail=True), max_batch=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        emb.embed_text("x")
+
+
+def test_one_bad_input_fails_only_its_caller():
+    inner = _FakeModel(fail_on="bad")
+    emb = MicroBatchingEmbedder(inner, max_batch=4, max_wait_ms=200)
+    texts = ["a", "bb", "bad", "cccc"]
+    out = {}
+    start = threading.Barrier(len(texts))
+
+    def call(t):
+        start.wait()
+        try:
+            out[t] = emb.embed_text(t)
+        except RuntimeError as e:
+            out[t] = e
+
+    threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(timeout=5)
+
+    assert isinstance(out["bad"], RuntimeError)
+    assert {t: out[t] for t in ("a", "bb", "cccc")} == {"a": [1.0], "bb": [2.0], "cccc": [4.0]}
+    assert any(len(b) > 1 and "bad" in b for b in inner.batches)  # they really were coalesced with it
@@ -0,0 +1,91 @@
+from sqlalchemy.dialects import postgresql
+
+from services.api.app.infra.sqlalchemy_embedding_cache_repo import SqlAlchemyEmbeddingCacheRepo
+from services.api.app.services.document_service import DocumentService
+
+
+class _Embedder:
+    model_id = "m1"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_texts(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class _MemoryCacheRepo:
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    def get_many(self, db, model_id, dim, hashes):
+        self.calls.append(("get", model_id, dim))
+        return {h: self.rows[(h, model_id, dim)] for h in hashes if (h, model_id, dim) in self.rows}
+
+    def put_many(self, db, model_id, dim, entries):
+        self.calls.append(("put", model_id, dim))
+        for h, emb in entries.items():
+            self.rows.setdefault((h, model_id, dim), emb)
+
+    def prune(self, db, keep_model_ids):
+        drop = [k for k in self.rows if k[1] not in keep_model_ids]
+        for k in drop:
+            del self.rows[k]
+        return len(drop)
+
+
+def _service(embedder, repo):
+    return DocumentService(
+        ocr=None, embedder=embedder, s3=None, media_asset_repo=None, s3_public_base="",
+        embedding_cache=repo, embed_dim=2,
+    )
+
+
+def test_identical_normalized_text_is_encoded_once():
+    embedder, repo = _Embedder(), _MemoryCacheRepo()
+    svc = _service(embedder, repo)
+
+    first = svc._embed_cached(None, ["Bill of  lading\n", "", "invoice"])
+    again = svc._embed_cached(None, ["bill of lading", " Bill of lading ", "invoice"])
+
+    assert first[1] == [0.0, 0.0]  # blank text: zero vector, never cached
+    assert again[1] == first[0] and again[2] == first[2]
+    assert embedder.calls == [["Bill of lading", "invoice"], ["bill of lading"]]  # case is not normalized
+    stats = svc.embedding_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_entries_are_scoped_by_model():
+    embedder, repo = _Embedder(), _MemoryCacheRepo()
+    _service(embedder, repo)._embed_cached(None, ["invoice"])
+    embedder.model_id = "m2"
+    _service(embedder, repo)._embed_cached(None, ["invoice"])
+    assert len(embedder.calls) == 2
+    assert repo.calls == [("get", "m1", 2), ("put", "m1", 2), ("get", "m2", 2), ("put", "m2", 2)]
+
+
+class _RecordingDb:
+    def __init__(self):
+        self.sql = []
+
+    def execute(self, stmt, params=None):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.sql.append((str(compiled), params[0] if params else compiled.params))
+        return type("R", (), {"all": lambda self: [], "rowcount": 0})()
+
+
+def test_sql_repo_filters_and_prunes_by_model():
+    db, repo = _RecordingDb(), SqlAlchemyEmbeddingCacheRepo()
+    repo.get_many(db, "m2", 2, ["h"])
+    repo.put_many(db, "m2", 2, {"h": [1.0, 0.0]})
+    repo.prune(db, keep_model_ids=["m2"])
+
+    (get_sql, get_params), (put_sql, put_params), (prune_sql, prune_params) = db.sql
+    assert "embedding_cache.model_id = %(model_id_1)s" in get_sql and get_params["model_id_1"] == "m2"
+    assert "embedding_cache.dim = %(dim_1)s" in get_sql and get_params["dim_1"] == 2
+    assert "ON CONFLICT (text_sha256, model_id, dim) DO NOTHING" in put_sql
+    assert (put_params["model_id"], put_params["dim"]) == ("m2", 2)
+    assert prune_sql.startswith("DELETE FROM embedding_cache") and "NOT IN" in prune_sql
+    assert prune_params["model_id_1"] == ["m2"]
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from services.api.app.infra.embedding_model import EmbeddingModel
+
+TEXTS = [
+    "container detention and demurrage calculation",
+    "Bill of lading for 12 pallets of frozen fish, Oslo to Rotterdam",
+    "hazardous cargo class 3, flash point 23C",
+    "",
+]
+
+
+def _vectors(backend, tmp_dir):
+    model = EmbeddingModel(device="cpu", backend=backend, onnx_dir=str(tmp_dir))
+    try:
+        return np.asarray(model.embed_texts(TEXTS))
+    except OSError as e:  # model files not downloadable here
+        pytest.skip(f"embedding model unavailable: {e}")
+
+
+@pytest.mark.parametrize(("backend", "min_cosine"), [("onnx", 0.999), ("onnx-int8", 0.98)])
+def test_onnx_matches_torch(backend, min_cosine, tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    tmp_dir = tmp_path_factory.mktemp("onnx")
+    ref = _vectors("torch", tmp_dir)
+    out = _vectors(backend, tmp_dir)
+
+    assert out.shape == ref.shape == (len(TEXTS), 384)
+    assert np.allclose(np.linalg.norm(out[:-1], axis=1), 1.0, atol=1e-3)
+    assert not out[-1].any()  # blank input stays a zero vector
+    cosine = (out[:-1] * ref[:-1]).sum(axis=1)
+    assert cosine.min() >= min_cosine
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingModel(backend="tensorrt")
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from services.api.app.infra.embedding_server import _Handler, make_server
+from services.api.app.infra.remote_embedding_model import RemoteEmbeddingModel
+
+
+class _FakeModel:
+    def __init__(self, model_id="fake", offset=0.0, fail_on=None):
+        self.model_id = model_id
+        self.offset = offset
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def embed_texts(self, texts):
+        self.calls += 1
+        if self.fail_on in texts:
+            raise ValueError("cannot embed")
+        return [[float(len(t)) + self.offset, 0.5] for t in texts]
+
+    def embed_text(self, text):
+        return self.embed_texts([text])[0]
+
+    def chunk_text(self, text):
+        return text.split("|")
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def _serve(embedder, handler=None):
+        path = str(tmp_path / "e.sock")
+        server = make_server(embedder, socket_path=path)
+        if handler:
+            server.RequestHandlerClass = handler
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"unix://{path}"
+
+    yield _serve
+    for s in servers:
+        s.shutdown()
+        s.server_close()
+
+
+def test_round_trip_over_unix_socket(serve):
+    url = serve(_FakeModel())
+    local = _FakeModel(offset=100.0)
+    client = RemoteEmbeddingModel(url, model_id="fake", fallback=local)
+
+    assert client.embed_texts(["ab", "abcd"]) == [[2.0, 0.5], [4.0, 0.5]]
+    assert client.embed_text("abc") == [3.0, 0.5]
+    assert client.chunk_text("x|y") == ["x", "y"]
+    assert client.embed_texts([]) == []
+    assert local.calls == 0
+    assert client.stats()["remote_calls"] == 3
+
+
+def test_unreachable_server_falls_back_then_waits(tmp_path):
+    local = _FakeModel(offset=100.0)
+    client = RemoteEmbeddingModel(f"unix://{tmp_path}/missing.sock", model_id="fake", fallback=local, retry_s=60)
+
+    assert client.embed_text("ab") == [102.0, 0.5]
+    assert client.embed_text("ab") == [102.0, 0.5]
+    st = client.stats()
+    assert st["fallback_calls"] == 2 and st["remote_calls"] == 0
+    assert st["server_usable"] is False  # second call did not retry the socket
+
+
+def test_model_mismatch_disables_server(serve):
+    url = serve(_FakeModel(model_id="other"))
+    local = _FakeModel(offset=100.0)
+    client = RemoteEmbeddingModel(url, model_id="fake", fallback=local, retry_s=0)
+
+    assert client.embed_text("ab") == [102.0, 0.5]
+    assert client.embed_text("ab") == [102.0, 0.5]
+    assert client.stats()["server_usable"] is False
+    assert client.stats()["remote_calls"] == 0
+
+
+def test_rejects_unknown_scheme():
+    with pytest.raises(ValueError):
+        RemoteEmbeddingModel("tcp://x", model_id="fake", fallback=_FakeModel())
+
+
+class _OneRequestPerConnection(_Handler):
+    def handle(self):
+        self.handle_one_request()  # then close the socket, like a restart or an idle timeout
+
+
+def test_server_restart_between_calls_reopens_the_connection(serve):
+    local = _FakeModel(offset=100.0)
+    url = serve(_FakeModel(), handler=_OneRequestPerConnection)
+    client = RemoteEmbeddingModel(url, model_id="fake", fallback=local)
+    assert client.embed_text("ab") == [2.0, 0.5]
+    assert client.embed_text("abc") == [3.0, 0.5]  # server dropped the kept-alive socket
+
+    serve(_FakeModel(offset=10.0))  # restart on the same socket path
+    assert client.embed_text("ab") == [12.0, 0.5]
+    assert local.calls == 0
+    assert client.stats()["remote_calls"] == 3 and client.stats()["server_usable"] is True
+
+
+def test_rejected_request_falls_back_once_without_marking_the_server_down(serve):
+    url = serve(_FakeModel(fail_on="bad"))
+    local = _FakeModel(offset=100.0)
+    client = RemoteEmbeddingModel(url, model_id="fake", fallback=local, retry_s=60)
+
+    assert client._call(lambda: client._post("/unknown", {}), lambda: "local") == "local"  # 404
+    assert client.embed_texts(["bad"]) == [[103.0, 0.5]]  # 500 for this input only
+    assert client.stats()["server_usable"] is True
+    assert client.embed_text("ab") == [2.0, 0.5]
+    assert local.calls == 1 and client.stats()["remote_calls"] == 1
@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+from services.api.app.infra.exact_vector_index import ExactVectorIndex
+
+
+def _index(ids, vecs):
+    idx = ExactVectorIndex(dim=2)
+    mat = np.asarray(vecs, dtype=np.float32)
+    idx._ids = np.asarray(ids, dtype=np.int64)
+    idx._mat = mat / np.linalg.norm(mat, axis=1, keepdims=True)
+    return idx
+
+
+def test_top_k_ordered_by_distance_then_id():
+    idx = _index([7, 3, 5, 9], [[1, 0], [0, 1], [1, 0], [-1, 0]])
+    hits = idx.search([2.0, 0.0], k=3)
+    assert [h[0] for h in hits] == [5, 7, 3]  # ties broken by id, like the SQL ORDER BY
+    assert [round(h[1], 6) for h in hits] == [0.0, 0.0, 1.0]
+
+
+def test_l2_distance_on_unit_vectors():
+    idx = _index([1], [[0, 1]])
+    ((_, d),) = idx.search([1.0, 0.0], k=5, metric="l2")
+    assert math.isclose(d, math.sqrt(2), rel_tol=1e-6)
+
+
+def test_empty_or_over_budget_is_not_usable():
+    idx = ExactVectorIndex(dim=2)
+    assert not idx.usable() and idx.search([1.0, 0.0], k=3) == []
+    idx = _index([1], [[1, 0]])
+    assert idx.usable()
+    idx._disable(rows=1)
+    assert not idx.usable() and idx.stats()["over_budget"]
+
+
+class _Db:
+    """media_assets as {id: (embedding or None, embedded_at)}; answers the index's three queries."""
+
+    def __init__(self):
+        self.rows = {}
+        self.clock = 100.0
+        self.vector_reads = 0
+
+    def embed(self, row_id, vec):
+        self.clock += 1
+        self.rows[row_id] = (vec, self.clock)
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "clock_timestamp" in sql:
+            return _Result([(_ts(self.clock),)])
+        if "count(*)" in sql:
+            return _Result([(sum(v is not None for v, _ in self.rows.values()),)])
+        self.vector_reads += 1
+        since = params["since"]
+        picked = [
+            (i, v) for i, (v, at) in sorted(self.rows.items())
+            if i > params["after"] and (v is not None if since is None else _ts(at) > since)
+        ]
+        return _Result(picked[: params["batch"]])
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one(self):
+        return self.rows[0][0]
+
+
+def _ts(seconds):
+    from datetime import UTC, datetime
+
+    return datetime.fromtimestamp(seconds, UTC)
+
+
+def test_delta_picks_up_out_of_order_and_re_embedded_rows():
+    db = _Db()
+    db.embed(1, [1, 0])
+    idx = ExactVectorIndex(dim=2, lag_s=0)
+    idx.refresh(db, force=True)
+    db.embed(3, [0, 1])
+    db.embed(2, [1, 1])  # lower id embedded later
+    db.embed(1, [-1, 0])  # re-embedded
+    idx.refresh(db, force=True)
+    assert idx._ids.tolist() == [1, 2, 3]
+    assert idx.search([-1.0, 0.0], k=1)[0][0] == 1
+
+    db.rows[3] = (None, db.clock + 1)  # embedding cleared
+    db.clock += 1
+    idx.refresh(db, force=True)
+    assert idx._ids.tolist() == [1, 2]
+
+
+def test_over_budget_corpus_is_counted_not_read():
+    db = _Db()
+    for i in range(1, 11):
+        db.embed(i, [1, 0])
+    idx = ExactVectorIndex(dim=2, max_bytes=5 * (2 * 4 + 8))
+    idx.refresh(db, force=True)
+    assert idx.over_budget and db.vector_reads == 0
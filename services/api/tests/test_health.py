@@ -1,4 +1,5 @@
 # services/api/tests/test_health.py
+import pytest
 from fastapi.testclient import TestClient
 
 from services.api.app.main import app
@@ -10,3 +11,22 @@ def test_health():
     r = client.get("/health")
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
+
+
+def test_startup_ann_plan_check_reaches_the_search_service(monkeypatch):
+    from contextlib import nullcontext
+
+    from services.api.app import main
+
+    checked = []
+
+    class _Search:
+        def check_ann_plan(self, db):
+            checked.append(db)
+            return True
+
+    monkeypatch.setattr(main, "SessionLocal", lambda: nullcontext("db"))
+    monkeypatch.setattr(main, "_search_singleton", lambda: _Search())
+    monkeypatch.setattr(main.log, "warning", lambda *a, **k: pytest.fail(f"plan check failed: {a} {k}"))
+    main._check_ann_plan()
+    assert checked == ["db"]
@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+
+from services.api.scripts.importtime import (
+    HEAVY_MODULES,
+    heavy_imported,
+    measure,
+    parse_importtime,
+    total_ms,
+)
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+# Generous: fastapi + sqlalchemy + pydantic alone take ~0.7 s on a laptop; torch alone is several seconds
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+
+
+def test_parse_importtime_rows():
+    trace = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   fitz.utils\n"
+        "import time:       300 |        420 | fitz\n"
+    )
+    rows = parse_importtime(trace)
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in rows] == [("fitz.utils", 120, 120, 1), ("fitz", 300, 420, 0)]
+    assert total_ms(rows, "fitz") == 0.42
+    assert heavy_imported(rows) == ["fitz"]
+
+
+def test_app_main_imports_no_heavy_modules_within_budget():
+    # fresh interpreter, so modules already imported by other tests don't hide anything
+    rows = measure("app.main", cwd=str(API_DIR))
+    assert heavy_imported(rows, HEAVY_MODULES) == []
+    assert total_ms(rows, "app.main") < IMPORT_BUDGET_MS
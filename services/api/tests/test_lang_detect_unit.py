@@ -0,0 +1,127 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from services.api.app.infra.lang_detect import pick_languages
+from services.api.app.services.document_service import DocumentService
+
+ENG = "Rates are valid until 30 November and include BAF. THC at origin is charged by the carrier on all containers."
+NOR = "Prisene er gyldige til 30. november og gjelder per container. Tillegg for farlig gods kommer i tillegg til fraktraten."
+
+
+def test_single_language_documents_get_one_model():
+    assert pick_languages(ENG * 2) == "eng"
+    assert pick_languages(NOR * 2) == "nor"
+
+
+def test_a_few_foreign_terms_do_not_add_a_model():
+    # a long English rate sheet with one Norwegian remark line
+    assert pick_languages(ENG * 6 + " Gjelder ikke for farlig gods.") == "eng"
+
+
+def test_bilingual_text_keeps_both_in_candidate_order():
+    assert pick_languages(ENG + " " + NOR) == "eng+nor"
+    assert pick_languages(NOR + " " + ENG, candidates=("nor", "eng")) == "nor+eng"
+
+
+def test_unsure_returns_none():
+    assert pick_languages("POL NOOSL POD NLRTM 20DV 1450 40HC 2410") is None  # codes and numbers only
+    assert pick_languages(ENG * 2, candidates=("eng", "deu")) is None  # no word list to judge with
+
+
+class _Db:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class _Ocr:
+    def __init__(self, detected):
+        self.detected = detected
+        self.detections = 0
+        self.langs = []
+
+    def detect_lang(self, blob, mime):
+        self.detections += 1
+        return self.detected
+
+    def image_bytes_to_text(self, blob, lang=None):
+        self.langs.append(lang)
+        return "text"
+
+
+class _Repo:
+    def __init__(self):
+        self.asset = SimpleNamespace(id=7, type="image/png", storage_uri="s3://b/k", detected_lang=None, ocr_text=None)
+
+    def get(self, db, asset_id):
+        return self.asset
+
+    def save_detected_lang(self, db, asset_id, lang):
+        self.asset.detected_lang = lang
+
+    def save_text(self, db, asset_id, text):
+        self.asset.ocr_text = text
+
+
+def _service(ocr, repo):
+    s3 = SimpleNamespace(get_uri_bytes=lambda uri: b"png")
+    return DocumentService(ocr=ocr, embedder=None, s3=s3, media_asset_repo=repo, s3_public_base="", auto_lang=True)
+
+
+def test_detection_is_cached_per_asset_and_explicit_lang_wins():
+    ocr, repo, db = _Ocr("eng"), _Repo(), _Db()
+    svc = _service(ocr, repo)
+
+    assert svc.run_ocr(db, 7, lang=None).lang == "eng"
+    assert svc.run_ocr(db, 7, lang=None).lang == "eng"
+    assert ocr.detections == 1 and repo.asset.detected_lang == "eng"
+
+    assert svc.run_ocr(db, 7, lang="nor").lang == "nor"
+    assert ocr.langs == ["eng", "eng", "nor"] and ocr.detections == 1
+
+
+def test_failed_detection_falls_back_to_default_and_is_not_cached():
+    class _Failing(_Ocr):
+        def detect_lang(self, blob, mime):
+            raise RuntimeError("tesseract missing")
+
+    repo = _Repo()
+    assert _service(_Failing(None), repo).run_ocr(_Db(), 7, lang=None).lang == "eng+nor"
+    assert repo.asset.detected_lang is None
+
+
+def test_engine_judges_native_pdf_text_without_ocr(monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    from services.api.app.infra import ocr_engine
+
+    monkeypatch.setattr(ocr_engine, "ocr_raster", lambda *a, **k: pytest.fail("native text needs no OCR"))
+    doc = fitz.open()
+    for _ in range(2):
+        page = doc.new_page()
+        for i, y in enumerate(range(72, 400, 14)):
+            page.insert_text((56, y), (ENG + " " + ENG)[i * 20:i * 20 + 80])
+    assert ocr_engine.OcrEngine().detect_lang(doc.tobytes(), "application/pdf") == "eng"
+
+
+def test_scanned_sample_is_one_band_in_the_first_language(monkeypatch):
+    pytest.importorskip("fitz")
+    from PIL import Image
+
+    from services.api.app.infra import ocr_engine
+
+    calls = []
+
+    def fake_ocr_image(img, lang, config, backend="pytesseract"):
+        calls.append((img.size, lang))
+        return NOR * 2
+
+    monkeypatch.setattr(ocr_engine, "ocr_image", fake_ocr_image)
+    buf = io.BytesIO()
+    Image.new("L", (1000, 2000), 255).save(buf, format="PNG")
+
+    assert ocr_engine.OcrEngine().detect_lang(buf.getvalue(), "image/png") == "nor"
+    assert calls == [((1000, 500), "eng")]  # a quarter of the page, single model, one call
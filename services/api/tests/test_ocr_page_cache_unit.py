@@ -0,0 +1,67 @@
+import os
+import time
+
+import pytest
+
+from services.api.app.infra.ocr_page_cache import OcrPageCache, page_key
+
+
+def test_key_covers_pixels_lang_and_config():
+    base = page_key(2, 1, b"\x00" * 6, "eng", "--psm 6")
+    assert base == page_key(2, 1, b"\x00" * 6, "eng", "--psm 6")
+    assert base != page_key(2, 1, b"\x01" * 6, "eng", "--psm 6")
+    assert base != page_key(2, 1, b"\x00" * 6, "eng+nor", "--psm 6")
+    assert base != page_key(2, 1, b"\x00" * 6, "eng", "--psm 4")
+
+
+def test_round_trip_stats_and_persistence(tmp_path):
+    cache = OcrPageCache(str(tmp_path))
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, "Terms and conditions æøå")
+    assert cache.get("ab" * 32) == "Terms and conditions æøå"
+    assert cache.stats()["hit_rate"] == 0.5
+
+    reopened = OcrPageCache(str(tmp_path))  # survives restarts
+    assert reopened.get("ab" * 32) == "Terms and conditions æøå"
+    assert reopened.stats()["bytes"] > 0
+
+
+def test_overwriting_a_key_counts_only_the_new_size(tmp_path):
+    cache = OcrPageCache(str(tmp_path), max_bytes=250)
+    for _ in range(3):
+        cache.put("ab" * 32, "x" * 100)
+    cache.put("ab" * 32, "x" * 120)
+    assert cache.stats()["bytes"] == 120
+    assert cache.stats()["evictions"] == 0 and cache.get("ab" * 32) == "x" * 120
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = OcrPageCache(str(tmp_path), max_bytes=350)
+    for i, k in enumerate(("aa", "bb", "cc")):
+        cache.put(k * 32, "x" * 100)
+        os.utime(cache._path(k * 32), (time.time() + i, time.time() + i))
+    # "bb" and "cc" are newer than "aa"; writing "dd" pushes the total over 350
+    cache.put("dd" * 32, "x" * 100)
+    assert cache.get("aa" * 32) is None
+    assert cache.get("dd" * 32) == "x" * 100
+    assert cache.stats()["evictions"] >= 1 and cache.stats()["bytes"] <= 315
+
+
+def test_repeated_page_in_a_new_pdf_skips_tesseract(tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    from services.api.app.infra import ocr_engine
+
+    calls = []
+    monkeypatch.setattr(ocr_engine, "ocr_raster", lambda raster, lang, config, backend="pytesseract": calls.append(lang) or "surcharges")
+
+    def pdf(cover):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), cover)  # differs per file (new sha256)
+        doc.new_page(width=200, height=200)  # identical scanned page
+        return doc.tobytes()
+
+    engine = ocr_engine.OcrEngine(pdf_dpi=72, page_cache=OcrPageCache(str(tmp_path)))
+    assert engine.pdf_bytes_to_text(pdf("Quote 1")).endswith("surcharges")
+    assert engine.pdf_bytes_to_text(pdf("Quote 2")).endswith("surcharges")
+    assert len(calls) == 1
+    assert engine.cache_stats()["hits"] == 1
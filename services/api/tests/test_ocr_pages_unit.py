@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from services.api.app.infra import ocr_engine  # noqa: E402
+from services.api.app.infra.ocr_engine import OcrEngine  # noqa: E402
+
+
+def _pdf(pages):
+    """pages: str -> native text page, int -> blank (image-only) page that many points wide."""
+    doc = fitz.open()
+    for p in pages:
+        if isinstance(p, str):
+            doc.new_page().insert_text((72, 72), p)
+        else:
+            doc.new_page(width=p, height=200)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class _FakeOcr:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, raster, lang, config, backend="pytesseract"):
+        width = raster[0]
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05 if width % 2 else 0.01)  # finish out of order
+        with self.lock:
+            self.active -= 1
+        return f"ocr:{width}"
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pages_come_back_in_order_with_native_fast_path(monkeypatch, workers):
+    fake = _FakeOcr()
+    monkeypatch.setattr(ocr_engine, "ocr_raster", fake)
+    engine = OcrEngine(pdf_dpi=72, workers=workers, max_inflight_pages=2)
+    if workers > 1:
+        engine._executor = ThreadPoolExecutor(workers)  # same contract as the process pool, without spawning
+
+    pages = list(engine.iter_pdf_pages(_pdf(["Cover page", 301, 200, "Terms", 303, 204])))
+
+    assert [p for p, _ in pages] == list(range(6))
+    texts = [t for _, t in pages]
+    assert "Cover page" in texts[0] and "Terms" in texts[3]
+    assert [texts[i] for i in (1, 2, 4, 5)] == ["ocr:301", "ocr:200", "ocr:303", "ocr:204"]
+    assert fake.peak <= 2  # never more rasterized pages in flight than allowed
+    engine.close()
+
+
+def test_pdf_bytes_to_text_joins_pages(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "ocr_raster", lambda raster, lang, config, backend="pytesseract": f"scan-{lang}")
+    text = OcrEngine().pdf_bytes_to_text(_pdf(["Rate sheet", 200]), lang="eng")
+    assert text.startswith("Rate sheet") and text.endswith("scan-eng")
+
+
+def test_line_height_from_ink_profile():
+    import numpy as np
+
+    page = np.full((200, 100), 255, dtype=np.uint8)
+    for top in range(10, 190, 20):
+        page[top:top + 8, 10:90] = 0  # nine 8 px "lines"
+    assert ocr_engine.line_height_px(page) == 8.0
+    assert ocr_engine.line_height_px(np.full((50, 50), 255, dtype=np.uint8)) is None
+
+
+def test_adaptive_dpi_follows_font_size_and_pixel_budget():
+    doc = fitz.open()
+    for size in (8, 20):
+        page = doc.new_page()
+        for y in range(80, 700, int(size * 1.6)):
+            page.insert_text((72, y), "Freight rate per container THC BAF", fontsize=size)
+    big = doc.new_page(width=2384, height=3370)  # A0
+    big.insert_text((72, 72), "x")
+
+    engine = OcrEngine(adaptive_dpi=True, min_dpi=100, max_dpi=400, max_page_pixels=16_000_000)
+    small_dpi, large_dpi = engine.page_dpi(fitz, doc[0]), engine.page_dpi(fitz, doc[1])
+    assert large_dpi < small_dpi
+    assert 100 <= large_dpi and small_dpi <= 400
+    assert engine.page_dpi(fitz, doc[2]) <= 120  # A0 at 200 dpi would be ~300 MP
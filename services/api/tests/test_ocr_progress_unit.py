@@ -0,0 +1,119 @@
+import pytest
+
+from services.api.app.services.document_service import DocumentService
+
+
+class _Db:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class _Ocr:
+    """Four-page PDF; optionally dies after `fail_after` pages, like a worker crash."""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.ocred = []
+
+    def pdf_page_count(self, blob):
+        return 4
+
+    def iter_pdf_pages(self, blob, lang=None, skip=frozenset()):
+        for i in range(4):
+            if i in skip:
+                continue
+            if self.fail_after is not None and len(self.ocred) >= self.fail_after:
+                raise RuntimeError("worker died")
+            self.ocred.append(i)
+            yield i, f"page {i} {lang}"
+
+
+class _MemoryPageRepo:
+    def __init__(self):
+        self.pages = {}
+        self.total = None
+
+    def begin(self, db, asset_id, total, lang):
+        self.total = total
+        self.pages = {k: v for k, v in self.pages.items() if v[0] == lang and k < total}
+        return set(self.pages)
+
+    def save_page(self, db, asset_id, page_no, lang, text):
+        self.pages[page_no] = (lang, text)
+
+    def assemble(self, db, asset_id):
+        return "\n".join(self.pages[k][1] for k in sorted(self.pages)).strip()
+
+    def progress(self, db, asset_id):
+        return len(self.pages), self.total
+
+
+def _service(ocr, repo):
+    return DocumentService(ocr=ocr, embedder=None, s3=None, media_asset_repo=None, s3_public_base="", page_repo=repo)
+
+
+def test_pages_are_committed_as_they_finish_and_rerun_resumes():
+    repo, db = _MemoryPageRepo(), _Db()
+    with pytest.raises(RuntimeError):
+        _service(_Ocr(fail_after=2), repo)._ocr_pdf_pages(db, 1, b"%PDF", "eng")
+    assert repo.progress(db, 1) == (2, 4)
+    assert db.commits == 3  # page count + one per finished page
+
+    rerun = _Ocr()
+    text = _service(rerun, repo)._ocr_pdf_pages(db, 1, b"%PDF", "eng")
+    assert rerun.ocred == [2, 3]  # only the missing pages
+    assert text == "page 0 eng\npage 1 eng\npage 2 eng\npage 3 eng"
+
+
+def test_other_language_starts_over():
+    repo, db = _MemoryPageRepo(), _Db()
+    _service(_Ocr(), repo)._ocr_pdf_pages(db, 1, b"%PDF", "eng")
+    again = _Ocr()
+    text = _service(again, repo)._ocr_pdf_pages(db, 1, b"%PDF", "nor")
+    assert again.ocred == [0, 1, 2, 3]
+    assert text.endswith("page 3 nor")
+
+
+@pytest.fixture
+def sqlite_db():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE media_assets (id INTEGER PRIMARY KEY, ocr_text TEXT, ocr_pages_total INTEGER)"))
+        conn.execute(text(
+            "CREATE TABLE document_pages (asset_id INTEGER, page_no INTEGER, lang TEXT, text TEXT, created_at TIMESTAMP, "
+            "PRIMARY KEY (asset_id, page_no))"
+        ))
+    with Session(engine) as db:
+        yield db
+
+
+def _stored(db, ocr_text, pages):
+    from sqlalchemy import text
+
+    db.execute(text("INSERT INTO media_assets (id, ocr_text) VALUES (1, :t)"), {"t": ocr_text})
+    for page_no in pages:
+        db.execute(
+            text("INSERT INTO document_pages (asset_id, page_no, lang, text) VALUES (1, :p, 'eng', 'x')"), {"p": page_no}
+        )
+
+
+def test_repo_resumes_an_incomplete_run(sqlite_db):
+    from services.api.app.infra.sqlalchemy_document_page_repo import SqlAlchemyDocumentPageRepo
+
+    _stored(sqlite_db, None, [0, 1])
+    assert SqlAlchemyDocumentPageRepo().begin(sqlite_db, 1, total=4, lang="eng") == {0, 1}
+
+
+def test_repo_reocrs_after_a_finished_run(sqlite_db):
+    from services.api.app.infra.sqlalchemy_document_page_repo import SqlAlchemyDocumentPageRepo
+
+    _stored(sqlite_db, "page 0 ... page 3", [0, 1, 2, 3])
+    repo = SqlAlchemyDocumentPageRepo()
+    assert repo.begin(sqlite_db, 1, total=4, lang="eng") == set()
+    assert repo.progress(sqlite_db, 1) == (0, 4)
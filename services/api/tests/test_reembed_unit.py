@@ -0,0 +1,81 @@
+import pytest
+
+from services.api.app.jobs.reembed import Throttle
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, s):
+        self.slept.append(round(s, 6))
+        self.now += s
+
+
+def test_throttle_caps_average_rate():
+    clock = _Clock()
+    throttle = Throttle(100.0, clock=clock, sleep=clock.sleep)
+    throttle.wait(50)  # instant batch of 50 rows at 100 rows/s -> 0.5 s owed
+    clock.now += 0.2  # encoding the next batch took 0.2 s
+    throttle.wait(50)
+    assert clock.slept == [0.5, 0.3]
+
+
+def test_unthrottled_never_sleeps():
+    clock = _Clock()
+    throttle = Throttle(0, clock=clock, sleep=clock.sleep)
+    throttle.wait(10_000)
+    assert clock.slept == []
+
+
+class _Session:
+    """Counts rows per table left to re-embed; records every statement."""
+
+    def __init__(self, missing):
+        self.missing = missing
+        self.sql = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    def execute(self, stmt, params=None):
+        sql = " ".join(str(stmt).split())
+        self.sql.append(sql)
+        table = next((t for t in self.missing if f"FROM {t} " in sql), None)
+        return _Result(self.missing[table] if table else 0)
+
+
+class _Result:
+    def __init__(self, n):
+        self.n = n
+        self.rowcount = n
+
+    def scalar(self):
+        return self.n
+
+
+def test_cutover_refuses_while_chunks_hold_old_model_vectors(monkeypatch):
+    from services.api.app.jobs import reembed
+
+    db = _Session({"media_assets": 0, "document_chunks": 3})
+    monkeypatch.setattr(reembed, "SessionLocal", lambda: db)
+    with pytest.raises(SystemExit, match="3 document_chunks rows"):
+        reembed.cutover("new-model", 384)
+    assert not any(s.startswith("UPDATE") for s in db.sql)
+
+
+def test_migration_backfill_tags_like_save_embedding():
+    from services.api.app.infra.embedding_model import EmbeddingModel, embedding_model_id
+
+    for backend in ("torch", "onnx-int8"):
+        assert EmbeddingModel(model="m", backend=backend).model_id == embedding_model_id("m", backend)
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.api.app.core.executor import BoundedExecutor
+from services.api.app.domain.exceptions import Overloaded
+
+
+class _FakeAsyncSession:
+    """run_sync hands the sync callable a stand-in Session, like AsyncSession does."""
+
+    async def run_sync(self, fn):
+        return fn("sync-session")
+
+
+class _StubEmbedder:
+    model_id = "stub"
+
+    def __init__(self):
+        self.threads = []
+
+    def embed_text(self, text):
+        self.threads.append(threading.current_thread().name)
+        return [1.0] + [0.0] * 383
+
+
+def test_executor_sheds_load_beyond_queue_depth():
+    ex = BoundedExecutor(workers=1, max_queue=1, name="t")
+    gate = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(ex.run(gate.wait))
+        second = asyncio.ensure_future(ex.run(gate.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await ex.run(gate.wait)
+        gate.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+    st = ex.stats()
+    assert (st["rejected"], st["peak"], st["inflight"]) == (1, 2, 0)
+    ex.shutdown()
+
+
+def test_search_async_encodes_on_executor_and_runs_sync_search(monkeypatch, passthrough_snippets):
+    from services.api.app.services.search_service import SearchService
+
+    seen = {}
+
+    def fake_rank(self, db, query, qvec, candidates, ann, t, refresh_exact=True):
+        seen["db"] = db
+        return tuple({"id": i, "distance": 0.1, "score": 1.0 - i / 10, "bm25": 0.0, "chunk_id": None} for i in range(3)), False
+
+    monkeypatch.setattr(SearchService, "_rank", fake_rank)
+    embedder = _StubEmbedder()
+    svc = SearchService(embedder=embedder, encode_executor=BoundedExecutor(workers=1, max_queue=0, name="encode"))
+
+    out = asyncio.run(svc.search_async(_FakeAsyncSession(), "oslo", limit=2))
+    assert [r["id"] for r in out["results"]] == [0, 1]
+    assert seen["db"] == "sync-session"
+    assert embedder.threads and all(n.startswith("encode") for n in embedder.threads)  # never on the loop thread
+
+
+def test_exact_index_refreshes_on_a_worker_thread_not_in_run_sync(monkeypatch, passthrough_snippets):
+    from services.api.app.services.search_service import SearchService
+
+    class _Index:
+        chunks = False
+
+        def __init__(self):
+            self.refresh_threads = []
+
+        def due(self):
+            return True
+
+        def refresh(self, db, force=False, wait=True):
+            self.refresh_threads.append((threading.current_thread().name, db, wait))
+
+    seen = {}
+
+    def fake_rank(self, db, query, qvec, candidates, ann, t, refresh_exact=True):
+        seen["refresh_exact"] = refresh_exact
+        return (), False
+
+    class _Session:
+        def __enter__(self):
+            return "worker-session"
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(SearchService, "_rank", fake_rank)
+    index = _Index()
+    svc = SearchService(
+        embedder=_StubEmbedder(),
+        encode_executor=BoundedExecutor(workers=1, max_queue=0, name="encode"),
+        exact_index=index,
+        session_factory=_Session,
+    )
+
+    async def scenario():
+        loop_thread = threading.current_thread().name
+        await svc.search_async(_FakeAsyncSession(), "oslo", limit=2)
+        return loop_thread
+
+    loop_thread = asyncio.run(scenario())
+    ((thread, db, wait),) = index.refresh_threads
+    assert thread != loop_thread and db == "worker-session" and wait is False
+    assert seen["refresh_exact"] is False  # run_sync (loop thread) only reads the snapshot
+
+
+def test_cached_page_skips_the_encode_executor(monkeypatch, passthrough_snippets):
+    from services.api.app.core.cache import TtlLruCache
+    from services.api.app.infra.corpus_generation import CorpusGeneration
+    from services.api.app.services.search_service import SearchService
+
+    def fake_rank(self, db, query, qvec, candidates, ann, t, refresh_exact=True):
+        return tuple({"id": i, "distance": 0.1, "score": 1.0 - i / 10, "bm25": 0.0, "chunk_id": None} for i in range(3)), False
+
+    monkeypatch.setattr(SearchService, "_rank", fake_rank)
+    class _Saturated:
+        async def run(self, fn, *args):
+            raise Overloaded("encode queue full")
+
+    embedder = _StubEmbedder()
+    results = TtlLruCache()
+    svc = SearchService(
+        embedder=embedder,
+        encode_executor=BoundedExecutor(workers=1, max_queue=0, name="encode"),
+        result_cache=results,
+        corpus_generation=CorpusGeneration(),
+    )
+
+    first = asyncio.run(svc.search_async(_FakeAsyncSession(), "oslo", limit=2))
+    svc.encode_executor = _Saturated()  # under load: only pages that need an encode are shed
+    second = asyncio.run(svc.search_async(_FakeAsyncSession(), "Oslo ", limit=2, offset=1))
+    with pytest.raises(Overloaded):
+        asyncio.run(svc.search_async(_FakeAsyncSession(), "bergen", limit=2))
+
+    assert [r["id"] for r in first["results"]] == [0, 1] and [r["id"] for r in second["results"]] == [1, 2]
+    assert len(embedder.threads) == 1
+    assert (results.hits, results.misses) == (1, 2)  # each lookup counted once, not again inside search()
+
+
+def test_query_cache_miss_is_counted_once(monkeypatch, passthrough_snippets):
+    from services.api.app.infra.query_embedding_cache import QueryEmbeddingCache
+    from services.api.app.services.search_service import SearchService
+
+    monkeypatch.setattr(SearchService, "_rank", lambda self, *a, **k: ((), False))
+    queries = QueryEmbeddingCache(model_id="stub")
+    svc = SearchService(
+        embedder=_StubEmbedder(), query_cache=queries,
+        encode_executor=BoundedExecutor(workers=1, max_queue=0, name="encode"),
+    )
+
+    asyncio.run(svc.search_async(_FakeAsyncSession(), "oslo", limit=2))
+    asyncio.run(svc.search_async(_FakeAsyncSession(), "oslo", limit=2))
+    assert (queries.stats()["hits"], queries.stats()["misses"]) == (1, 1)
+
+
+def test_search_service_provider_is_async():
+    import inspect
+
+    from services.api.app.core import deps
+
+    # a sync dependency would occupy a threadpool thread on every async /search request
+    assert inspect.iscoroutinefunction(deps.provide_search_service)
@@ -0,0 +1,87 @@
+from services.api.app.core.cache import TtlLruCache
+from services.api.app.infra.corpus_generation import CorpusGeneration
+from services.api.app.services.search_service import SearchService
+
+
+class _BatchEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    def embed_text(self, text):
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts):
+        self.batches.append(list(texts))
+        return [[1.0] + [0.0] * 383 for _ in texts]
+
+
+def test_batch_embeds_once_and_ranks_in_one_round_trip(monkeypatch, passthrough_snippets):
+    calls = []
+
+    def fake_rank_many(self, db, queries, candidates, ann, t):
+        calls.append([q for q, _ in queries])
+        return [tuple({"id": i, "storage_uri": "", "snippet": q, "distance": 0.1, "score": 0.9, "bm25": 0.0} for i in range(3)) for q, _ in queries], False
+
+    monkeypatch.setattr(SearchService, "_rank_many", fake_rank_many)
+    embedder = _BatchEmbedder()
+    svc = SearchService(embedder=embedder, result_cache=TtlLruCache(), corpus_generation=CorpusGeneration())
+
+    out = svc.search_batch(db=None, queries=["oslo", "", "rotterdam"], limit=2)
+    assert [o["query"] for o in out] == ["oslo", "", "rotterdam"]
+    assert out[1]["results"] == []
+    assert out[0]["results"][0]["snippet"] == "oslo" and out[0]["next_offset"] == 2
+    assert embedder.batches == [["oslo", "rotterdam"]]
+    assert calls == [["oslo", "rotterdam"]]
+
+    # second run is served entirely from the result cache
+    svc.search_batch(db=None, queries=["oslo", "rotterdam"], limit=2)
+    assert len(calls) == 1 and len(embedder.batches) == 1
+
+
+class _Db:
+    """Index scans find nothing for "fjord"; a brute-force scan finds it."""
+
+    def __init__(self):
+        self.batches = []
+        self.index_off = False
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if "enable_indexscan = off" in sql:
+            self.index_off = True
+        if "VALUES" not in sql:
+            return self
+        texts = [params[k] for k in sorted(params) if k.startswith("qtext_")]
+        self.batches.append((texts, self.index_off))
+        self._rows = [
+            {"qi": i, "id": 10 + i, "distance": 0.1, "score": 0.9, "bm25": 0.0, "chunk_id": None}
+            for i, q in enumerate(texts)
+            if q != "fjord" or self.index_off
+        ]
+        return self
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+def test_only_queries_without_ann_hits_are_rerun_brute_force():
+    svc = SearchService(embedder=_BatchEmbedder())
+    db = _Db()
+    queries = [(q, None) for q in ("oslo", "fjord", "rotterdam")]
+    ranked, fallback = svc._rank_many(db, queries, candidates=10, ann=svc.ann_params(), t=lambda *a: 0)
+
+    assert fallback
+    assert db.batches == [(["oslo", "fjord", "rotterdam"], False), (["fjord"], True)]
+    assert [[r["id"] for r in page] for page in ranked] == [[10], [10], [12]]
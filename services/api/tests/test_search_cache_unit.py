@@ -0,0 +1,83 @@
+from services.api.app.core.cache import TtlLruCache
+from services.api.app.infra.query_embedding_cache import QueryEmbeddingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    c = TtlLruCache(maxsize=2, ttl_s=0)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "b" is now the oldest
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    c = TtlLruCache(maxsize=10, ttl_s=5, clock=clock)
+    c.set("a", 1)
+    clock.now = 4.9
+    assert c.get("a") == 1
+    clock.now = 5.0
+    assert c.get("a") is None
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["expirations"]) == (1, 1, 1)
+
+
+def test_query_cache_normalizes_and_scopes_by_model():
+    minilm = QueryEmbeddingCache(model_id="minilm")
+    minilm.put("  Oslo   Rotterdam ", [0.1, 0.2])
+    assert minilm.get("oslo rotterdam") == [0.1, 0.2]
+    assert QueryEmbeddingCache(model_id="other").key("oslo rotterdam") != minilm.key("oslo rotterdam")
+
+
+def test_max_bytes_evicts_oldest():
+    c = TtlLruCache(maxsize=10, ttl_s=0, sizeof=len, max_bytes=10)
+    c.set("a", "x" * 6)
+    c.set("b", "y" * 6)
+    assert c.get("a") is None and c.get("b") == "y" * 6
+    assert c.stats()["bytes"] == 6
+
+
+class _StubEmbedder:
+    calls = 0
+
+    def embed_text(self, text):
+        self.calls += 1
+        return [1.0] + [0.0] * 383
+
+
+def test_result_cache_serves_pages_until_generation_bump(monkeypatch, passthrough_snippets):
+    from services.api.app.infra.corpus_generation import CorpusGeneration
+    from services.api.app.services.search_service import SearchService
+
+    ranked = tuple({"id": i, "storage_uri": "s3://b/k", "snippet": "", "distance": 0.1, "score": 1.0 - i / 100, "bm25": 0.0} for i in range(100))
+    rank_calls = []
+
+    def fake_rank(self, db, query, qvec, candidates, ann, t, refresh_exact=True):
+        rank_calls.append(query)
+        return ranked, False
+
+    monkeypatch.setattr(SearchService, "_rank", fake_rank)
+    gen = CorpusGeneration()
+    embedder = _StubEmbedder()
+    svc = SearchService(embedder=embedder, result_cache=TtlLruCache(), corpus_generation=gen)
+
+    page1 = svc.search(db=None, query="oslo", limit=5, offset=0)
+    page2 = svc.search(db=None, query="Oslo ", limit=5, offset=5)
+    assert [r["id"] for r in page2["results"]] == [5, 6, 7, 8, 9]
+    assert page1["next_offset"] == 5
+    assert len(rank_calls) == 1 and embedder.calls == 1
+
+    gen.bump()
+    svc.search(db=None, query="oslo", limit=5, offset=0)
+    assert len(rank_calls) == 2
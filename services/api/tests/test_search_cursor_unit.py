@@ -0,0 +1,62 @@
+import pytest
+
+from services.api.app.domain.exceptions import BadRequest
+from services.api.app.services.search_service import SearchService, decode_cursor, encode_cursor
+
+CORPUS = tuple(
+    {"id": i, "storage_uri": "s3://b/k", "snippet": "", "distance": i / 1000, "score": 1.0 - i / 1000, "bm25": 0.0}
+    for i in range(250)
+)
+
+
+class _StubEmbedder:
+    def embed_text(self, text):
+        return [1.0] + [0.0] * 383
+
+
+def test_cursor_round_trip():
+    c = decode_cursor(encode_cursor({"score": 0.8123456789, "distance": None, "id": 42}, 200))
+    assert (c.score, c.distance, c.id, c.window) == (0.8123456789, None, 42, 200)
+
+
+def test_malformed_cursor_is_bad_request():
+    with pytest.raises(BadRequest):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_walks_past_initial_window(monkeypatch, passthrough_snippets):
+    windows = []
+
+    def fake_rank(self, db, query, qvec, candidates, ann, t, refresh_exact=True):
+        windows.append(candidates)
+        return CORPUS[:candidates], False
+
+    monkeypatch.setattr(SearchService, "_rank", fake_rank)
+    svc = SearchService(embedder=_StubEmbedder())
+
+    seen, cursor = [], None
+    while True:
+        page = svc.search(db=None, query="oslo", limit=40, cursor=cursor)
+        seen += [r["id"] for r in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(range(250))
+    assert max(windows) >= 250
+
+
+def test_zero_limit_is_bad_request():
+    with pytest.raises(BadRequest):
+        SearchService(embedder=_StubEmbedder()).search(db=None, query="oslo", limit=0)
+
+
+def test_row_deleted_before_materialization_keeps_paging(monkeypatch, passthrough_snippets):
+    monkeypatch.setattr(SearchService, "_rank", lambda self, db, query, qvec, candidates, ann, t, refresh_exact=True: (CORPUS, False))
+    # row 4 disappears between ranking and materialization
+    monkeypatch.setattr(
+        SearchService, "_materialize", lambda self, db, pages: [[dict(r) for r in page if r["id"] != 4] for _, page in pages]
+    )
+    page = SearchService(embedder=_StubEmbedder()).search(db=None, query="oslo", limit=5)
+    assert [r["id"] for r in page["results"]] == [0, 1, 2, 3]
+    assert page["next_offset"] == 5 and decode_cursor(page["next_cursor"]).id == 4
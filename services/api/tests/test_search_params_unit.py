@@ -0,0 +1,39 @@
+import pytest
+
+from services.api.app.domain.exceptions import BadRequest
+from services.api.app.services.search_service import SearchService
+
+
+def _svc(**kw):
+    return SearchService(embedder=None, **kw)
+
+
+def test_defaults_without_knobs():
+    p = _svc(ivfflat_probes=20, hnsw_ef_search=100).ann_params()
+    assert (p.probes, p.ef_search) == (20, 100)
+
+
+def test_recall_picks_cheapest_sufficient_tier():
+    svc = _svc()
+    assert svc.ann_params(recall=0.85).probes == 10
+    assert svc.ann_params(recall=0.99).ef_search == 400
+
+
+def test_latency_budget_caps_effort():
+    p = _svc().ann_params(recall=1.0, latency_budget_ms=12)
+    assert (p.probes, p.ef_search) == (10, 64)
+
+
+def test_invalid_knobs_rejected():
+    with pytest.raises(BadRequest):
+        _svc().ann_params(recall=1.5)
+    with pytest.raises(ValueError):
+        _svc(ann_metric="hamming")
+    with pytest.raises(ValueError):
+        _svc(ann_storage="bit")
+
+
+@pytest.mark.parametrize("chunks", [False, True])
+def test_halfvec_orders_by_the_indexed_expression(chunks):
+    sql = _svc(ann_storage="halfvec", embed_dim=384, chunks=chunks)._ann_sql("q.qvec")
+    assert "ORDER BY (embedding::halfvec(384)) <=> CAST(q.qvec AS halfvec(384))" in sql
@@ -0,0 +1,53 @@
+import math
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from services.api.app.services.search_service import SearchService
+
+
+def _svc(**kw):
+    return SearchService(embedder=None, fusion="rrf", **kw)
+
+
+def _squash(sql):
+    return " ".join(sql.split())
+
+
+def test_rrf_sql_fuses_both_legs():
+    sql = _squash(_svc()._ranking_sql(":qvec", ":qtext"))
+    # each leg ranked on its own, then a FULL OUTER JOIN so single-list hits survive
+    assert "row_number() OVER (ORDER BY distance, id) AS rnk" in sql
+    assert "row_number() OVER (ORDER BY bm25 DESC, id) AS rnk" in sql
+    assert "FULL OUTER JOIN" in sql and "ON l.id = a.id" in sql
+    assert "coalesce(1.0 / (:rrf_k + a.rnk), 0) + coalesce(1.0 / (:rrf_k + l.rnk), 0)" in sql
+    # the lexical leg scores a bounded, deterministic set of GIN matches (same ranks on every call)
+    assert "WHERE ocr_tsv @@ plainto_tsquery('simple', :qtext) ORDER BY id DESC LIMIT :lex_cap" in sql
+    assert sql.endswith("LIMIT :candidates")
+
+
+def test_rrf_params_include_k_and_lex_cap():
+    params = _svc(rrf_k=60, lex_match_cap=500)._rank_params([("oslo", None)], candidates=1000)
+    assert params["rrf_k"] == 60
+    assert params["lex_cap"] == 1000  # never fewer matches than candidates
+
+
+def test_docs_in_only_one_list_still_fuse(monkeypatch):
+    # run the fusion SQL itself (SQLite >= 3.39 has FULL OUTER JOIN); only the two legs are stand-ins
+    monkeypatch.setattr(SearchService, "_ann_sql", lambda self, qvec, exact=False: "SELECT id, distance, NULL AS chunk_id FROM ann")
+    monkeypatch.setattr(SearchService, "_lex_sql", lambda self, qtext: "SELECT id, bm25 FROM lex")
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE ann (id INTEGER, distance REAL)"))
+        conn.execute(text("CREATE TABLE lex (id INTEGER, bm25 REAL)"))
+        conn.execute(text("INSERT INTO ann VALUES (1, 0.1), (2, 0.2), (3, 0.3)"))  # 4 has no vector hit
+        conn.execute(text("INSERT INTO lex VALUES (3, 0.9), (4, 0.8)"))  # 1 and 2 have no keyword hit
+        sql = _svc()._ranking_sql(":qvec", ":qtext").replace("::float", "")
+        rows = conn.execute(text(sql), {"rrf_k": 60, "candidates": 10}).mappings().all()
+
+    assert [r["id"] for r in rows] == [3, 1, 2, 4]
+    scores = {r["id"]: r["score"] for r in rows}
+    assert math.isclose(scores[3], 1 / 63 + 1 / 61)  # ann rank 3 + lex rank 1
+    assert math.isclose(scores[1], 1 / 61)  # vector only
+    assert math.isclose(scores[4], 1 / 62)  # keyword only: still ranked, no distance
+    assert rows[3]["distance"] is None and rows[2]["distance"] == pytest.approx(0.2)  # tie -> distance NULLS LAST
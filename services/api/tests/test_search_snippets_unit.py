@@ -0,0 +1,33 @@
+import pytest
+
+from services.api.app.services.search_service import SearchService
+
+
+class _StubEmbedder:
+    def embed_text(self, text):
+        return [1.0] + [0.0] * 383
+
+
+@pytest.mark.parametrize("fusion", ["linear", "rrf"])
+@pytest.mark.parametrize("chunks", [False, True])
+def test_ranking_sql_carries_no_text(fusion, chunks):
+    svc = SearchService(embedder=_StubEmbedder(), fusion=fusion, chunks=chunks)
+    for exact in (False, True):
+        sql = svc._ranking_sql(":qvec", ":qtext", exact=exact)
+        assert "ocr_text" not in sql and "text AS" not in sql
+
+
+def test_only_final_page_is_materialized(monkeypatch, passthrough_snippets):
+    ranked = tuple({"id": i, "distance": i / 100, "score": 1.0 - i / 100, "bm25": 0.0, "chunk_id": None} for i in range(100))
+    monkeypatch.setattr(SearchService, "_rank", lambda self, db, query, qvec, candidates, ann, t, refresh_exact=True: (ranked, False))
+    svc = SearchService(embedder=_StubEmbedder())
+
+    out = svc.search(db=None, query="oslo", limit=5, offset=10)
+    assert [r["id"] for r in out["results"]] == [10, 11, 12, 13, 14]
+    ((query, page),) = passthrough_snippets[0]
+    assert query == "oslo" and len(page) == 5
+
+
+def test_unknown_snippet_mode_rejected():
+    with pytest.raises(ValueError):
+        SearchService(embedder=_StubEmbedder(), snippet_mode="html")
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from services.api.app.infra.tesseract_pool import TesseractApiPool, parse_tesseract_config
+
+
+class _FakeApi:
+    def __init__(self, lang, oem, psm):
+        self.key = (lang, oem, psm)
+        self.ended = False
+        self.cleared = 0
+
+    def Clear(self):
+        self.cleared += 1
+
+    def End(self):
+        self.ended = True
+
+
+def test_parse_config():
+    assert parse_tesseract_config("--oem 1 --psm 4") == (1, 4)
+    assert parse_tesseract_config("") == (3, 6)
+
+
+def test_handles_are_reused_per_language_set():
+    made = []
+    pool = TesseractApiPool(factory=lambda *k: made.append(_FakeApi(*k)) or made[-1])
+
+    for _ in range(3):
+        with pool.acquire("eng", 3, 6) as api:
+            assert api.key == ("eng", 3, 6)
+    with pool.acquire("eng+nor", 3, 6):
+        pass
+
+    assert len(made) == 2
+    assert made[0].cleared == 3
+    assert pool.stats()["reused"] == 2
+
+
+def test_least_recently_used_language_set_is_closed():
+    made = []
+    pool = TesseractApiPool(max_keys=2, factory=lambda *k: made.append(_FakeApi(*k)) or made[-1])
+    for lang in ("eng", "nor", "eng", "deu"):
+        with pool.acquire(lang, 3, 6):
+            pass
+    assert [a.key[0] for a in made if a.ended] == ["nor"]
+    assert sorted(k[0] for k in pool.stats()["keys"]) == ["deu", "eng"]
+
+
+def test_borrowers_wait_for_the_bounded_handle():
+    pool = TesseractApiPool(handles_per_key=1, factory=_FakeApi)
+    order = []
+
+    def second():
+        with pool.acquire("eng", 3, 6):
+            order.append("second")
+
+    with pool.acquire("eng", 3, 6):
+        t = threading.Thread(target=second)
+        t.start()
+        t.join(timeout=0.1)
+        assert t.is_alive()  # blocked: only one handle for this key
+        order.append("first done")
+    t.join(timeout=5)
+    assert order == ["first done", "second"]
+    assert pool.stats()["created"] == 1
+
+
+def test_factory_failure_frees_the_slot():
+    calls = []
+
+    def flaky(*key):
+        calls.append(key)
+        if len(calls) == 1:
+            raise RuntimeError("traineddata missing")
+        return _FakeApi(*key)
+
+    pool = TesseractApiPool(factory=flaky)
+    with pytest.raises(RuntimeError):
+        with pool.acquire("eng", 3, 6):
+            pass
+    with pool.acquire("eng", 3, 6) as api:
+        assert api.key == ("eng", 3, 6)
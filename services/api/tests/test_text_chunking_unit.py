@@ -0,0 +1,30 @@
+from services.api.app.infra.text_chunking import length_buckets, token_windows
+
+
+def _offsets(words):
+    out, pos = [], 0
+    for w in words:
+        out.append((pos, pos + len(w)))
+        pos += len(w) + 1
+    return out
+
+
+def test_windows_overlap_and_cover_everything():
+    words = [f"w{i}" for i in range(10)]
+    text = " ".join(words)
+    spans = token_windows(_offsets(words), max_tokens=4, overlap=1)
+    chunks = [text[a:b].split() for a, b in spans]
+    assert chunks == [words[0:4], words[3:7], words[6:10]]
+
+
+def test_short_text_is_single_window():
+    assert token_windows(_offsets(["a", "b"]), max_tokens=8, overlap=2) == [(0, 3)]
+    assert token_windows([], max_tokens=8, overlap=2) == []
+
+
+def test_length_buckets_group_similar_lengths():
+    lengths = [5, 300, 7, 280, 6, 1000]
+    buckets = length_buckets(lengths, batch_size=2)
+    assert buckets == [[5, 1], [3, 2], [4, 0]]
+    assert sorted(i for b in buckets for i in b) == list(range(len(lengths)))
+    assert length_buckets([], batch_size=4) == []
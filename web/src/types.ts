@@ -21,6 +21,7 @@ export interface SearchResponse {
   query: string;
   results: SearchHit[];
   next_offset: number | null;
+  next_cursor?: string | null;
 }
 export interface UploadResponse {
   id: string;